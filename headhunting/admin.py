@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Company, Project, Resume, ResumeProject, ProjectStatus, ResumeStatus, Tag, PaymentRecord
+from .models import Company, Project, Resume, ResumeProject, ProjectStatus, ResumeStatus, Tag, PaymentRecord, ParseJob, ParseResultCache, ResumeDocumentText
 
 @admin.register(ProjectStatus)
 class ProjectStatusAdmin(admin.ModelAdmin):
@@ -44,8 +44,8 @@ class PaymentRecordAdmin(admin.ModelAdmin):
 
 @admin.register(Resume)
 class ResumeAdmin(admin.ModelAdmin):
-    list_display = ('name', 'gender', 'phone', 'email', 'education', 'experience_years', 'created_at', 'created_by')
-    list_filter = ('gender', 'education', 'created_at', 'tags')
+    list_display = ('name', 'gender', 'phone', 'email', 'education', 'experience_years', 'parser_version', 'created_at', 'created_by')
+    list_filter = ('gender', 'education', 'parser_version', 'created_at', 'tags')
     search_fields = ('name', 'phone', 'email', 'school', 'current_company')
     date_hierarchy = 'created_at'
     filter_horizontal = ('tags',)
@@ -56,3 +56,22 @@ class ResumeProjectAdmin(admin.ModelAdmin):
     list_filter = ('status', 'submitted_at')
     search_fields = ('resume__name', 'project__title', 'project__company__name')
     date_hierarchy = 'submitted_at'
+
+@admin.register(ParseJob)
+class ParseJobAdmin(admin.ModelAdmin):
+    list_display = ('file_name', 'status', 'error_code', 'attempts', 'locked_by', 'created_by', 'created_at', 'finished_at')
+    list_filter = ('status', 'error_code', 'created_at')
+    search_fields = ('file_name', 'error')
+    date_hierarchy = 'created_at'
+
+@admin.register(ParseResultCache)
+class ParseResultCacheAdmin(admin.ModelAdmin):
+    list_display = ('content_hash', 'parser_version', 'created_at')
+    list_filter = ('parser_version',)
+    search_fields = ('content_hash',)
+
+@admin.register(ResumeDocumentText)
+class ResumeDocumentTextAdmin(admin.ModelAdmin):
+    list_display = ('content_hash', 'char_count', 'created_at')
+    search_fields = ('content_hash',)
+    readonly_fields = ('content_hash', 'char_count', 'created_at')
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class HeadhuntingConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'headhunting'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        # 按配置在启动时预热简历解析器，避免第一个解析请求承担模型加载时间
+        if getattr(settings, 'RESUME_PARSER_PRELOAD', False):
+            from .utils import get_resume_parser
+            get_resume_parser()
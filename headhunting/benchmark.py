@@ -0,0 +1,303 @@
+"""简历解析器基准测试：生成可复现的合成中文简历语料，统计各阶段耗时、吞吐量、内存峰值和字段准确率"""
+import io
+import json
+import os
+import random
+import resource
+import sys
+import time
+import zlib
+from datetime import datetime
+from docx import Document
+from django.core.files import File
+from django.db import transaction
+from .metrics import registry as metrics
+from .utils import PARSER_VERSION, ResumeParseError
+
+SURNAMES = '王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐'
+GIVEN_NAMES = ['伟', '芳', '娜', '敏', '静', '丽', '强', '磊', '军', '洋', '勇', '艳', '杰', '娟', '涛', '明', '超', '秀英', '霞', '平', '刚', '桂英', '志强', '建华']
+SCHOOLS = ['北京大学', '清华大学', '复旦大学', '浙江大学', '南京大学', '武汉大学', '中山大学', '四川大学', '华中科技大学', '西安交通大学']
+MAJORS = ['计算机科学与技术', '软件工程', '电子信息工程', '自动化', '通信工程', '数学与应用数学', '工商管理', '金融学']
+DEGREES = ['本科', '硕士', '博士', '大专']
+COMPANIES = ['华为技术有限公司', '腾讯科技有限公司', '阿里巴巴集团', '字节跳动科技有限公司', '百度在线网络技术有限公司', '京东集团', '美团点评集团', '小米科技有限公司', '网易公司', '中兴通讯股份有限公司']
+POSITIONS = ['软件工程师', '高级工程师', '技术经理', '产品经理', '测试工程师', '架构师', '数据分析师', '运维工程师']
+SKILLS = ['Python', 'Java', 'Go', 'Django', 'Spring', 'MySQL', 'Redis', 'Kafka', 'Docker', 'Kubernetes', 'Linux', 'React', 'Vue', '机器学习', '数据分析', '项目管理']
+DUTIES = ['负责核心业务系统的设计与开发', '参与微服务架构改造', '主导性能优化，接口响应时间降低一半', '负责团队代码评审和技术分享', '参与需求分析和技术方案评审', '负责线上问题排查和稳定性保障']
+
+# 简历长度：工作经历条数
+LENGTHS = {'short': 2, 'medium': 6, 'long': 30, 'xlong': 120}
+# 段落布局：colon 标题带冒号，plain 标题独占一行，none 没有段落标题
+LAYOUTS = ['colon', 'plain', 'none']
+
+def generate_resume(rnd, length, layout):
+    """生成一份合成简历，返回 (文本行, 标准答案)"""
+    name = rnd.choice(SURNAMES) + rnd.choice(GIVEN_NAMES)
+    gender = rnd.choice('男女')
+    age = rnd.randint(22, 50)
+    phone = '1' + rnd.choice('3456789') + ''.join(rnd.choice('0123456789') for _ in range(9))
+    email = f'user{rnd.randint(1000, 99999)}@example.com'
+    schools = rnd.sample(SCHOOLS, 2)
+    companies = [rnd.choice(COMPANIES) for _ in range(LENGTHS[length])]
+    skills = rnd.sample(SKILLS, 5)
+
+    def heading(title):
+        if layout == 'colon':
+            return [f'{title}：']
+        if layout == 'plain':
+            return [title]
+        return []
+
+    lines = [f'姓名：{name}', f'性别：{gender}    年龄：{age}岁', f'手机：{phone}', f'邮箱：{email}', '']
+    lines += heading('教育背景')
+    for i, school in enumerate(schools):
+        start = 2000 + i * 4
+        lines.append(f'{start}年9月-{start + 4}年6月  {school}  {rnd.choice(MAJORS)}  {DEGREES[i]}')
+    lines.append('')
+    lines += heading('工作经历')
+    for i, company in enumerate(companies):
+        start = 2010 + i % 12
+        lines.append(f'{start}年3月-{start + 1}年5月  {company}  {rnd.choice(POSITIONS)}')
+        lines.append('，'.join(rnd.sample(DUTIES, 3)) + '。')
+    lines.append('')
+    lines += heading('专业技能')
+    lines.append('熟练掌握' + '、'.join(skills))
+
+    truth = {
+        'name': name,
+        'gender': gender,
+        'age': str(age),
+        'phone': phone,
+        'email': email,
+        'education': schools,
+        'work_experience': sorted(set(companies)),
+        'skills': skills,
+    }
+    return lines, truth
+
+def _pdf_tounicode_cmap():
+    """Identity-H编码下字符码即Unicode码位的ToUnicode映射"""
+    ranges = [f'<{high:02X}00> <{high:02X}FF> <{high:02X}00>' for high in range(256) if not 0xD8 <= high <= 0xDF]
+    lines = [
+        '/CIDInit /ProcSet findresource begin', '12 dict begin', 'begincmap',
+        '/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def',
+        '/CMapName /Adobe-Identity-UCS def', '/CMapType 2 def',
+        '1 begincodespacerange', '<0000> <FFFF>', 'endcodespacerange',
+    ]
+    for i in range(0, len(ranges), 100):
+        chunk = ranges[i:i + 100]
+        lines.append(f'{len(chunk)} beginbfrange')
+        lines.extend(chunk)
+        lines.append('endbfrange')
+    lines += ['endcmap', 'CMapName currentdict /CMap defineresource pop', 'end', 'end']
+    return '\n'.join(lines).encode('ascii')
+
+def build_pdf(lines, lines_per_page=50, chars_per_line=40):
+    """生成只包含文本层的最小PDF（字体不嵌入，仅用于文本提取测试）"""
+    wrapped = []
+    for line in lines:
+        wrapped.extend([line[i:i + chars_per_line] for i in range(0, len(line), chars_per_line)] or [''])
+    pages = [wrapped[i:i + lines_per_page] for i in range(0, len(wrapped), lines_per_page)] or [[]]
+
+    objects = []
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    cmap = _pdf_tounicode_cmap()
+    cmap_id = add(b'<< /Length %d >>\nstream\n' % len(cmap) + cmap + b'\nendstream')
+    cid_font_id = add(
+        b'<< /Type /Font /Subtype /CIDFontType2 /BaseFont /SimSun '
+        b'/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> /DW 1000 >>'
+    )
+    font_id = add(
+        b'<< /Type /Font /Subtype /Type0 /BaseFont /SimSun /Encoding /Identity-H '
+        b'/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>' % (cid_font_id, cmap_id)
+    )
+    pages_id = add(None)
+    page_ids = []
+    for page_lines in pages:
+        operators = [b'BT', b'/F1 10 Tf', b'14 TL', b'40 800 Td']
+        for line in page_lines:
+            operators.append(b'<%s> Tj T*' % line.encode('utf-16-be').hex().upper().encode('ascii'))
+        operators.append(b'ET')
+        content = zlib.compress(b'\n'.join(operators))
+        content_id = add(b'<< /Length %d /Filter /FlateDecode >>\nstream\n' % len(content) + content + b'\nendstream')
+        page_ids.append(add(
+            b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 595 842] '
+            b'/Resources << /Font << /F1 %d 0 R >> >> /Contents %d 0 R >>' % (pages_id, font_id, content_id)
+        ))
+    objects[pages_id - 1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % page_id for page_id in page_ids), len(page_ids)
+    )
+    catalog_id = add(b'<< /Type /Catalog /Pages %d 0 R >>' % pages_id)
+
+    output = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(output))
+        output += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref_offset = len(output)
+    output += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        output += b'%010d 00000 n \n' % offset
+    output += b'trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, catalog_id, xref_offset)
+    return bytes(output)
+
+def build_docx(lines):
+    """生成Word文件"""
+    document = Document()
+    for line in lines:
+        document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+def generate_corpus(directory, count, seed=0):
+    """在目录中生成PDF和Word格式的合成简历，标准答案保存在 ground_truth.json"""
+    os.makedirs(directory, exist_ok=True)
+    rnd = random.Random(seed)
+    truth = {}
+    for i in range(count):
+        length = list(LENGTHS)[i % len(LENGTHS)]
+        layout = LAYOUTS[(i // len(LENGTHS)) % len(LAYOUTS)]
+        file_format = 'pdf' if i % 2 == 0 else 'docx'
+        lines, answer = generate_resume(rnd, length, layout)
+        filename = f'cv_{i:04d}_{length}_{layout}.{file_format}'
+        data = build_pdf(lines) if file_format == 'pdf' else build_docx(lines)
+        with open(os.path.join(directory, filename), 'wb') as f:
+            f.write(data)
+        truth[filename] = answer
+    with open(os.path.join(directory, 'ground_truth.json'), 'w', encoding='utf-8') as f:
+        json.dump(truth, f, ensure_ascii=False, indent=2)
+    return truth
+
+def _percentile(values, percent):
+    """最近秩法百分位数"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(percent / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def _peak_rss_mb():
+    """进程内存峰值（MB），在子进程中解析时取子进程的峰值"""
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # Linux单位为KB，macOS为字节
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _stage_totals(state):
+    """把 metrics.export() 的计时器按阶段名汇总为 {阶段: 秒}"""
+    totals = {}
+    for (name, labels), stats in state['timers'].items():
+        labels = dict(labels)
+        if name == 'stage':
+            stage = labels['stage']
+        elif name == 'extractor':
+            stage = f"extract_{labels['field']}"
+        else:
+            stage = name
+        totals[stage] = totals.get(stage, 0.0) + stats['sum']
+    return totals
+
+def parse_with_stages(parser, path, use_cache=False, sandbox=None):
+    """用 parse_file 解析文件，返回 (解析结果, {阶段: 秒})
+
+    各阶段耗时取自解析器记录的 stage/extractor 计时器在本次解析前后的差值，
+    与生产环境的解析路径（文件类型判断、子进程、缓存）一致。
+    """
+    before = _stage_totals(metrics.export())
+    with open(path, 'rb') as f:
+        parsed = parser.parse_file(File(f, name=os.path.basename(path)), use_cache=use_cache, sandbox=sandbox)
+    after = _stage_totals(metrics.export())
+    return parsed, {stage: seconds - before.get(stage, 0.0) for stage, seconds in after.items() if seconds > before.get(stage, 0.0)}
+
+def score_fields(parsed, answer):
+    """字段级准确率：单值字段完全匹配，列表字段按标准答案条目被提取到的比例计分"""
+    scores = {}
+    for field in ('name', 'gender', 'age', 'phone', 'email'):
+        scores[field] = 1.0 if parsed.get(field) == answer[field] else 0.0
+    for field in ('education', 'work_experience', 'skills'):
+        extracted = '\n'.join(parsed.get(field, []))
+        expected = answer[field]
+        scores[field] = sum(1 for item in expected if item in extracted) / len(expected) if expected else 1.0
+    return scores
+
+def run_benchmark(parser, directory, repeat=1, use_cache=False, sandbox=None):
+    """对语料目录执行基准测试，返回结果字典
+
+    默认不使用解析结果缓存，重复解析时统计的是实际解析耗时；解析时写入的全文和缓存在结束后回滚。
+    """
+    with open(os.path.join(directory, 'ground_truth.json'), encoding='utf-8') as f:
+        truth = json.load(f)
+
+    samples = {}
+    totals = []
+    failures = 0
+    field_scores = {}
+    # 计时依赖解析指标，基准测试期间总是记录
+    metrics_enabled = metrics.enabled
+    metrics.enabled = True
+    start = time.perf_counter()
+    try:
+        with transaction.atomic():
+            for _ in range(repeat):
+                for filename, answer in truth.items():
+                    file_start = time.perf_counter()
+                    try:
+                        parsed, stages = parse_with_stages(parser, os.path.join(directory, filename), use_cache, sandbox)
+                    except ResumeParseError:
+                        failures += 1
+                        parsed, stages = {}, {}
+                    totals.append(time.perf_counter() - file_start)
+                    for stage, seconds in stages.items():
+                        samples.setdefault(stage, []).append(seconds)
+                    for field, score in score_fields(parsed, answer).items():
+                        field_scores.setdefault(field, []).append(score)
+            transaction.set_rollback(True)
+    finally:
+        metrics.enabled = metrics_enabled
+    elapsed = time.perf_counter() - start
+
+    samples['total'] = totals
+    stages = {
+        stage: {
+            'count': len(values),
+            'p50_ms': _percentile(values, 50) * 1000,
+            'p95_ms': _percentile(values, 95) * 1000,
+            'p99_ms': _percentile(values, 99) * 1000,
+        }
+        for stage, values in samples.items()
+    }
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'parser_version': PARSER_VERSION,
+        'files': len(totals),
+        'failures': failures,
+        'use_cache': use_cache,
+        'elapsed_seconds': elapsed,
+        'files_per_second': len(totals) / elapsed if elapsed else 0.0,
+        'peak_rss_mb': _peak_rss_mb(),
+        'stages': stages,
+        'accuracy': {field: sum(scores) / len(scores) for field, scores in field_scores.items()},
+    }
+
+def compare_results(current, baseline, threshold=0.1, min_delta_ms=1.0):
+    """与基线结果比较，返回回退项描述列表
+
+    耗时增加不足min_delta_ms的阶段不计为回退，避免亚毫秒级阶段的计时抖动。
+    """
+    regressions = []
+    for stage, stats in current['stages'].items():
+        base = baseline.get('stages', {}).get(stage)
+        if (base and stats['p95_ms'] > base['p95_ms'] * (1 + threshold)
+                and stats['p95_ms'] - base['p95_ms'] >= min_delta_ms):
+            regressions.append(f"{stage} p95 {base['p95_ms']:.2f}ms -> {stats['p95_ms']:.2f}ms")
+    base_fps = baseline.get('files_per_second', 0)
+    if base_fps and current['files_per_second'] < base_fps * (1 - threshold):
+        regressions.append(f"吞吐量 {base_fps:.1f} -> {current['files_per_second']:.1f} 文件/秒")
+    base_rss = baseline.get('peak_rss_mb', 0)
+    if base_rss and current['peak_rss_mb'] > base_rss * (1 + threshold):
+        regressions.append(f"内存峰值 {base_rss:.0f}MB -> {current['peak_rss_mb']:.0f}MB")
+    for field, accuracy in current['accuracy'].items():
+        base_accuracy = baseline.get('accuracy', {}).get(field)
+        if base_accuracy is not None and accuracy < base_accuracy - 0.01:
+            regressions.append(f"{field} 准确率 {base_accuracy:.1%} -> {accuracy:.1%}")
+    return regressions
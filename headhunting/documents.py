@@ -0,0 +1,92 @@
+"""简历原文检索
+
+解析时提取的全文按文件内容哈希保存在 ResumeDocumentText 中（见 utils.store_document_text），
+搜索简历原文和生成摘要片段只查询该表，不打开原始文件。
+"""
+import logging
+import re
+from django.conf import settings
+from django.db.models import OuterRef, Q, Subquery, Value
+from django.db.models.functions import Greatest, Lower, StrIndex, Substr
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+from .models import ParseJob, ResumeDocumentText
+from .utils import get_resume_parser, has_document_text, normalize_document_text, store_document_text
+
+logger = logging.getLogger(__name__)
+
+# 摘要片段在匹配位置前后各保留的字符数
+SNIPPET_RADIUS = 40
+MAX_SEARCH_TERMS = 5
+
+def search_terms(query):
+    """将搜索内容拆分为搜索词（全部需要匹配），与保存的全文做同样的规范化"""
+    terms = []
+    for term in normalize_document_text(query or '').lower().split():
+        if term not in terms:
+            terms.append(term)
+    return terms[:MAX_SEARCH_TERMS]
+
+def filter_by_document_text(resumes, terms):
+    """筛选原文中包含全部搜索词的简历"""
+    texts = ResumeDocumentText.objects.all()
+    for term in terms:
+        texts = texts.filter(text__icontains=term)
+    return resumes.filter(file_hash__in=texts.values('content_hash'))
+
+def annotate_snippets(resumes, terms):
+    """标注第一个搜索词附近的原文片段（document_snippet），只在数据库中截取片段，不读取全文"""
+    term = terms[0]
+    position = StrIndex(Lower('text'), Value(term))
+    snippet = ResumeDocumentText.objects.filter(content_hash=OuterRef('file_hash')).annotate(
+        snippet=Substr('text', Greatest(position - SNIPPET_RADIUS, 1), SNIPPET_RADIUS * 2 + len(term))
+    ).values('snippet')[:1]
+    return resumes.annotate(document_snippet=Subquery(snippet))
+
+def highlight(snippet, terms):
+    """转义片段并用<mark>标出搜索词"""
+    if not snippet:
+        return ''
+    pattern = re.compile('|'.join(re.escape(term) for term in sorted(terms, key=len, reverse=True)), re.IGNORECASE)
+    parts = []
+    last = 0
+    for match in pattern.finditer(snippet):
+        parts.append(escape(snippet[last:match.start()]))
+        parts.append(f'<mark>{escape(match.group())}</mark>')
+        last = match.end()
+    parts.append(escape(snippet[last:]))
+    return mark_safe('…' + ''.join(parts).replace('\n', ' ') + '…')
+
+def extract_document_text(resume, parser=None):
+    """从简历文件提取全文并保存"""
+    if parser is None:
+        parser = get_resume_parser()
+    with resume.resume_file.open('rb') as f:
+        text = parser.extract_document_text(f)
+    store_document_text(resume.file_hash, text)
+
+def ensure_document_text(resume):
+    """未经解析直接上传的文件没有保存全文，异步模式下交给解析任务处理进程，否则在当前进程提取"""
+    if not resume.file_hash or has_document_text(resume.file_hash):
+        return
+    try:
+        if getattr(settings, 'RESUME_PARSE_ASYNC', True):
+            # 同一文件已有未完成的任务（如上传时创建的任务）时不再创建；已失败的文件重新创建任务也不会成功
+            pending = ParseJob.objects.filter(
+                Q(file_hash=resume.file_hash) | Q(file_path=resume.resume_file.path),
+                status__in=[ParseJob.STATUS_PENDING, ParseJob.STATUS_RUNNING, ParseJob.STATUS_FAILED],
+            )
+            if pending.exists():
+                return
+            # 解析时会同时保存全文
+            ParseJob.objects.create(
+                file_path=resume.resume_file.path,
+                file_name=resume.download_name,
+                file_hash=resume.file_hash,
+                max_attempts=getattr(settings, 'RESUME_PARSE_JOB_MAX_ATTEMPTS', 3),
+                created_by=resume.created_by,
+            )
+        else:
+            extract_document_text(resume)
+    except Exception as e:
+        logger.error(f"提取简历全文失败: {resume.resume_file.name}: {str(e)}")
@@ -0,0 +1,113 @@
+"""简历列表的分面筛选
+
+按学历、工作年限区间、标签和创建人筛选简历，并在每个选项旁显示数量。
+同一分面内选中的多个值为“或”，不同分面之间为“与”；每个分面的数量在应用了其他分面筛选的结果上
+用一次分组聚合统计（不应用本分面的筛选，便于切换选项），不按选项逐个计数。
+"""
+from django.db.models import Case, CharField, Count, Q, Value, When
+from .models import Resume
+
+# 工作年限区间：(取值, 显示名称, 下限, 上限)，包含下限不包含上限
+EXPERIENCE_BANDS = (
+    ('0-1', '1年以下', None, 1),
+    ('1-3', '1-3年', 1, 3),
+    ('3-5', '3-5年', 3, 5),
+    ('5-10', '5-10年', 5, 10),
+    ('10+', '10年以上', 10, None),
+)
+# 标签分面最多显示的标签数（已选中的标签总会显示）
+TAG_FACET_LIMIT = 20
+
+FACETS = (
+    ('education', '学历'),
+    ('experience', '工作年限'),
+    ('tag', '标签'),
+    ('creator', '创建人'),
+)
+
+def _band_q(lower, upper):
+    q = Q()
+    if lower is not None:
+        q &= Q(experience_years__gte=lower)
+    if upper is not None:
+        q &= Q(experience_years__lt=upper)
+    return q
+
+def _experience_band():
+    """工作年限所在区间的表达式"""
+    return Case(
+        *[When(_band_q(lower, upper), then=Value(value)) for value, _, lower, upper in EXPERIENCE_BANDS],
+        output_field=CharField(),
+    )
+
+def parse_selection(params, include_creator):
+    """从查询参数读取选中的分面取值，忽略无效值"""
+    educations = {value for value, _ in Resume.EDUCATION_CHOICES}
+    bands = {value for value, _, _, _ in EXPERIENCE_BANDS}
+    selection = {
+        'education': [value for value in params.getlist('education') if value in educations],
+        'experience': [value for value in params.getlist('experience') if value in bands],
+        'tag': [int(value) for value in params.getlist('tag') if value.isdigit()],
+        'creator': [],
+    }
+    if include_creator:
+        selection['creator'] = [int(value) for value in params.getlist('creator') if value.isdigit()]
+    return selection
+
+def apply_filters(resumes, selection, skip=None):
+    """应用选中的分面筛选，skip为不应用的分面"""
+    if selection['education'] and skip != 'education':
+        resumes = resumes.filter(education__in=selection['education'])
+    if selection['experience'] and skip != 'experience':
+        q = Q()
+        for value, _, lower, upper in EXPERIENCE_BANDS:
+            if value in selection['experience']:
+                q |= _band_q(lower, upper)
+        resumes = resumes.filter(q)
+    if selection['tag'] and skip != 'tag':
+        # 用子查询筛选，避免连接标签表后出现重复的简历
+        tagged = Resume.tags.through.objects.filter(tag_id__in=selection['tag']).values('resume_id')
+        resumes = resumes.filter(pk__in=tagged)
+    if selection['creator'] and skip != 'creator':
+        resumes = resumes.filter(created_by_id__in=selection['creator'])
+    return resumes
+
+def _grouped_counts(resumes, *fields):
+    """按字段分组统计简历数，返回 [(取值..., 数量)]，按数量从多到少排列"""
+    return resumes.order_by().values(*fields).annotate(count=Count('pk')).order_by('-count').values_list(*fields, 'count')
+
+def _tag_options(resumes, selected):
+    options = list(_grouped_counts(resumes.filter(tags__isnull=False), 'tags', 'tags__name')[:TAG_FACET_LIMIT])
+    shown = {tag_id for tag_id, _, _ in options}
+    missing = [tag_id for tag_id in selected if tag_id not in shown]
+    if missing:
+        options.extend(_grouped_counts(resumes.filter(tags__in=missing), 'tags', 'tags__name'))
+    return options
+
+def facet_counts(resumes, selection, include_creator):
+    """统计各分面选项的数量，返回模板使用的分面列表"""
+    facets = []
+    for name, label in FACETS:
+        if name == 'creator' and not include_creator:
+            continue
+        base = apply_filters(resumes, selection, skip=name)
+        if name == 'education':
+            counts = dict(_grouped_counts(base, 'education'))
+            options = [(value, text, counts.get(value, 0)) for value, text in Resume.EDUCATION_CHOICES]
+        elif name == 'experience':
+            counts = dict(_grouped_counts(base.annotate(experience_band=_experience_band()), 'experience_band'))
+            options = [(value, text, counts.get(value, 0)) for value, text, _, _ in EXPERIENCE_BANDS]
+        elif name == 'tag':
+            options = _tag_options(base, selection['tag'])
+        else:
+            options = _grouped_counts(base.filter(created_by__isnull=False), 'created_by', 'created_by__username')
+        facets.append({
+            'name': name,
+            'label': label,
+            'options': [
+                {'value': value, 'label': text, 'count': count, 'selected': value in selection[name]}
+                for value, text, count in options
+                if count or value in selection[name]
+            ],
+        })
+    return facets
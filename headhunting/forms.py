@@ -1,6 +1,37 @@
+import copy
 from django import forms
+from django.urls import reverse
 from .models import Company, Project, Resume, ResumeProject, Tag, PaymentRecord, ProjectStatus, ResumeStatus
 
+class TypeaheadSelectMixin:
+    """只渲染已选中的选项，其余选项由页面脚本在输入时从 typeahead 接口加载"""
+    def __init__(self, kind, attrs=None):
+        self.kind = kind
+        super().__init__(attrs)
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-typeahead-url'] = reverse('typeahead', args=[self.kind])
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        choices = self.choices
+        if hasattr(choices, 'queryset'):
+            # 只查询已选中的对象，不再读取整张表
+            selected = [v for v in value if str(v).isdigit()]
+            self.choices = copy.copy(choices)
+            self.choices.queryset = choices.queryset.filter(pk__in=selected)
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = choices
+
+class TypeaheadSelect(TypeaheadSelectMixin, forms.Select):
+    pass
+
+class TypeaheadSelectMultiple(TypeaheadSelectMixin, forms.SelectMultiple):
+    pass
+
 class StatusForm(forms.ModelForm):
     """状态表单基类"""
     class Meta:
@@ -55,7 +86,7 @@ class ProjectForm(forms.ModelForm):
                   'salary_range', 'location', 'status', 'deadline')
         widgets = {
             'title': forms.TextInput(attrs={'class': 'form-control'}),
-            'company': forms.Select(attrs={'class': 'form-control'}),
+            'company': TypeaheadSelect('companies', attrs={'class': 'form-control'}),
             'job_title': forms.TextInput(attrs={'class': 'form-control'}),
             'job_description': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
             'requirements': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
@@ -117,7 +148,7 @@ class ResumeForm(forms.ModelForm):
             'work_exp_3_period': forms.TextInput(attrs={'class': 'form-control', 'placeholder': '例如: 2014年9月 - 2016年2月'}),
             'work_exp_3_description': forms.Textarea(attrs={'class': 'form-control', 'rows': 3}),
             'skills': forms.Textarea(attrs={'class': 'form-control', 'rows': 4}),
-            'tags': forms.SelectMultiple(attrs={'class': 'form-select', 'multiple': 'multiple'}),
+            'tags': TypeaheadSelectMultiple('tags', attrs={'class': 'form-select', 'multiple': 'multiple'}),
             'resume_file': forms.FileInput(attrs={'class': 'form-control'}),
         }
 
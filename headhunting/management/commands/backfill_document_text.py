@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+from headhunting.documents import extract_document_text
+from headhunting.models import Resume, ResumeDocumentText
+from headhunting.utils import get_resume_parser
+
+class Command(BaseCommand):
+    help = '为尚未保存全文的简历文件提取并保存全文（内容相同的文件只提取一次）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=0, help='最多处理的文件数，0表示不限制')
+        parser.add_argument('--dry-run', action='store_true', help='只统计需要提取的文件数')
+
+    def handle(self, *args, **options):
+        hashes = (
+            Resume.objects.exclude(file_hash='')
+            .exclude(file_hash__in=ResumeDocumentText.objects.values('content_hash'))
+            .order_by('file_hash').values_list('file_hash', flat=True).distinct()
+        )
+        if options['limit']:
+            hashes = hashes[:options['limit']]
+        hashes = list(hashes)
+        self.stdout.write(f'需要提取全文的文件 {len(hashes)} 个（未按内容哈希存储的文件请先执行 dedupe_resume_files）')
+        if options['dry_run'] or not hashes:
+            return
+
+        parser = get_resume_parser()
+        extracted = 0
+        failed = 0
+        for content_hash in hashes:
+            resume = Resume.objects.filter(file_hash=content_hash).first()
+            try:
+                extract_document_text(resume, parser)
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f'提取失败: {resume.resume_file.name}: {e}')
+                continue
+            extracted += 1
+            if extracted % 100 == 0:
+                self.stdout.write(f'已提取 {extracted} 个文件')
+
+        self.stdout.write(self.style.SUCCESS(f'提取完成: 成功 {extracted} 个, 失败 {failed} 个'))
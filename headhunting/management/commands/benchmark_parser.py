@@ -0,0 +1,70 @@
+import json
+import os
+import tempfile
+from django.core.management.base import BaseCommand, CommandError
+from headhunting.benchmark import compare_results, generate_corpus, run_benchmark
+from headhunting.utils import get_resume_parser
+
+class Command(BaseCommand):
+    help = '简历解析器基准测试：统计各阶段耗时、吞吐量、内存峰值和字段准确率，可与基线结果比较'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--corpus-dir', help='语料目录，不存在或缺少标准答案时自动生成；默认使用临时目录')
+        parser.add_argument('--count', type=int, default=40, help='生成的简历数量')
+        parser.add_argument('--seed', type=int, default=0, help='语料生成随机种子')
+        parser.add_argument('--repeat', type=int, default=1, help='语料重复解析次数')
+        parser.add_argument('--output', help='结果保存为JSON文件')
+        parser.add_argument('--baseline', help='用于比较的基线结果JSON文件')
+        parser.add_argument('--threshold', type=float, default=0.1, help='判定为性能回退的相对变化幅度')
+        parser.add_argument('--min-delta-ms', type=float, default=1.0, help='判定为阶段耗时回退的最小增加量（毫秒）')
+        parser.add_argument('--fail-on-regression', action='store_true', help='出现回退时以错误退出')
+        parser.add_argument('--use-cache', action='store_true', help='使用解析结果缓存（默认不使用，重复解析时统计实际解析耗时）')
+        parser.add_argument('--no-sandbox', action='store_true', help='在当前进程中解析（默认按 RESUME_PARSER_SANDBOX 配置）')
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline'], encoding='utf-8') as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f'基线结果读取失败: {e}')
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            directory = options['corpus_dir'] or temp_dir
+            if not os.path.exists(os.path.join(directory, 'ground_truth.json')):
+                generate_corpus(directory, options['count'], options['seed'])
+                self.stdout.write(f'已生成 {options["count"]} 份简历: {directory}')
+            parser = get_resume_parser()
+            result = run_benchmark(
+                parser, directory, max(1, options['repeat']),
+                use_cache=options['use_cache'], sandbox=False if options['no_sandbox'] else None,
+            )
+
+        self.print_result(result)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as f:
+                json.dump(result, f, ensure_ascii=False, indent=2)
+            self.stdout.write(f'结果已保存到: {options["output"]}')
+
+        if baseline is not None:
+            regressions = compare_results(result, baseline, options['threshold'], options['min_delta_ms'])
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS('与基线相比没有回退'))
+                return
+            for regression in regressions:
+                self.stdout.write(self.style.WARNING(f'回退: {regression}'))
+            if options['fail_on_regression']:
+                raise CommandError(f'发现 {len(regressions)} 项回退')
+
+    def print_result(self, result):
+        """输出基准测试结果"""
+        self.stdout.write(f'{"阶段":<26}{"次数":>6}{"p50(ms)":>10}{"p95(ms)":>10}{"p99(ms)":>10}')
+        for stage, stats in result['stages'].items():
+            self.stdout.write(
+                f'{stage:<26}{stats["count"]:>6}{stats["p50_ms"]:>10.2f}{stats["p95_ms"]:>10.2f}{stats["p99_ms"]:>10.2f}'
+            )
+        self.stdout.write('字段准确率: ' + ', '.join(f'{field} {value:.1%}' for field, value in result['accuracy'].items()))
+        self.stdout.write(self.style.SUCCESS(
+            f'共 {result["files"]} 个文件（失败 {result["failures"]} 个）, {result["files_per_second"]:.1f} 文件/秒, 内存峰值 {result["peak_rss_mb"]:.0f}MB'
+        ))
@@ -0,0 +1,90 @@
+import random
+import statistics
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from headhunting.models import Resume
+from headhunting.search import exact_lookup
+
+class _Rollback(Exception):
+    pass
+
+class Command(BaseCommand):
+    help = '简历搜索基准测试：在事务中写入模拟简历，比较电话/邮箱模糊匹配与规范化列等值查询的耗时，结束后回滚'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=500000, help='写入的模拟简历数')
+        parser.add_argument('--queries', type=int, default=50, help='每种查询方式执行的次数')
+        parser.add_argument('--seed', type=int, default=0, help='随机种子')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        try:
+            with transaction.atomic():
+                samples = self.populate(rng, options['count'])
+                queries = [self.format_query(rng, phone, email) for phone, email in rng.sample(samples, min(options['queries'], len(samples)))]
+                before = self.report('模糊匹配（icontains）', self.measure(queries, self.icontains_search))
+                after = self.report('等值查询（规范化列）', self.measure(queries, self.exact_search))
+                self.stdout.write(self.style.SUCCESS(f'中位数加速 {before / after:.0f} 倍' if after else '等值查询耗时过短无法计算加速比'))
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def populate(self, rng, count, batch_size=5000):
+        """分批写入模拟简历，返回部分简历的 (电话, 邮箱) 用于查询"""
+        start = time.monotonic()
+        samples = []
+        for offset in range(0, count, batch_size):
+            batch = []
+            for i in range(offset, min(offset + batch_size, count)):
+                phone = f'1{rng.randint(3, 9)}{rng.randrange(10 ** 9):09d}'
+                email = f'user{i}@example{i % 97}.com'
+                resume = Resume(name=f'候选人{i}', gender='male', phone=phone, email=email, education='bachelor')
+                resume.normalize_contacts()
+                batch.append(resume)
+                if rng.random() < 0.001:
+                    samples.append((phone, email))
+            Resume.objects.bulk_create(batch)
+        self.stdout.write(f'写入 {count} 份模拟简历，耗时 {time.monotonic() - start:.1f}秒')
+        return samples
+
+    def format_query(self, rng, phone, email):
+        """模拟粘贴的搜索内容：带分隔符或国家代码的电话、大小写不一的邮箱"""
+        choice = rng.randrange(3)
+        if choice == 0:
+            return f'+86 {phone[:3]}-{phone[3:7]}-{phone[7:]}'
+        if choice == 1:
+            return f'{phone[:3]} {phone[3:7]} {phone[7:]}'
+        return email.upper()
+
+    def icontains_search(self, query):
+        # 原有的搜索方式，电话按输入原样模糊匹配
+        return list(Resume.objects.filter(
+            Q(name__icontains=query) | Q(phone__icontains=query) | Q(email__icontains=query) |
+            Q(current_company__icontains=query) | Q(current_position__icontains=query)
+        ).values_list('id', flat=True))
+
+    def exact_search(self, query):
+        field, value = exact_lookup(query)
+        return list(Resume.objects.filter(**{field: value}).values_list('id', flat=True))
+
+    def measure(self, queries, search):
+        timings = []
+        hits = 0
+        for query in queries:
+            start = time.perf_counter()
+            hits += bool(search(query))
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings, hits
+
+    def report(self, label, result):
+        """输出耗时统计，返回中位数"""
+        timings, hits = result
+        timings = sorted(timings)
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f'{label}: 中位数 {statistics.median(timings):.2f}ms, P95 {p95:.2f}ms, '
+            f'命中 {hits}/{len(timings)}'
+        )
+        return statistics.median(timings)
@@ -0,0 +1,57 @@
+import os
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from headhunting.models import Resume
+from headhunting.storage import StagedFile, content_hash_from_name, hash_file
+
+class Command(BaseCommand):
+    help = '将已有简历文件迁移为按内容哈希命名的存储，相同内容只保留一份，并统计释放的磁盘空间'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='只计算哈希并统计可释放的空间，不修改文件和数据库')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        storage = Resume._meta.get_field('resume_file').storage
+        names = (
+            Resume.objects.exclude(resume_file='').exclude(resume_file__isnull=True)
+            .order_by().values_list('resume_file', flat=True).distinct()
+        )
+        legacy_names = [name for name in names if not content_hash_from_name(name)]
+        self.stdout.write(f'待迁移文件 {len(legacy_names)} 个')
+
+        migrated = 0
+        missing = 0
+        freed = 0
+        seen_hashes = set()
+        for name in legacy_names:
+            path = storage.path(name)
+            if not os.path.exists(path):
+                missing += 1
+                self.stderr.write(f'文件不存在: {name}')
+                continue
+            size = os.path.getsize(path)
+            with open(path, 'rb') as f:
+                content_hash = hash_file(f)
+            new_name = storage.content_name(name, content_hash)
+            # 内容已存在（之前迁移过或本次已迁移）时，旧文件的空间全部释放
+            if content_hash in seen_hashes or storage.exists(new_name):
+                freed += size
+            seen_hashes.add(content_hash)
+            if dry_run:
+                continue
+
+            # 同一文件系统内直接重命名，内容已存在时保留已有文件
+            with open(path, 'rb') as f:
+                saved_name = storage.save(name, StagedFile(f, name=name))
+            with transaction.atomic():
+                Resume.objects.filter(resume_file=name, file_name='').update(file_name=os.path.basename(name)[:255])
+                Resume.objects.filter(resume_file=name).update(resume_file=saved_name, file_hash=content_hash)
+            if os.path.exists(path):
+                os.remove(path)
+            migrated += 1
+
+        action = '可释放' if dry_run else '已释放'
+        self.stdout.write(self.style.SUCCESS(
+            f'迁移完成: 迁移 {migrated} 个文件, 缺失 {missing} 个, {action} {freed / 1024 / 1024:.2f}MB'
+        ))
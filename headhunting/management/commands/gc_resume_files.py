@@ -0,0 +1,103 @@
+import os
+import time
+from django.core.management.base import BaseCommand
+from headhunting.models import Resume
+from headhunting.storage import content_hash_from_name
+
+class Command(BaseCommand):
+    help = '清理简历文件目录中没有被任何简历引用的孤立文件'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='只列出孤立文件，不删除')
+        parser.add_argument('--grace-hours', type=float, default=24, help='只处理修改时间早于该小时数的文件，避免误删刚上传的文件')
+        parser.add_argument('--batch-size', type=int, default=500, help='每次查询数据库核对的文件数')
+        parser.add_argument('--directory', default='resume_files', help='存储中要清理的目录')
+
+    def handle(self, *args, **options):
+        storage = Resume._meta.get_field('resume_file').storage
+        root = storage.path(options['directory'])
+        if not os.path.isdir(root):
+            self.stdout.write(f'目录不存在: {root}')
+            return
+        self.storage_root = storage.path('')
+        # 简历文件目录中同一内容可能以不同扩展名保存为多个文件，需按文件名核对；
+        # 其他目录（如 resume_previews）中按内容哈希命名的文件只要有简历引用该内容即保留
+        upload_to = Resume._meta.get_field('resume_file').upload_to.strip('/')
+        self.resume_file_prefix = upload_to + '/'
+        self.dry_run = options['dry_run']
+        self.verbosity = options['verbosity']
+        cutoff = time.time() - options['grace_hours'] * 3600
+        batch_size = max(1, options['batch_size'])
+
+        self.scanned = 0
+        self.orphans = 0
+        self.freed = 0
+        batch = []
+        for path, stat in self.iter_files(root):
+            self.scanned += 1
+            if stat.st_mtime > cutoff:
+                continue
+            batch.append((path, stat.st_size))
+            if len(batch) >= batch_size:
+                self.collect(batch)
+                batch = []
+        self.collect(batch)
+
+        action = '可清理' if self.dry_run else '已清理'
+        self.stdout.write(self.style.SUCCESS(
+            f'共扫描 {self.scanned} 个文件, {action}孤立文件 {self.orphans} 个, 共 {self.freed / 1024 / 1024:.2f}MB'
+        ))
+
+    def iter_files(self, directory):
+        """逐个产出目录下的文件路径和stat信息，不一次性列出全部文件"""
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from self.iter_files(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    yield entry.path, entry.stat(follow_symlinks=False)
+
+    def collect(self, batch):
+        """用一次查询核对一批文件的引用，删除未被引用的文件"""
+        if not batch:
+            return
+        names = {}
+        for path, size in batch:
+            name = os.path.relpath(path, self.storage_root).replace(os.sep, '/')
+            names[name] = (path, size)
+
+        # 按内容哈希命名的文件走file_hash索引，其他文件按文件名核对
+        hashes = {}
+        legacy_names = []
+        for name in names:
+            content_hash = content_hash_from_name(name)
+            if content_hash:
+                hashes[name] = content_hash
+            else:
+                legacy_names.append(name)
+        referenced = set()
+        referenced_hashes = set()
+        if hashes:
+            rows = Resume.objects.filter(file_hash__in=set(hashes.values())).values_list('file_hash', 'resume_file').distinct()
+            for content_hash, resume_file in rows:
+                referenced_hashes.add(content_hash)
+                referenced.add(resume_file)
+        if legacy_names:
+            referenced.update(
+                Resume.objects.filter(resume_file__in=legacy_names).values_list('resume_file', flat=True).distinct()
+            )
+
+        for name, (path, size) in names.items():
+            if name in referenced:
+                continue
+            if name in hashes and not name.startswith(self.resume_file_prefix) and hashes[name] in referenced_hashes:
+                continue
+            self.orphans += 1
+            self.freed += size
+            if self.verbosity >= 2 or self.dry_run:
+                self.stdout.write(name)
+            if not self.dry_run:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
@@ -0,0 +1,189 @@
+import csv
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from django.apps import apps
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from accounts.models import User
+from headhunting.models import Resume, ResumeDocumentText
+from headhunting.previews import generate_preview
+from headhunting.search import index_resumes
+from headhunting.storage import content_hash_from_name
+from headhunting.utils import PARSER_VERSION, get_resume_parser, normalize_document_text, parsed_to_resume_fields
+
+RESUME_EXTENSIONS = ('.pdf', '.doc', '.docx')
+
+def _init_worker():
+    """进程池初始化：每个进程加载一次共享解析器"""
+    if not apps.ready:
+        import django
+        django.setup()
+    get_resume_parser()
+
+def _parse_batch(paths, pipe_batch_size):
+    """在子进程中解析一批文件，返回 (路径, 解析结果, 全文, 错误信息) 列表"""
+    parser = get_resume_parser()
+    results = []
+    texts = []
+    text_paths = []
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                texts.append(parser.extract_text(File(f, name=os.path.basename(path))))
+            text_paths.append(path)
+        except Exception as e:
+            results.append((path, None, None, f'文件读取失败: {e}'))
+
+    if texts:
+        try:
+            parsed_list = parser.parse_texts(texts, batch_size=pipe_batch_size)
+        except Exception as e:
+            results.extend((path, None, None, f'信息提取失败: {e}') for path in text_paths)
+        else:
+            results.extend((path, parsed, text, None) for path, parsed, text in zip(text_paths, parsed_list, texts))
+    return results
+
+class Command(BaseCommand):
+    help = '从目录批量导入PDF/Word简历文件，多进程解析并批量写入数据库'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory', help='简历文件所在目录，会递归遍历子目录')
+        parser.add_argument('--user', help='导入简历的创建人邮箱')
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='解析进程数')
+        parser.add_argument('--batch-size', type=int, default=200, help='每次批量写入数据库的简历数')
+        parser.add_argument('--parse-batch-size', type=int, default=16, help='每个解析任务包含的文件数（nlp.pipe批大小）')
+        parser.add_argument('--progress-file', help='导入进度文件，默认为目录下的 .import_resumes.progress')
+        parser.add_argument('--error-report', help='解析失败文件报告（CSV），默认为目录下的 .import_resumes.errors.csv')
+
+    def handle(self, *args, **options):
+        directory = os.path.abspath(options['directory'])
+        if not os.path.isdir(directory):
+            raise CommandError(f'目录不存在: {directory}')
+
+        self.user = None
+        if options['user']:
+            try:
+                self.user = User.objects.get(email=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f'用户不存在: {options["user"]}')
+
+        progress_path = options['progress_file'] or os.path.join(directory, '.import_resumes.progress')
+        error_path = options['error_report'] or os.path.join(directory, '.import_resumes.errors.csv')
+        batch_size = max(1, options['batch_size'])
+        parse_batch_size = max(1, options['parse_batch_size'])
+
+        done = self.load_progress(progress_path)
+        paths = [path for path in self.iter_resume_files(directory) if os.path.relpath(path, directory) not in done]
+        skipped = len(done)
+        self.stdout.write(f'待导入 {len(paths)} 个文件，已导入跳过 {skipped} 个')
+        if not paths:
+            return
+
+        self.directory = directory
+        self.pending = []
+        self.imported = 0
+        self.failed = 0
+        start = time.monotonic()
+
+        # 子进程不能复用父进程的数据库连接
+        connections.close_all()
+        chunks = [paths[i:i + parse_batch_size] for i in range(0, len(paths), parse_batch_size)]
+        with open(progress_path, 'a', encoding='utf-8') as self.progress_file, \
+                open(error_path, 'a', encoding='utf-8', newline='') as error_file, \
+                ProcessPoolExecutor(max_workers=max(1, options['workers']), initializer=_init_worker) as executor:
+            self.error_writer = csv.writer(error_file)
+            futures = [executor.submit(_parse_batch, chunk, parse_batch_size) for chunk in chunks]
+            for future in as_completed(futures):
+                for path, parsed, text, error in future.result():
+                    if error:
+                        self.record_error(path, error)
+                        continue
+                    try:
+                        self.pending.append((path, self.build_resume(path, parsed), text))
+                    except Exception as e:
+                        self.record_error(path, f'文件保存失败: {e}')
+                if len(self.pending) >= batch_size:
+                    self.flush()
+            self.flush()
+
+        elapsed = time.monotonic() - start
+        total = self.imported + self.failed
+        self.stdout.write(self.style.SUCCESS(
+            f'导入完成: 成功 {self.imported} 个, 失败 {self.failed} 个, 跳过 {skipped} 个, '
+            f'耗时 {elapsed:.1f}秒, {total / elapsed if elapsed else 0:.1f} 文件/秒'
+        ))
+        if self.failed:
+            self.stdout.write(self.style.WARNING(f'失败文件已记录到: {error_path}'))
+
+    def iter_resume_files(self, directory):
+        """递归遍历目录下的简历文件"""
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for filename in sorted(files):
+                if os.path.splitext(filename)[1].lower() in RESUME_EXTENSIONS:
+                    yield os.path.join(root, filename)
+
+    def load_progress(self, progress_path):
+        """读取已导入文件列表（相对路径，每行一个）"""
+        if not os.path.exists(progress_path):
+            return set()
+        with open(progress_path, encoding='utf-8') as f:
+            return {line.rstrip('\n') for line in f if line.strip()}
+
+    def build_resume(self, path, parsed):
+        """保存简历文件并构造未入库的Resume对象"""
+        fields = parsed_to_resume_fields(parsed)
+        if not fields['name']:
+            fields['name'] = os.path.splitext(os.path.basename(path))[0]
+        fields['name'] = fields['name'][:50]
+        fields['phone'] = fields['phone'][:20]
+        fields['email'] = fields['email'][:254]
+        parsed_fields = {name: fields[name] for name in Resume.PARSED_FIELDS}
+        storage = Resume._meta.get_field('resume_file').storage
+        with open(path, 'rb') as f:
+            file_name = storage.save(os.path.join('resume_files', os.path.basename(path)), File(f))
+        # bulk_create不会调用Resume.save()，在这里填写文件哈希和原始文件名
+        resume = Resume(
+            resume_file=file_name,
+            file_hash=content_hash_from_name(file_name),
+            file_name=os.path.basename(path)[:255],
+            parser_version=PARSER_VERSION,
+            parsed_fields=parsed_fields,
+            created_by=self.user,
+            **fields
+        )
+        resume.normalize_contacts()
+        return resume
+
+    def flush(self):
+        """批量写入简历并记录进度"""
+        if not self.pending:
+            return
+        with transaction.atomic():
+            Resume.objects.bulk_create([resume for _, resume, _ in self.pending])
+            # bulk_create不会发送post_save信号，在这里写入全文索引
+            index_resumes([resume for _, resume, _ in self.pending])
+            # 保存解析时提取的全文，内容相同的文件已保存过时跳过
+            ResumeDocumentText.objects.bulk_create([
+                ResumeDocumentText(content_hash=resume.file_hash, text=text, char_count=len(text))
+                for resume, text in {
+                    resume.file_hash: (resume, normalize_document_text(text)) for _, resume, text in self.pending
+                }.values()
+            ], ignore_conflicts=True)
+        # bulk_create不会发送post_save信号，在这里生成Word简历预览
+        for _, resume, _ in self.pending:
+            generate_preview(resume)
+        for path, _, _ in self.pending:
+            self.progress_file.write(os.path.relpath(path, self.directory) + '\n')
+        self.progress_file.flush()
+        self.imported += len(self.pending)
+        self.stdout.write(f'已导入 {self.imported} 个文件')
+        self.pending = []
+
+    def record_error(self, path, error):
+        """记录解析失败的文件"""
+        self.failed += 1
+        self.error_writer.writerow([os.path.relpath(path, self.directory), error])
+        self.stderr.write(f'{path}: {error}')
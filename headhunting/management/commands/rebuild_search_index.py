@@ -0,0 +1,20 @@
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from headhunting.models import Resume
+from headhunting.search import create_index_table, is_enabled, rebuild_index
+
+class Command(BaseCommand):
+    help = '重建简历全文索引（仅SQLite）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='每次写入索引的简历数')
+
+    def handle(self, *args, **options):
+        if not is_enabled():
+            raise CommandError('当前数据库未启用全文索引（仅支持SQLite）')
+        start = time.monotonic()
+        with transaction.atomic(), connection.cursor() as cursor:
+            create_index_table(cursor)
+            total = rebuild_index(Resume.objects.all(), max(1, options['batch_size']), cursor)
+        self.stdout.write(self.style.SUCCESS(f'索引重建完成: {total} 份简历, 耗时 {time.monotonic() - start:.1f}秒'))
@@ -0,0 +1,173 @@
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from django.conf import settings
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from headhunting.management.commands.import_resumes import _init_worker
+from headhunting.models import ParseResultCache, Resume, ResumeDocumentText
+from headhunting.search import SOURCE_FIELDS, index_resumes
+from headhunting.utils import (
+    PARSER_VERSION, get_resume_parser, parsed_to_resume_fields, store_cached_result, store_document_text
+)
+
+UPDATE_FIELDS = list(Resume.PARSED_FIELDS) + ['phone_normalized', 'email_normalized', 'parsed_fields', 'parser_version']
+
+def _parse_items(items, pipe_batch_size):
+    """在子进程中解析一批文件
+
+    items为 (内容哈希, 已保存的全文, 文件路径) 列表，没有全文时从文件提取。
+    返回 (内容哈希, 解析结果, 新提取的全文, 错误信息) 列表。
+    """
+    parser = get_resume_parser()
+    results = []
+    parse_items = []
+    for content_hash, text, path in items:
+        new_text = None
+        if text is None:
+            try:
+                with open(path, 'rb') as f:
+                    text = new_text = parser.extract_text(File(f, name=os.path.basename(path)))
+            except Exception as e:
+                results.append((content_hash, None, None, f'文件读取失败: {e}'))
+                continue
+        parse_items.append((content_hash, text, new_text))
+
+    if parse_items:
+        try:
+            parsed_list = parser.parse_texts([text for _, text, _ in parse_items], batch_size=pipe_batch_size)
+        except Exception as e:
+            results.extend((content_hash, None, None, f'信息提取失败: {e}') for content_hash, _, _ in parse_items)
+        else:
+            results.extend(
+                (content_hash, parsed, new_text, None)
+                for (content_hash, _, new_text), parsed in zip(parse_items, parsed_list)
+            )
+    return results
+
+class Command(BaseCommand):
+    help = '用当前版本的解析器重新提取旧版本解析的简历信息，人工修改过的字段保持不变（可中断后继续）'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='解析进程数')
+        parser.add_argument('--batch-size', type=int, default=200, help='每批处理并写入数据库的简历数')
+        parser.add_argument('--parse-batch-size', type=int, default=16, help='nlp.pipe批大小')
+        parser.add_argument('--checkpoint', help='进度文件，默认为项目目录下的 .reextract_resumes.checkpoint')
+        parser.add_argument('--restart', action='store_true', help='忽略进度文件从头处理（重试之前失败的简历）')
+        parser.add_argument('--dry-run', action='store_true', help='只统计需要重新提取的简历数')
+
+    def handle(self, *args, **options):
+        checkpoint_path = options['checkpoint'] or os.path.join(settings.BASE_DIR, '.reextract_resumes.checkpoint')
+        last_id = 0 if options['restart'] else self.load_checkpoint(checkpoint_path)
+        batch_size = max(1, options['batch_size'])
+        workers = max(1, options['workers'])
+
+        queryset = Resume.objects.exclude(parser_version=PARSER_VERSION).exclude(file_hash='')
+        total = queryset.filter(id__gt=last_id).count()
+        self.stdout.write(f'需要重新提取 {total} 份简历（解析器版本 {PARSER_VERSION}），从ID {last_id} 之后开始')
+        if options['dry_run'] or not total:
+            return
+
+        self.updated = 0
+        self.changed = 0
+        self.kept = 0
+        self.failed = 0
+        start = time.monotonic()
+
+        # 子进程不能复用父进程的数据库连接
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            # 按顺序写入结果，进度文件中的ID之前的简历都已处理完
+            in_flight = deque()
+            for batch in self.iter_batches(queryset, last_id, batch_size):
+                cached, items = self.prepare(batch)
+                future = executor.submit(_parse_items, items, options['parse_batch_size']) if items else None
+                in_flight.append((batch, cached, future))
+                if len(in_flight) >= workers * 2:
+                    self.apply(*in_flight.popleft(), checkpoint_path=checkpoint_path)
+            while in_flight:
+                self.apply(*in_flight.popleft(), checkpoint_path=checkpoint_path)
+
+        elapsed = time.monotonic() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'重新提取完成: 更新 {self.updated} 份简历（{self.changed} 个字段有变化，'
+            f'{self.kept} 个人工修改的字段保持不变）, 失败 {self.failed} 份, 耗时 {elapsed:.1f}秒'
+        ))
+
+    def load_checkpoint(self, path):
+        """读取上次处理到的简历ID，解析器版本不同时从头开始"""
+        try:
+            with open(path, encoding='utf-8') as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if checkpoint.get('parser_version') != PARSER_VERSION:
+            return 0
+        return checkpoint.get('last_id', 0)
+
+    def save_checkpoint(self, path, last_id):
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump({'parser_version': PARSER_VERSION, 'last_id': last_id}, f)
+        os.replace(temp_path, path)
+
+    def iter_batches(self, queryset, last_id, batch_size):
+        """按ID顺序分批读取需要处理的简历"""
+        while True:
+            batch = list(queryset.filter(id__gt=last_id).order_by('id').only('id', 'file_hash', 'resume_file')[:batch_size])
+            if not batch:
+                return
+            yield batch
+            last_id = batch[-1].id
+
+    def prepare(self, batch):
+        """查询已缓存的解析结果和已保存的全文，返回 (缓存的解析结果, 需要解析的文件)"""
+        hashes = {resume.file_hash for resume in batch}
+        cached = dict(ParseResultCache.objects.filter(
+            content_hash__in=hashes, parser_version=PARSER_VERSION
+        ).values_list('content_hash', 'result'))
+        missing = hashes - cached.keys()
+        texts = dict(ResumeDocumentText.objects.filter(content_hash__in=missing).values_list('content_hash', 'text'))
+        paths = {}
+        for resume in batch:
+            if resume.file_hash in missing:
+                paths.setdefault(resume.file_hash, resume.resume_file.path)
+        return cached, [(content_hash, texts.get(content_hash), path) for content_hash, path in paths.items()]
+
+    def apply(self, batch, cached, future, checkpoint_path):
+        """保存解析结果并批量更新简历"""
+        results = dict(cached)
+        for content_hash, parsed, new_text, error in (future.result() if future else []):
+            if error:
+                self.stderr.write(f'解析失败: {content_hash}: {error}')
+                continue
+            if new_text is not None:
+                store_document_text(content_hash, new_text)
+            store_cached_result(content_hash, parsed)
+            results[content_hash] = parsed
+
+        with transaction.atomic():
+            # 在事务中重新读取，不会覆盖处理期间的人工修改
+            resumes = list(
+                Resume.objects.select_for_update()
+                .filter(id__in=[resume.id for resume in batch], file_hash__in=results.keys())
+                .only('id', 'file_hash', *UPDATE_FIELDS, *SOURCE_FIELDS)
+            )
+            for resume in resumes:
+                fields = parsed_to_resume_fields(results[resume.file_hash])
+                fields['name'] = fields['name'][:50]
+                fields['phone'] = fields['phone'][:20]
+                fields['email'] = fields['email'][:254]
+                self.kept += len(resume.edited_fields())
+                self.changed += len(resume.apply_parsed_fields(fields, PARSER_VERSION))
+                resume.normalize_contacts()
+            Resume.objects.bulk_update(resumes, UPDATE_FIELDS)
+            index_resumes(resumes)
+
+        self.updated += len(resumes)
+        self.failed += len(batch) - len(resumes)
+        self.save_checkpoint(checkpoint_path, batch[-1].id)
+        self.stdout.write(f'已处理到简历ID {batch[-1].id}，更新 {self.updated} 份')
@@ -0,0 +1,185 @@
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing.connection import wait
+from django.conf import settings
+from django.core.files import File
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection, connections
+from headhunting.metrics import registry as metrics
+from headhunting.models import ParseJob
+from headhunting.utils import ResumeParseError, get_resume_parser
+
+class Command(BaseCommand):
+    help = '运行简历解析任务处理进程，领取待处理的解析任务并保存解析结果'
+
+    # 在子进程中解析时，多个并发以fork出的单线程进程运行：在多线程进程中fork，
+    # 子进程可能继承其他线程持有的锁（日志、数据库驱动等）而死锁
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int,
+            default=getattr(settings, 'RESUME_PARSE_WORKER_CONCURRENCY', 2),
+            help='并发处理的任务数'
+        )
+        parser.add_argument(
+            '--poll-interval', type=float,
+            default=getattr(settings, 'RESUME_PARSE_WORKER_POLL_INTERVAL', 1.0),
+            help='没有任务时的轮询间隔（秒）'
+        )
+        parser.add_argument('--once', action='store_true', help='处理完当前所有任务后退出')
+        parser.add_argument('--metrics-file', help='定期将解析指标写入该JSON文件')
+        parser.add_argument('--metrics-interval', type=float, default=60.0, help='写入解析指标的间隔（秒）')
+
+    def handle(self, *args, **options):
+        self.lease_seconds = getattr(settings, 'RESUME_PARSE_JOB_LEASE', 600)
+        self.retry_delay = getattr(settings, 'RESUME_PARSE_JOB_RETRY_DELAY', 30)
+        self.sandbox = getattr(settings, 'RESUME_PARSE_WORKER_SANDBOX', True)
+        concurrency = max(1, options['concurrency'])
+        use_processes = self.sandbox and concurrency > 1 and 'fork' in multiprocessing.get_all_start_methods()
+        self.result_conn = None
+        self.stop_event = multiprocessing.get_context('fork').Event() if use_processes else threading.Event()
+        self.metrics_file = options['metrics_file']
+        self.metrics_interval = options['metrics_interval']
+        self.metrics_lock = threading.Lock()
+        self.metrics_dumped_at = time.monotonic()
+        worker_prefix = f'{socket.gethostname()}:{os.getpid()}'
+
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda signum, frame: self.stop_event.set())
+
+        # 在领取任务前加载模型，避免第一个任务承担加载时间
+        get_resume_parser()
+        self.stdout.write(self.style.SUCCESS(
+            f'解析任务处理进程已启动: {worker_prefix}, 并发数: {concurrency}{"（多进程）" if use_processes else ""}'
+        ))
+
+        worker_ids = [f'{worker_prefix}:{i}' for i in range(concurrency)]
+        if use_processes:
+            processed = self.run_processes(worker_ids, options['poll_interval'], options['once'])
+        elif concurrency == 1:
+            processed = self.work_loop(worker_ids[0], options['poll_interval'], options['once'])
+        else:
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                futures = [
+                    executor.submit(self.work_loop, worker_id, options['poll_interval'], options['once'])
+                    for worker_id in worker_ids
+                ]
+                processed = sum(future.result() for future in futures)
+
+        if self.metrics_file:
+            metrics.dump(self.metrics_file)
+        self.stdout.write(self.style.SUCCESS(f'解析任务处理进程已退出，共处理 {processed} 个任务'))
+
+    def run_processes(self, worker_ids, poll_interval, once):
+        """每个并发fork出一个单线程的处理进程，合并各进程的指标和处理数，返回处理的任务数"""
+        context = multiprocessing.get_context('fork')
+        # 子进程不能复用父进程的数据库连接
+        connections.close_all()
+        readers = {}
+        processes = []
+        for worker_id in worker_ids:
+            # Pipe发送时不启动后台线程（Queue会），处理进程始终只有一个线程
+            reader, writer = context.Pipe(duplex=False)
+            process = context.Process(target=self.process_main, args=(writer, worker_id, poll_interval, once), name=worker_id)
+            process.start()
+            writer.close()
+            readers[reader] = process
+            processes.append(process)
+
+        processed = 0
+        while readers:
+            for reader in wait(list(readers), timeout=1.0):
+                try:
+                    kind, value = reader.recv()
+                except EOFError:
+                    # 处理进程已退出
+                    del readers[reader]
+                    continue
+                if kind == 'metrics':
+                    metrics.merge(value)
+                else:
+                    processed += value
+            self.dump_metrics()
+        for process in processes:
+            process.join()
+            if process.exitcode:
+                self.stderr.write(f'处理进程 {process.name} 异常退出，退出码: {process.exitcode}')
+        return processed
+
+    def process_main(self, result_conn, worker_id, poll_interval, once):
+        """fork出的处理进程：只在主线程中处理任务，指标增量和处理数发送给父进程"""
+        self.result_conn = result_conn
+        processed = 0
+        try:
+            processed = self.work_loop(worker_id, poll_interval, once)
+        finally:
+            result_conn.send(('metrics', metrics.export()))
+            result_conn.send(('processed', processed))
+            result_conn.close()
+
+    def work_loop(self, worker_id, poll_interval, once):
+        """单个处理线程的主循环"""
+        processed = 0
+        try:
+            while not self.stop_event.is_set():
+                close_old_connections()
+                job = ParseJob.objects.claim_next(worker_id, self.lease_seconds)
+                if job is None:
+                    if once:
+                        break
+                    self.stop_event.wait(poll_interval)
+                    continue
+                self.run_job(job)
+                processed += 1
+                self.dump_metrics()
+        finally:
+            connection.close()
+        return processed
+
+    def dump_metrics(self):
+        """距上次写入超过间隔时写入解析指标文件"""
+        if not self.metrics_file:
+            return
+        with self.metrics_lock:
+            if time.monotonic() - self.metrics_dumped_at < self.metrics_interval:
+                return
+            self.metrics_dumped_at = time.monotonic()
+            if self.result_conn is not None:
+                # 多进程模式下由父进程合并各处理进程的指标后写入，处理进程只发送上次发送后的增量
+                self.result_conn.send(('metrics', metrics.export()))
+                metrics.reset()
+                return
+            try:
+                metrics.dump(self.metrics_file)
+            except OSError as e:
+                self.stderr.write(f'解析指标写入失败: {e}')
+
+    def run_job(self, job):
+        """执行一个解析任务"""
+        start = time.monotonic()
+        try:
+            with open(job.file_path, 'rb') as f:
+                result = get_resume_parser().parse_file(
+                    File(f, name=job.file_name), sandbox=self.sandbox, file_type=job.file_type or None
+                )
+        except FileNotFoundError:
+            # 暂存文件已被保存为简历或已过期清理
+            job.mark_failed('暂存文件不存在', self.retry_delay, error_code='missing', retryable=False)
+            self.stderr.write(f'任务 {job.id} 的暂存文件不存在: {job.file_path}')
+            return
+        except ResumeParseError as e:
+            # 超出内存上限、崩溃等失败重试也不会成功，直接标记为失败；超时按尝试次数重试
+            job.mark_failed(str(e), self.retry_delay, error_code=e.code, retryable=e.retryable)
+            self.stderr.write(f'任务 {job.id} 解析失败（{e.code}）: {e}')
+            return
+        except Exception as e:
+            job.mark_failed(str(e), self.retry_delay)
+            self.stderr.write(f'任务 {job.id} 解析失败（第{job.attempts}次）: {e}')
+            return
+        job.mark_succeeded(result)
+        self.stdout.write(f'任务 {job.id} 解析完成，耗时 {time.monotonic() - start:.2f}秒')
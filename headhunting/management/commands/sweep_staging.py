@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from headhunting.staging import get_staging_dir, sweep_expired
+
+class Command(BaseCommand):
+    help = '清理上传暂存区中已过期的暂存文件'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='只统计，不删除')
+
+    def handle(self, *args, **options):
+        removed, freed = sweep_expired(dry_run=options['dry_run'])
+        action = '可清理' if options['dry_run'] else '已清理'
+        self.stdout.write(self.style.SUCCESS(
+            f'{get_staging_dir()}: {action} {removed} 个过期暂存文件, 共 {freed / 1024 / 1024:.1f}MB'
+        ))
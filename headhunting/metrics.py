@@ -0,0 +1,180 @@
+"""简历解析指标：进程内的计时器和计数器，可导出为JSON或Prometheus文本格式"""
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+from django.conf import settings
+
+# 计时器分桶上限（秒）
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
+
+# 文件大小分桶上限（字节）
+SIZE_BUCKETS = ((100 * 1024, '100KB'), (1024 * 1024, '1MB'), (10 * 1024 * 1024, '10MB'))
+
+_NOOP_TIMER = nullcontext()
+
+def size_bucket(size):
+    """文件大小所属的分桶标签"""
+    for limit, label in SIZE_BUCKETS:
+        if size <= limit:
+            return f'le_{label}'
+    return f'gt_{SIZE_BUCKETS[-1][1]}'
+
+class _Timer:
+    """记录代码块耗时的上下文管理器"""
+    __slots__ = ('registry', 'key', 'start')
+
+    def __init__(self, registry, key):
+        self.registry = registry
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry.observe(self.key, time.perf_counter() - self.start)
+        return False
+
+class MetricsRegistry:
+    """线程安全的指标注册表，未启用时计时和计数都不做任何事"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._timers = {}
+
+    @staticmethod
+    def _key(name, labels):
+        return (name, tuple(sorted(labels.items()))) if labels else (name, ())
+
+    def timer(self, name, **labels):
+        """计时上下文管理器：with registry.timer('stage', stage='decode'): ..."""
+        if not self.enabled:
+            return _NOOP_TIMER
+        return _Timer(self, self._key(name, labels))
+
+    def observe(self, key, seconds):
+        """记录一次耗时"""
+        with self._lock:
+            stats = self._timers.get(key)
+            if stats is None:
+                stats = self._timers[key] = {'count': 0, 'sum': 0.0, 'max': 0.0, 'buckets': [0] * len(DURATION_BUCKETS)}
+            stats['count'] += 1
+            stats['sum'] += seconds
+            if seconds > stats['max']:
+                stats['max'] = seconds
+            for i, limit in enumerate(DURATION_BUCKETS):
+                if seconds <= limit:
+                    stats['buckets'][i] += 1
+                    break
+
+    def inc(self, name, value=1, **labels):
+        """计数器加value"""
+        if not self.enabled:
+            return
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timers.clear()
+
+    def _after_fork(self):
+        """fork出的子进程重建锁并清空指标，子进程只统计自己的增量"""
+        self._lock = threading.Lock()
+        self._counters.clear()
+        self._timers.clear()
+
+    def export(self):
+        """导出原始指标数据，用于从子进程传回父进程合并"""
+        with self._lock:
+            return {
+                'counters': dict(self._counters),
+                'timers': {key: dict(stats, buckets=list(stats['buckets'])) for key, stats in self._timers.items()},
+            }
+
+    def merge(self, state):
+        """合并 export() 导出的指标数据"""
+        if not self.enabled or not state:
+            return
+        with self._lock:
+            for key, value in state['counters'].items():
+                self._counters[key] = self._counters.get(key, 0) + value
+            for key, other in state['timers'].items():
+                stats = self._timers.get(key)
+                if stats is None:
+                    self._timers[key] = dict(other, buckets=list(other['buckets']))
+                    continue
+                stats['count'] += other['count']
+                stats['sum'] += other['sum']
+                stats['max'] = max(stats['max'], other['max'])
+                stats['buckets'] = [a + b for a, b in zip(stats['buckets'], other['buckets'])]
+
+    def snapshot(self):
+        """导出当前指标，返回可序列化为JSON的字典"""
+        with self._lock:
+            counters = [
+                {'name': name, 'labels': dict(labels), 'value': value}
+                for (name, labels), value in sorted(self._counters.items())
+            ]
+            timers = [
+                {
+                    'name': name, 'labels': dict(labels), 'count': stats['count'],
+                    'sum': stats['sum'], 'max': stats['max'],
+                    'avg': stats['sum'] / stats['count'] if stats['count'] else 0.0,
+                }
+                for (name, labels), stats in sorted(self._timers.items())
+            ]
+        return {'enabled': self.enabled, 'counters': counters, 'timers': timers}
+
+    def dump(self, path):
+        """将当前指标写入JSON文件"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+    def to_prometheus(self, prefix='resume_parser', gauges=None):
+        """导出为Prometheus文本格式，gauges为额外输出的 {名称: 数值}"""
+        def format_labels(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items:
+                return ''
+            return '{' + ','.join(f'{key}="{value}"' for key, value in items) + '}'
+
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            timers = sorted((key, dict(stats, buckets=list(stats['buckets']))) for key, stats in self._timers.items())
+
+        for name in sorted({name for (name, _), _ in counters}):
+            lines.append(f'# TYPE {prefix}_{name}_total counter')
+            for (counter_name, labels), value in counters:
+                if counter_name == name:
+                    lines.append(f'{prefix}_{name}_total{format_labels(labels)} {value}')
+
+        for name in sorted({name for (name, _), _ in timers}):
+            lines.append(f'# TYPE {prefix}_{name}_seconds histogram')
+            for (timer_name, labels), stats in timers:
+                if timer_name != name:
+                    continue
+                cumulative = 0
+                for limit, count in zip(DURATION_BUCKETS, stats['buckets']):
+                    cumulative += count
+                    lines.append(f'{prefix}_{name}_seconds_bucket{format_labels(labels, [("le", limit)])} {cumulative}')
+                lines.append(f'{prefix}_{name}_seconds_bucket{format_labels(labels, [("le", "+Inf")])} {stats["count"]}')
+                lines.append(f'{prefix}_{name}_seconds_sum{format_labels(labels)} {stats["sum"]:.6f}')
+                lines.append(f'{prefix}_{name}_seconds_count{format_labels(labels)} {stats["count"]}')
+
+        for name, value in (gauges or {}).items():
+            lines.append(f'# TYPE {prefix}_{name} gauge')
+            lines.append(f'{prefix}_{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+registry = MetricsRegistry(enabled=getattr(settings, 'RESUME_PARSER_METRICS_ENABLED', True))
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=registry._after_fork)
@@ -0,0 +1,43 @@
+# Generated by Django 5.2 on 2026-10-18 02:25
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('headhunting', '0004_resumebookmark'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParseJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', '等待中'), ('running', '解析中'), ('succeeded', '解析成功'), ('failed', '解析失败')], default='pending', max_length=20, verbose_name='状态')),
+                ('file_path', models.CharField(max_length=500, verbose_name='暂存文件路径')),
+                ('file_name', models.CharField(max_length=255, verbose_name='原始文件名')),
+                ('result', models.JSONField(blank=True, null=True, verbose_name='解析结果')),
+                ('error', models.TextField(blank=True, default='', verbose_name='错误信息')),
+                ('attempts', models.IntegerField(default=0, verbose_name='已尝试次数')),
+                ('max_attempts', models.IntegerField(default=3, verbose_name='最大尝试次数')),
+                ('available_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='可执行时间')),
+                ('locked_by', models.CharField(blank=True, default='', max_length=100, verbose_name='处理进程')),
+                ('started_at', models.DateTimeField(blank=True, null=True, verbose_name='开始时间')),
+                ('finished_at', models.DateTimeField(blank=True, null=True, verbose_name='完成时间')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='更新时间')),
+                ('created_by', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='parse_jobs', to=settings.AUTH_USER_MODEL, verbose_name='创建人')),
+            ],
+            options={
+                'verbose_name': '简历解析任务',
+                'verbose_name_plural': '简历解析任务',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['status', 'available_at'], name='parsejob_status_available_idx')],
+            },
+        ),
+    ]
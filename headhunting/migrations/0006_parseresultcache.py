@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 02:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('headhunting', '0005_parsejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ParseResultCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, verbose_name='文件内容哈希')),
+                ('parser_version', models.CharField(max_length=20, verbose_name='解析器版本')),
+                ('result', models.JSONField(verbose_name='解析结果')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+            ],
+            options={
+                'verbose_name': '解析结果缓存',
+                'verbose_name_plural': '解析结果缓存',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['parser_version'], name='parsecache_version_idx')],
+                'unique_together': {('content_hash', 'parser_version')},
+            },
+        ),
+    ]
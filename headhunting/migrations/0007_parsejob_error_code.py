@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 02:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('headhunting', '0006_parseresultcache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parsejob',
+            name='error_code',
+            field=models.CharField(blank=True, default='', max_length=20, verbose_name='错误类型'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2 on 2026-10-18 02:42
+
+import headhunting.models
+import headhunting.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('headhunting', '0007_parsejob_error_code'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='file_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64, verbose_name='文件内容哈希'),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='file_name',
+            field=models.CharField(blank=True, default='', max_length=255, verbose_name='原始文件名'),
+        ),
+        migrations.AlterField(
+            model_name='resume',
+            name='resume_file',
+            field=headhunting.models.ResumeFileField(blank=True, null=True, storage=headhunting.storage.resume_file_storage, upload_to='resume_files/', verbose_name='简历文件'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 02:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('headhunting', '0008_resume_content_addressed_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parsejob',
+            name='file_type',
+            field=models.CharField(blank=True, default='', max_length=10, verbose_name='文件类型'),
+        ),
+    ]
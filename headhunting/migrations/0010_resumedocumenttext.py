@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 02:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('headhunting', '0009_parsejob_file_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ResumeDocumentText',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('content_hash', models.CharField(max_length=64, unique=True, verbose_name='文件内容哈希')),
+                ('text', models.TextField(verbose_name='全文')),
+                ('char_count', models.PositiveIntegerField(default=0, verbose_name='字符数')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='创建时间')),
+            ],
+            options={
+                'verbose_name': '简历全文',
+                'verbose_name_plural': '简历全文',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
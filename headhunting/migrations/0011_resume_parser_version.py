@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 02:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('headhunting', '0010_resumedocumenttext'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='parsed_fields',
+            field=models.JSONField(blank=True, default=dict, verbose_name='解析结果'),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='parser_version',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=20, verbose_name='解析器版本'),
+        ),
+    ]
@@ -0,0 +1,71 @@
+import re
+import unicodedata
+from django.db import migrations
+
+# 以下为创建该迁移时的索引表结构和分词方式，复制在迁移中，之后修改 headhunting/search.py 不影响本迁移
+FTS_TABLE = 'headhunting_resume_fts'
+INDEX_COLUMNS = (
+    'name', 'phone', 'email', 'current_company', 'current_position',
+    'school', 'major', 'skills', 'work_experience', 'work_history',
+)
+WORK_HISTORY_FIELDS = tuple(
+    f'work_exp_{i}_{part}' for i in (1, 2, 3) for part in ('company', 'position', 'period', 'description')
+)
+SOURCE_FIELDS = tuple(name for name in INDEX_COLUMNS if name != 'work_history') + WORK_HISTORY_FIELDS
+
+_CJK = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+_TOKEN_RE = re.compile(f'[{_CJK}]+|[^\\W{_CJK}_]+')
+_CJK_RE = re.compile(f'[{_CJK}]')
+
+def tokenize(text):
+    """单个汉字保留原字，连续汉字切分为相邻两字的组合，字母数字按单词保存"""
+    tokens = []
+    for match in _TOKEN_RE.finditer(unicodedata.normalize('NFKC', text or '').lower()):
+        run = match.group()
+        if not _CJK_RE.match(run) or len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return ' '.join(tokens)
+
+def index_values(resume):
+    values = [tokenize(getattr(resume, name)) for name in INDEX_COLUMNS if name != 'work_history']
+    values.append(tokenize(' '.join(getattr(resume, name) or '' for name in WORK_HISTORY_FIELDS)))
+    return values
+
+def create_search_index(apps, schema_editor):
+    # 全文索引只在SQLite上创建，其他数据库搜索时退回到模糊匹配
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Resume = apps.get_model('headhunting', 'Resume')
+    columns = ', '.join(INDEX_COLUMNS)
+    insert_sql = f"INSERT INTO {FTS_TABLE} (rowid, {columns}) VALUES ({', '.join(['%s'] * (len(INDEX_COLUMNS) + 1))})"
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5({columns}, tokenize='unicode61 remove_diacritics 2')"
+        )
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        batch = []
+        for resume in Resume.objects.only(*SOURCE_FIELDS).order_by('pk').iterator(chunk_size=1000):
+            batch.append([resume.pk] + index_values(resume))
+            if len(batch) >= 1000:
+                cursor.executemany(insert_sql, batch)
+                batch = []
+        if batch:
+            cursor.executemany(insert_sql, batch)
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('headhunting', '0011_resume_parser_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2 on 2026-10-18 02:57
+
+import re
+
+from django.db import migrations, models
+
+# 回填使用的电话、邮箱规范化规则，与编写迁移时的 search.normalize_phone / normalize_email 一致
+_COUNTRY_PREFIXES = ('0086', '86')
+
+
+def normalize_phone(value):
+    digits = re.sub(r'\D', '', value or '')
+    for prefix in _COUNTRY_PREFIXES:
+        if digits.startswith(prefix) and len(digits) == len(prefix) + 11 and digits[len(prefix)] == '1':
+            return digits[len(prefix):]
+    return digits[:20]
+
+
+def normalize_email(value):
+    return (value or '').strip().lower()[:254]
+
+
+def backfill_normalized_contacts(apps, schema_editor):
+    Resume = apps.get_model('headhunting', 'Resume')
+    batch = []
+    for resume in Resume.objects.only('id', 'phone', 'email').order_by('id').iterator(chunk_size=2000):
+        resume.phone_normalized = normalize_phone(resume.phone)
+        resume.email_normalized = normalize_email(resume.email)
+        batch.append(resume)
+        if len(batch) >= 2000:
+            Resume.objects.bulk_update(batch, ['phone_normalized', 'email_normalized'])
+            batch = []
+    if batch:
+        Resume.objects.bulk_update(batch, ['phone_normalized', 'email_normalized'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('headhunting', '0012_resume_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='email_normalized',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=254, verbose_name='规范化邮箱'),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='phone_normalized',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=20, verbose_name='规范化电话'),
+        ),
+        migrations.RunPython(backfill_normalized_contacts, migrations.RunPython.noop),
+    ]
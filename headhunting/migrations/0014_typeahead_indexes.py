@@ -0,0 +1,32 @@
+# Generated by Django 5.2 on 2026-10-18 03:02
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('headhunting', '0013_resume_normalized_contacts'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='company_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(django.db.models.functions.text.Lower('title'), name='project_title_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resume',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='resume_name_lower_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(django.db.models.functions.text.Lower('name'), name='tag_name_lower_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2 on 2026-10-18 03:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('headhunting', '0014_typeahead_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resume',
+            index=models.Index(fields=['created_by', 'education', 'experience_years'], name='resume_owner_facet_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='resume',
+            index=models.Index(fields=['education', 'experience_years'], name='resume_facet_idx'),
+        ),
+        # 简历和标签的关联表由Django自动创建，只有 (resume_id, tag_id) 的唯一索引，
+        # 按标签筛选和统计时需要以标签在前的索引
+        migrations.RunSQL(
+            'CREATE INDEX headhunting_resume_tags_tag_resume_idx ON headhunting_resume_tags (tag_id, resume_id)',
+            'DROP INDEX headhunting_resume_tags_tag_resume_idx',
+        ),
+    ]
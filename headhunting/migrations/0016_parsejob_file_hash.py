@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 03:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('headhunting', '0015_resume_facet_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='parsejob',
+            name='file_hash',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=64, verbose_name='文件内容哈希'),
+        ),
+    ]
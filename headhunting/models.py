@@ -1,5 +1,12 @@
+import os
+from datetime import timedelta
 from django.db import models
+from django.db.models.fields.files import FieldFile
+from django.db.models.functions import Lower
+from django.utils import timezone
 from accounts.models import User
+from .search import normalize_email, normalize_phone
+from .storage import content_hash_from_name, resume_file_storage
 
 class StatusOption(models.Model):
     """状态选项基础模型"""
@@ -40,6 +47,10 @@ class Tag(models.Model):
         verbose_name = '标签'
         verbose_name_plural = verbose_name
         ordering = ['name']
+        indexes = [
+            # 下拉框按前缀搜索时使用
+            models.Index(Lower('name'), name='tag_name_lower_idx'),
+        ]
     
     def __str__(self):
         return self.name
@@ -60,6 +71,9 @@ class Company(models.Model):
         verbose_name = '公司'
         verbose_name_plural = verbose_name
         ordering = ['-created_at']
+        indexes = [
+            models.Index(Lower('name'), name='company_name_lower_idx'),
+        ]
     
     def __str__(self):
         return self.name
@@ -83,6 +97,9 @@ class Project(models.Model):
         verbose_name = '项目'
         verbose_name_plural = verbose_name
         ordering = ['-created_at']
+        indexes = [
+            models.Index(Lower('title'), name='project_title_lower_idx'),
+        ]
     
     def __str__(self):
         return self.title
@@ -105,6 +122,19 @@ class PaymentRecord(models.Model):
     def __str__(self):
         return f"{self.project.title} - {self.amount}元"
 
+class ResumeFieldFile(FieldFile):
+    def save(self, name, content, save=True):
+        # 文件按内容哈希保存后原始文件名会丢失，保存前记录下来
+        self.instance.file_name = os.path.basename(name)[:255]
+        super().save(name, content, save=False)
+        self.instance.file_hash = content_hash_from_name(self.name)
+        if save:
+            self.instance.save()
+
+class ResumeFileField(models.FileField):
+    """简历文件字段，保存文件时同时记录原始文件名"""
+    attr_class = ResumeFieldFile
+
 class Resume(models.Model):
     """简历模型"""
     GENDER_CHOICES = [
@@ -148,18 +178,100 @@ class Resume(models.Model):
     work_exp_3_period = models.CharField(max_length=100, null=True, blank=True, verbose_name='时间段3')
     work_exp_3_description = models.TextField(null=True, blank=True, verbose_name='工作描述3')
     tags = models.ManyToManyField(Tag, blank=True, related_name='resumes', verbose_name='标签')
-    resume_file = models.FileField(upload_to='resume_files/', null=True, blank=True, verbose_name='简历文件')
+    resume_file = ResumeFileField(upload_to='resume_files/', storage=resume_file_storage, null=True, blank=True, verbose_name='简历文件')
+    file_hash = models.CharField(max_length=64, blank=True, default='', db_index=True, verbose_name='文件内容哈希')
+    file_name = models.CharField(max_length=255, blank=True, default='', verbose_name='原始文件名')
+    # 电话和邮箱的规范化取值，按电话或邮箱搜索时等值查询
+    phone_normalized = models.CharField(max_length=20, blank=True, default='', db_index=True, editable=False, verbose_name='规范化电话')
+    email_normalized = models.CharField(max_length=254, blank=True, default='', db_index=True, editable=False, verbose_name='规范化邮箱')
+    parser_version = models.CharField(max_length=20, blank=True, default='', db_index=True, verbose_name='解析器版本')
+    parsed_fields = models.JSONField(default=dict, blank=True, verbose_name='解析结果')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
     created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='created_resumes', verbose_name='创建人')
     
+    # 由解析器填写的字段，parsed_fields记录这些字段上次解析出的取值
+    PARSED_FIELDS = ('name', 'gender', 'phone', 'email', 'education', 'work_experience', 'skills')
+    
     class Meta:
         verbose_name = '简历'
         verbose_name_plural = verbose_name
         ordering = ['-created_at']
+        indexes = [
+            models.Index(Lower('name'), name='resume_name_lower_idx'),
+            # 简历列表的分面筛选和统计：普通用户先按创建人筛选，管理员直接按学历、工作年限
+            models.Index(fields=['created_by', 'education', 'experience_years'], name='resume_owner_facet_idx'),
+            models.Index(fields=['education', 'experience_years'], name='resume_facet_idx'),
+        ]
     
     def __str__(self):
         return self.name
+    
+    # 记录从数据库读取（或上次保存）时取值的字段，保存时据此判断是否更换了文件或创建人
+    TRACKED_FIELDS = ('file_hash', 'created_by_id')
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded_values()
+        return instance
+    
+    def _remember_loaded_values(self):
+        # 未读取的延迟字段不记录
+        self._loaded_values = {name: self.__dict__[name] for name in self.TRACKED_FIELDS if name in self.__dict__}
+    
+    def loaded_value(self, name, default=None):
+        """字段从数据库读取或上次保存时的取值，新建的简历或未读取该字段时返回default"""
+        return getattr(self, '_loaded_values', {}).get(name, default)
+    
+    def save(self, *args, **kwargs):
+        # 未保存的新文件在写入存储时由ResumeFieldFile填写哈希
+        if not self.resume_file:
+            self.file_hash = ''
+        elif self.resume_file._committed:
+            self.file_hash = content_hash_from_name(self.resume_file.name)
+        self.normalize_contacts()
+        super().save(*args, **kwargs)
+        self._remember_loaded_values()
+    
+    def file_changed(self):
+        """与上次读取或保存时相比是否更换了简历文件，在post_save信号中使用"""
+        return self.file_hash != self.loaded_value('file_hash', '')
+    
+    def normalize_contacts(self):
+        """更新规范化的电话和邮箱，bulk_create/bulk_update前需手动调用"""
+        self.phone_normalized = normalize_phone(self.phone)
+        self.email_normalized = normalize_email(self.email)
+    
+    @property
+    def download_name(self):
+        """下载时使用的文件名"""
+        return self.file_name or os.path.basename(self.resume_file.name)
+    
+    def edited_fields(self):
+        """当前取值与上次解析结果不同（经过人工修改）的字段"""
+        parsed = self.parsed_fields or {}
+        return [name for name in self.PARSED_FIELDS if (getattr(self, name) or '') != (parsed.get(name) or '')]
+    
+    def apply_parsed_fields(self, fields, parser_version):
+        """写入重新解析的结果，返回取值有变化的字段
+
+        经过人工修改的字段保持不变；新结果为空时保留原值，不会清空已有信息。
+        """
+        edited = set(self.edited_fields())
+        parsed = dict(self.parsed_fields or {})
+        changed = []
+        for name in self.PARSED_FIELDS:
+            value = fields.get(name) or ''
+            if name in edited or not value:
+                continue
+            if (getattr(self, name) or '') != value:
+                setattr(self, name, value)
+                changed.append(name)
+            parsed[name] = value
+        self.parsed_fields = parsed
+        self.parser_version = parser_version
+        return changed
 
 class ResumeProject(models.Model):
     """简历项目关联模型，记录简历投递到项目的情况"""
@@ -193,3 +305,133 @@ class ResumeBookmark(models.Model):
     
     def __str__(self):
         return f"{self.user.username} - {self.resume.name}"
+
+class ParseJobManager(models.Manager):
+    def claimable(self, now=None, lease_seconds=600):
+        """可被领取的任务：到期的待处理任务，以及租约已过期的运行中任务（处理进程异常退出）"""
+        now = now or timezone.now()
+        return self.filter(
+            models.Q(status=ParseJob.STATUS_PENDING, available_at__lte=now) |
+            models.Q(status=ParseJob.STATUS_RUNNING, started_at__lt=now - timedelta(seconds=lease_seconds))
+        )
+
+    def claim_next(self, worker_id, lease_seconds=600):
+        """领取一个任务，通过条件UPDATE保证同一任务只会被一个处理进程领取"""
+        now = timezone.now()
+        candidate_ids = list(
+            self.claimable(now, lease_seconds).order_by('available_at').values_list('pk', flat=True)[:10]
+        )
+        for pk in candidate_ids:
+            claimed = self.claimable(now, lease_seconds).filter(pk=pk).update(
+                status=ParseJob.STATUS_RUNNING,
+                locked_by=worker_id,
+                started_at=now,
+                attempts=models.F('attempts') + 1,
+                updated_at=now,
+            )
+            if claimed:
+                return self.get(pk=pk)
+        return None
+
+class ParseJob(models.Model):
+    """简历文件解析任务模型"""
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (STATUS_PENDING, '等待中'),
+        (STATUS_RUNNING, '解析中'),
+        (STATUS_SUCCEEDED, '解析成功'),
+        (STATUS_FAILED, '解析失败'),
+    ]
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING, verbose_name='状态')
+    file_path = models.CharField(max_length=500, verbose_name='暂存文件路径')
+    file_name = models.CharField(max_length=255, verbose_name='原始文件名')
+    file_type = models.CharField(max_length=10, blank=True, default='', verbose_name='文件类型')
+    file_hash = models.CharField(max_length=64, blank=True, default='', db_index=True, verbose_name='文件内容哈希')
+    result = models.JSONField(blank=True, null=True, verbose_name='解析结果')
+    error = models.TextField(blank=True, default='', verbose_name='错误信息')
+    error_code = models.CharField(max_length=20, blank=True, default='', verbose_name='错误类型')
+    attempts = models.IntegerField(default=0, verbose_name='已尝试次数')
+    max_attempts = models.IntegerField(default=3, verbose_name='最大尝试次数')
+    available_at = models.DateTimeField(default=timezone.now, verbose_name='可执行时间')
+    locked_by = models.CharField(max_length=100, blank=True, default='', verbose_name='处理进程')
+    started_at = models.DateTimeField(blank=True, null=True, verbose_name='开始时间')
+    finished_at = models.DateTimeField(blank=True, null=True, verbose_name='完成时间')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='更新时间')
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name='parse_jobs', verbose_name='创建人')
+
+    objects = ParseJobManager()
+
+    class Meta:
+        verbose_name = '简历解析任务'
+        verbose_name_plural = verbose_name
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='parsejob_status_available_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.file_name} - {self.get_status_display()}"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_SUCCEEDED, self.STATUS_FAILED)
+
+    def mark_succeeded(self, result):
+        """记录解析结果"""
+        self.status = self.STATUS_SUCCEEDED
+        self.result = result
+        self.error = ''
+        self.finished_at = timezone.now()
+        self.save(update_fields=['status', 'result', 'error', 'finished_at', 'updated_at'])
+
+    def mark_failed(self, error, retry_delay=30, error_code='', retryable=True):
+        """记录失败，可重试且未超过最大尝试次数时按尝试次数递增延迟后重试"""
+        self.error = error
+        self.error_code = error_code
+        if retryable and self.attempts < self.max_attempts:
+            self.status = self.STATUS_PENDING
+            self.available_at = timezone.now() + timedelta(seconds=retry_delay * self.attempts)
+        else:
+            self.status = self.STATUS_FAILED
+            self.finished_at = timezone.now()
+        self.save(update_fields=['status', 'error', 'error_code', 'available_at', 'finished_at', 'updated_at'])
+
+class ParseResultCache(models.Model):
+    """简历解析结果缓存，按文件内容哈希和解析器版本索引"""
+    content_hash = models.CharField(max_length=64, verbose_name='文件内容哈希')
+    parser_version = models.CharField(max_length=20, verbose_name='解析器版本')
+    result = models.JSONField(verbose_name='解析结果')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
+
+    class Meta:
+        verbose_name = '解析结果缓存'
+        verbose_name_plural = verbose_name
+        ordering = ['-created_at']
+        unique_together = ['content_hash', 'parser_version']
+        indexes = [
+            models.Index(fields=['parser_version'], name='parsecache_version_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.content_hash[:12]} (v{self.parser_version})"
+
+class ResumeDocumentText(models.Model):
+    """简历文件提取出的全文，按文件内容哈希保存，内容相同的文件共用一条记录"""
+    content_hash = models.CharField(max_length=64, unique=True, verbose_name='文件内容哈希')
+    text = models.TextField(verbose_name='全文')
+    char_count = models.PositiveIntegerField(default=0, verbose_name='字符数')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='创建时间')
+
+    class Meta:
+        verbose_name = '简历全文'
+        verbose_name_plural = verbose_name
+        ordering = ['-created_at']
+
+    def __str__(self):
+        return f"{self.content_hash[:12]} ({self.char_count}字)"
@@ -0,0 +1,121 @@
+"""Word简历的HTML预览
+
+上传后根据文件内容生成HTML预览，按内容哈希保存在 resume_previews/ 目录，预览时直接发送已生成的文件。
+HTML只由段落、标题、加粗/斜体和表格组成，所有文本都经过转义，不保留原文档中的任何标记或链接。
+"""
+import logging
+import os
+from docx import Document
+from docx.oxml.ns import qn
+from docx.table import Table
+from docx.text.hyperlink import Hyperlink
+from docx.text.paragraph import Paragraph
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils.html import escape
+
+logger = logging.getLogger(__name__)
+
+# 预览格式版本，修改生成逻辑后递增，旧版本预览会按需重新生成
+PREVIEW_VERSION = '2'
+PREVIEW_EXTENSIONS = ('.docx',)
+
+_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>
+body {{ max-width: 800px; margin: 2em auto; padding: 0 1em; font-family: "Microsoft YaHei", "PingFang SC", sans-serif; line-height: 1.6; color: #333; }}
+table {{ border-collapse: collapse; width: 100%; margin: 1em 0; }}
+td {{ border: 1px solid #ccc; padding: 4px 8px; vertical-align: top; }}
+h2, h3, h4 {{ margin: 1em 0 0.5em; }}
+p {{ margin: 0.3em 0; }}
+</style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+def _iter_runs(paragraph):
+    """按文档顺序返回段落中的文字片段，包括超链接中的文字（paragraph.runs 不包含超链接）"""
+    for item in paragraph.iter_inner_content():
+        if isinstance(item, Hyperlink):
+            yield from item.runs
+        else:
+            yield item
+
+def _render_paragraph(paragraph):
+    parts = []
+    for run in _iter_runs(paragraph):
+        if not run.text:
+            continue
+        text = escape(run.text)
+        if run.bold:
+            text = f'<strong>{text}</strong>'
+        if run.italic:
+            text = f'<em>{text}</em>'
+        parts.append(text)
+    content = ''.join(parts)
+    if not content.strip():
+        return ''
+    style = paragraph.style.name if paragraph.style is not None else ''
+    if style == 'Title':
+        return f'<h2>{content}</h2>'
+    if style.startswith('Heading'):
+        level = style[len('Heading'):].strip()
+        tag = 'h3' if level in ('', '1') else 'h4'
+        return f'<{tag}>{content}</{tag}>'
+    return f'<p>{content}</p>'
+
+def _render_table(table):
+    rows = []
+    for row in table.rows:
+        cells = ''.join(
+            '<td>' + '<br>'.join(escape(paragraph.text) for paragraph in cell.paragraphs) + '</td>'
+            for cell in row.cells
+        )
+        rows.append(f'<tr>{cells}</tr>')
+    return '<table>' + ''.join(rows) + '</table>'
+
+def render_docx_html(file, title=''):
+    """将Word文件转换为HTML页面，按文档顺序输出段落和表格"""
+    document = Document(file)
+    blocks = []
+    for element in document.element.body.iterchildren():
+        if element.tag == qn('w:p'):
+            html = _render_paragraph(Paragraph(element, document))
+        elif element.tag == qn('w:tbl'):
+            html = _render_table(Table(element, document))
+        else:
+            continue
+        if html:
+            blocks.append(html)
+    return _PAGE_TEMPLATE.format(title=escape(title), body='\n'.join(blocks))
+
+def preview_name(resume):
+    """简历预览文件名，不支持预览时返回None"""
+    if not resume.file_hash or os.path.splitext(resume.download_name)[1].lower() not in PREVIEW_EXTENSIONS:
+        return None
+    return f'resume_previews/v{PREVIEW_VERSION}/{resume.file_hash[:2]}/{resume.file_hash}.html'
+
+def generate_preview(resume):
+    """生成简历预览并返回预览文件名，已存在时直接返回，不支持预览或生成失败时返回None"""
+    name = preview_name(resume)
+    if name is None:
+        return None
+    if default_storage.exists(name):
+        return name
+    try:
+        with resume.resume_file.open('rb') as f:
+            html = render_docx_html(f, title=resume.download_name)
+    except Exception as e:
+        logger.error(f"生成简历预览失败: {resume.resume_file.name}: {str(e)}")
+        return None
+    saved_name = default_storage.save(name, ContentFile(html.encode('utf-8')))
+    if saved_name != name:
+        # 其他进程同时生成了相同内容的预览
+        default_storage.delete(saved_name)
+    return name
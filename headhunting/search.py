@@ -0,0 +1,200 @@
+"""简历全文索引（SQLite FTS5）
+
+索引表 headhunting_resume_fts 的rowid为简历ID，各列对应简历的文本字段，保存时由信号同步。
+FTS5自带的unicode61分词器会把连续的汉字当作一个词，因此写入前先把汉字切分为相邻两字的组合（bigram），
+字母数字按单词保存；搜索词按同样方式切分后作为短语查询。筛选使用全部匹配结果，
+只有相关度最高的 RESUME_SEARCH_MAX_RESULTS 条按BM25排序，其余按创建时间排在后面。
+其他数据库不创建索引表，搜索时退回到逐字段模糊匹配。
+
+形如电话号码或邮箱的搜索内容规范化后直接按 phone_normalized / email_normalized 列等值查询。
+"""
+import re
+import unicodedata
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, IntegerField, Value, When
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'headhunting_resume_fts'
+
+# 索引列及BM25权重，work_history合并了 work_exp_N_* 各字段
+INDEX_COLUMNS = (
+    ('name', 10.0),
+    ('phone', 5.0),
+    ('email', 5.0),
+    ('current_company', 3.0),
+    ('current_position', 3.0),
+    ('school', 2.0),
+    ('major', 2.0),
+    ('skills', 1.5),
+    ('work_experience', 1.0),
+    ('work_history', 1.0),
+)
+WORK_HISTORY_FIELDS = tuple(
+    f'work_exp_{i}_{part}' for i in (1, 2, 3) for part in ('company', 'position', 'period', 'description')
+)
+# 读取简历时需要的字段
+SOURCE_FIELDS = tuple(name for name, _ in INDEX_COLUMNS if name != 'work_history') + WORK_HISTORY_FIELDS
+
+_CJK = '\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff'
+_TOKEN_RE = re.compile(f'[{_CJK}]+|[^\\W{_CJK}_]+')
+_CJK_RE = re.compile(f'[{_CJK}]')
+
+_PHONE_QUERY_RE = re.compile(r'^\+?[\d\s\-().]+$')
+_EMAIL_QUERY_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+# 中国大陆国家代码，后接11位手机号时去掉
+_COUNTRY_PREFIXES = ('0086', '86')
+
+def normalize_phone(value):
+    """去掉电话号码中的分隔符和国家代码"""
+    digits = re.sub(r'\D', '', value or '')
+    for prefix in _COUNTRY_PREFIXES:
+        if digits.startswith(prefix) and len(digits) == len(prefix) + 11 and digits[len(prefix)] == '1':
+            return digits[len(prefix):]
+    return digits[:20]
+
+def normalize_email(value):
+    return (value or '').strip().lower()[:254]
+
+def exact_lookup(query):
+    """搜索内容是电话号码或邮箱时返回 (字段名, 规范化的值)，否则返回None"""
+    query = (query or '').strip()
+    if _EMAIL_QUERY_RE.match(query):
+        return 'email_normalized', normalize_email(query)
+    if _PHONE_QUERY_RE.match(query):
+        digits = normalize_phone(query)
+        if 7 <= len(digits) <= 15:
+            return 'phone_normalized', digits
+    return None
+
+def is_enabled():
+    """当前数据库是否使用全文索引"""
+    return connection.vendor == 'sqlite' and getattr(settings, 'RESUME_SEARCH_FTS_ENABLED', True)
+
+def create_index_table(cursor):
+    columns = ', '.join(name for name, _ in INDEX_COLUMNS)
+    cursor.execute(
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5({columns}, tokenize='unicode61 remove_diacritics 2')"
+    )
+
+def _segments(text):
+    """切分文本，返回 (词, 是否为汉字) 列表；单个汉字保留原字，连续汉字切分为bigram"""
+    segments = []
+    for match in _TOKEN_RE.finditer(unicodedata.normalize('NFKC', text).lower()):
+        run = match.group()
+        if not _CJK_RE.match(run):
+            segments.append((run, False))
+        elif len(run) == 1:
+            segments.append((run, True))
+        else:
+            segments.extend((run[i:i + 2], True) for i in range(len(run) - 1))
+    return segments
+
+def tokenize(text):
+    """转换为写入索引的文本"""
+    return ' '.join(token for token, _ in _segments(text or ''))
+
+def build_match_query(query):
+    """将搜索内容转换为FTS5查询，每个搜索词作为一个短语，全部需要匹配；没有可搜索的内容时返回None"""
+    phrases = []
+    for term in (query or '').split():
+        segments = _segments(term)
+        if not segments:
+            continue
+        phrase = '"' + ' '.join(token for token, _ in segments) + '"'
+        last_token, last_is_cjk = segments[-1]
+        # 字母数字和单个汉字按前缀匹配（如电话号码的前几位、姓氏）
+        if not last_is_cjk or len(last_token) == 1:
+            phrase += '*'
+        phrases.append(phrase)
+    return ' AND '.join(phrases) or None
+
+def index_values(resume):
+    """简历对应的索引行"""
+    values = [tokenize(getattr(resume, name)) for name, _ in INDEX_COLUMNS if name != 'work_history']
+    values.append(tokenize(' '.join(getattr(resume, name) or '' for name in WORK_HISTORY_FIELDS)))
+    return values
+
+def _insert_sql():
+    columns = ', '.join(name for name, _ in INDEX_COLUMNS)
+    placeholders = ', '.join(['%s'] * (len(INDEX_COLUMNS) + 1))
+    return f'INSERT INTO {FTS_TABLE} (rowid, {columns}) VALUES ({placeholders})'
+
+def index_resumes(resumes, cursor=None):
+    """写入或更新简历的索引行"""
+    resumes = list(resumes)
+    if not resumes or not is_enabled():
+        return
+    if cursor is None:
+        with connection.cursor() as cursor:
+            return index_resumes(resumes, cursor)
+    ids = [resume.pk for resume in resumes]
+    cursor.execute(f"DELETE FROM {FTS_TABLE} WHERE rowid IN ({', '.join(['%s'] * len(ids))})", ids)
+    cursor.executemany(_insert_sql(), [[resume.pk] + index_values(resume) for resume in resumes])
+
+def remove_resume(resume_id):
+    """删除简历的索引行"""
+    if not is_enabled():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [resume_id])
+
+def rebuild_index(queryset, batch_size=1000, cursor=None):
+    """清空并重建索引，返回写入的简历数"""
+    if cursor is None:
+        with connection.cursor() as cursor:
+            return rebuild_index(queryset, batch_size, cursor)
+    cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    total = 0
+    batch = []
+    for resume in queryset.only(*SOURCE_FIELDS).order_by('pk').iterator(chunk_size=batch_size):
+        batch.append([resume.pk] + index_values(resume))
+        if len(batch) >= batch_size:
+            cursor.executemany(_insert_sql(), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        cursor.executemany(_insert_sql(), batch)
+        total += len(batch)
+    # 合并索引段，之后的查询只需读取一个段
+    cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    return total
+
+def search_resume_ids(query, owner_id=None, limit=None):
+    """按相关度返回匹配的简历ID，owner_id不为空时只返回该用户创建的简历"""
+    match = build_match_query(query)
+    if match is None:
+        return []
+    if limit is None:
+        limit = getattr(settings, 'RESUME_SEARCH_MAX_RESULTS', 500)
+    weights = ', '.join(str(weight) for _, weight in INDEX_COLUMNS)
+    sql = f'SELECT {FTS_TABLE}.rowid FROM {FTS_TABLE}'
+    params = [match]
+    where = f'{FTS_TABLE} MATCH %s'
+    if owner_id is not None:
+        sql += f' JOIN headhunting_resume r ON r.id = {FTS_TABLE}.rowid'
+        where += ' AND r.created_by_id = %s'
+        params.append(owner_id)
+    sql += f' WHERE {where} ORDER BY bm25({FTS_TABLE}, {weights}) LIMIT %s'
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [row[0] for row in cursor.fetchall()]
+
+def filter_resumes(resumes, query, owner_id=None, limit=None):
+    """筛选全部匹配的简历，相关度最高的limit条排在前面，返回 (查询集, 是否有未按相关度排序的结果)"""
+    match = build_match_query(query)
+    if match is None:
+        return resumes.none(), False
+    if limit is None:
+        limit = getattr(settings, 'RESUME_SEARCH_MAX_RESULTS', 500)
+    # 多取一条判断匹配结果是否超过排序上限
+    ids = search_resume_ids(query, owner_id, limit + 1)
+    truncated = len(ids) > limit
+    ids = ids[:limit]
+    matched = RawSQL(f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s', [match])
+    ranking = Case(
+        *[When(pk=pk, then=position) for position, pk in enumerate(ids)],
+        default=Value(len(ids)), output_field=IntegerField(),
+    )
+    return resumes.filter(pk__in=matched).order_by(ranking, '-created_at'), truncated
@@ -0,0 +1,106 @@
+"""简历文件下载和预览的响应
+
+权限检查在视图中完成，文件内容按 RESUME_FILE_SERVE_MODE 配置发送：
+- django：由Django进程发送，支持Range分段请求和ETag/Last-Modified条件请求
+- nginx：返回X-Accel-Redirect头，由Nginx从 RESUME_FILE_ACCEL_PREFIX 对应的internal location发送
+- sendfile：返回X-Sendfile头，由Apache（mod_xsendfile）或lighttpd发送
+"""
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+from django.conf import settings
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date
+
+_RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+def _iter_range(path, start, length, chunk_size=64 * 1024):
+    """分块读取文件的一段"""
+    with open(path, 'rb') as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(chunk_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+def _parse_range(header, size):
+    """解析单个字节范围，返回 (start, end)；格式不支持时返回None，范围无效时返回False"""
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        return None  # 多段范围等情况按完整文件返回
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # bytes=-N 表示最后N个字节
+        length = int(last)
+        if length == 0:
+            return False
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return False
+    return start, end
+
+def serve_resume_file(request, resume, as_attachment=True):
+    """发送简历文件，文件不存在时返回None"""
+    path = resume.resume_file.path
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+
+    filename = resume.download_name
+    content_type = mimetypes.guess_type(filename)[0] or mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    disposition = content_disposition_header(as_attachment, filename)
+
+    mode = getattr(settings, 'RESUME_FILE_SERVE_MODE', 'django')
+    if mode in ('nginx', 'sendfile'):
+        response = HttpResponse(content_type=content_type)
+        if mode == 'nginx':
+            prefix = getattr(settings, 'RESUME_FILE_ACCEL_PREFIX', '/protected/')
+            response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(resume.resume_file.name)
+        else:
+            response['X-Sendfile'] = path
+        response['Content-Disposition'] = disposition
+        return response
+
+    # 按内容哈希命名的文件内容不会变化，直接用哈希作为强ETag
+    etag = f'"{resume.file_hash}"' if resume.file_hash else f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    last_modified = int(stat.st_mtime)
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        not_modified['ETag'] = etag
+        return not_modified
+
+    size = stat.st_size
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if range_header and request.method in ('GET', 'HEAD'):
+        # If-Range与当前版本不一致时返回完整文件
+        if_range = request.headers.get('If-Range')
+        if not if_range or if_range in (etag, http_date(last_modified)):
+            byte_range = _parse_range(range_header, size)
+
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+    elif byte_range:
+        start, end = byte_range
+        response = StreamingHttpResponse(_iter_range(path, start, end - start + 1), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    else:
+        # 完整文件使用FileResponse，WSGI服务器支持时可用sendfile发送
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Content-Disposition'] = disposition
+    return response
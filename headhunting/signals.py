@@ -0,0 +1,64 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from .models import Resume, Tag
+from .documents import ensure_document_text
+from .previews import generate_preview, preview_name
+from .search import index_resumes, remove_resume
+from .tagindex import UNKNOWN_OWNER, tag_index
+
+# 删除简历时不删除文件：检查引用和删除文件之间，并发上传的相同内容可能复用同一文件名。
+# 不再被引用的文件由 gc_resume_files 命令按修改时间保留期清理（复用文件时会更新修改时间）。
+
+@receiver(post_save, sender=Resume)
+def prepare_resume_preview(sender, instance, **kwargs):
+    """上传Word简历后生成预览，文件内容不变时不会重复生成"""
+    if preview_name(instance) is not None:
+        transaction.on_commit(lambda: generate_preview(instance))
+
+@receiver(post_save, sender=Resume)
+def prepare_resume_document_text(sender, instance, **kwargs):
+    """未经解析上传的简历文件保存后提取全文，只在更换了文件时检查"""
+    if instance.file_hash and instance.file_changed():
+        transaction.on_commit(lambda: ensure_document_text(instance))
+
+@receiver(post_save, sender=Resume)
+def update_search_index(sender, instance, **kwargs):
+    """保存简历时在同一事务中更新全文索引"""
+    index_resumes([instance])
+
+@receiver(post_delete, sender=Resume)
+def remove_from_search_index(sender, instance, **kwargs):
+    remove_resume(instance.pk)
+
+@receiver(post_save, sender=Resume)
+def update_tag_index_resume(sender, instance, created, **kwargs):
+    """标签索引按创建人筛选，保存简历后更新"""
+    resume_id, owner_id = instance.pk, instance.created_by_id
+    previous_owner_id = None if created else instance.loaded_value('created_by_id', UNKNOWN_OWNER)
+    transaction.on_commit(lambda: tag_index.add_resume(resume_id, owner_id, previous_owner_id))
+
+@receiver(post_delete, sender=Resume)
+def remove_from_tag_index(sender, instance, **kwargs):
+    resume_id = instance.pk
+    transaction.on_commit(lambda: tag_index.remove_resume(resume_id))
+
+@receiver(post_delete, sender=Tag)
+def remove_tag_from_tag_index(sender, instance, **kwargs):
+    tag_id = instance.pk
+    transaction.on_commit(lambda: tag_index.remove_tag(tag_id))
+
+@receiver(m2m_changed, sender=Resume.tags.through)
+def update_tag_index(sender, instance, action, reverse, pk_set, **kwargs):
+    """简历的标签变化后更新标签索引，回滚时不会修改索引"""
+    if action == 'pre_clear':
+        # post_clear 时已无法得知删除了哪些关联
+        related = instance.resumes if reverse else instance.tags
+        pk_set = set(related.values_list('pk', flat=True))
+    elif action not in ('post_add', 'post_remove') or not pk_set:
+        return
+    resume_ids, tag_ids = (set(pk_set), {instance.pk}) if reverse else ({instance.pk}, set(pk_set))
+    if action == 'post_add':
+        transaction.on_commit(lambda: tag_index.add_tags(resume_ids, tag_ids))
+    else:
+        transaction.on_commit(lambda: tag_index.remove_tags(resume_ids, tag_ids))
@@ -0,0 +1,237 @@
+"""上传文件暂存区
+
+暂存文件保存在可配置的共享目录（RESUME_STAGING_DIR）中，以随机令牌命名，多个进程和节点都能访问。
+每个令牌对应两个文件：<令牌> 为文件内容，<令牌>.json 为元数据（所有者、原始文件名、过期时间），
+元数据文件的修改时间设置为过期时间，清理时只需读取目录项的stat信息。
+
+分块上传时内容先追加到 <令牌>.part，每个分块必须从当前已写入的长度开始，中断后查询已写入长度即可继续上传；
+全部写入并校验整个文件的SHA-256后重命名为 <令牌>，之后与普通暂存文件相同。
+"""
+import hashlib
+import json
+import os
+import re
+import secrets
+import time
+from django.conf import settings
+from django.core.files import locks
+
+META_SUFFIX = '.json'
+PART_SUFFIX = '.part'
+_TOKEN_RE = re.compile(r'^[A-Za-z0-9_-]{32}$')
+
+class UploadError(Exception):
+    """分块上传请求无效，status为对应的HTTP状态码，offset为服务端当前已写入的长度"""
+    def __init__(self, message, status=400, offset=None):
+        super().__init__(message)
+        self.status = status
+        self.offset = offset
+
+class StagedUpload:
+    """一个暂存的上传文件，size为分块上传时声明的文件大小"""
+    def __init__(self, token, path, filename, owner_id, expires_at, size=None):
+        self.token = token
+        self.path = path
+        self.filename = filename
+        self.owner_id = owner_id
+        self.expires_at = expires_at
+        self.size = size
+
+    @property
+    def partial_path(self):
+        return self.path + PART_SUFFIX
+
+    @property
+    def offset(self):
+        """分块上传已写入的长度"""
+        try:
+            return os.path.getsize(self.partial_path)
+        except FileNotFoundError:
+            return 0
+
+    @property
+    def is_expired(self):
+        return self.expires_at <= time.time()
+
+def get_staging_dir():
+    """暂存目录，不存在时创建"""
+    directory = str(getattr(settings, 'RESUME_STAGING_DIR', os.path.join(settings.BASE_DIR, 'resume_staging')))
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+def _paths(token):
+    directory = get_staging_dir()
+    return os.path.join(directory, token), os.path.join(directory, token + META_SUFFIX)
+
+def stage_upload(uploaded_file, owner, ttl=None):
+    """分块写入上传文件，返回StagedUpload"""
+    if ttl is None:
+        ttl = getattr(settings, 'RESUME_STAGING_TTL', 24 * 3600)
+    token = secrets.token_urlsafe(24)
+    data_path, meta_path = _paths(token)
+    expires_at = time.time() + ttl
+
+    # 先写入临时文件名再重命名，其他进程不会读到写了一半的文件
+    partial_path = data_path + PART_SUFFIX
+    with open(partial_path, 'wb') as destination:
+        for chunk in uploaded_file.chunks():
+            destination.write(chunk)
+    os.replace(partial_path, data_path)
+
+    _write_meta(meta_path, {'owner_id': owner.id, 'filename': uploaded_file.name, 'expires_at': expires_at})
+    return StagedUpload(token, data_path, uploaded_file.name, owner.id, expires_at)
+
+def _write_meta(meta_path, meta):
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, ensure_ascii=False)
+    os.utime(meta_path, (meta['expires_at'], meta['expires_at']))
+
+def _load(token, owner=None):
+    if not token or not _TOKEN_RE.match(token):
+        return None
+    data_path, meta_path = _paths(token)
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    staged = StagedUpload(token, data_path, meta['filename'], meta['owner_id'], meta['expires_at'], meta.get('size'))
+    if staged.is_expired:
+        return None
+    if owner is not None and staged.owner_id != owner.id:
+        return None
+    return staged
+
+def get_staged(token, owner=None):
+    """按令牌取出未过期的暂存文件，令牌无效、已过期、不属于owner或分块上传未完成时返回None"""
+    staged = _load(token, owner)
+    if staged is None or not os.path.exists(staged.path):
+        return None
+    return staged
+
+def start_upload(owner, filename, size, ttl=None):
+    """开始分块上传，返回StagedUpload，之后用append_chunk写入内容"""
+    if ttl is None:
+        ttl = getattr(settings, 'RESUME_STAGING_TTL', 24 * 3600)
+    token = secrets.token_urlsafe(24)
+    data_path, meta_path = _paths(token)
+    expires_at = time.time() + ttl
+    open(data_path + PART_SUFFIX, 'wb').close()
+    _write_meta(meta_path, {'owner_id': owner.id, 'filename': filename, 'expires_at': expires_at, 'size': size})
+    return StagedUpload(token, data_path, filename, owner.id, expires_at, size)
+
+def get_upload(token, owner=None):
+    """按令牌取出未完成的分块上传，令牌无效、已过期、不属于owner或已完成时返回None"""
+    staged = _load(token, owner)
+    if staged is None or staged.size is None or not os.path.exists(staged.partial_path):
+        return None
+    return staged
+
+def append_chunk(upload, offset, stream, max_length, chunk_size=64 * 1024):
+    """从stream读取一个分块追加到上传文件，返回写入后的长度
+
+    offset必须等于已写入的长度，否则抛出UploadError（offset为当前长度，客户端据此继续上传）。
+    分块超过max_length字节或写入后超过声明的文件大小时丢弃本次写入的内容。
+    """
+    with open(upload.partial_path, 'ab') as f:
+        # 同一令牌的并发请求排队写入，避免两个分块交错
+        locks.lock(f, locks.LOCK_EX)
+        try:
+            current = os.fstat(f.fileno()).st_size
+            if offset != current:
+                raise UploadError('分块偏移与已上传长度不一致', status=409, offset=current)
+            limit = min(max_length, upload.size - current)
+            written = 0
+            while True:
+                data = stream.read(min(chunk_size, limit - written + 1))
+                if not data:
+                    break
+                written += len(data)
+                if written > limit:
+                    f.truncate(current)
+                    raise UploadError('分块过大或超过声明的文件大小', status=413, offset=current)
+                f.write(data)
+            f.flush()
+            return current + written
+        finally:
+            locks.unlock(f)
+
+def read_head(upload, length):
+    """读取分块上传已写入内容的开头部分"""
+    with open(upload.partial_path, 'rb') as f:
+        return f.read(length)
+
+def finish_upload(upload, sha256):
+    """校验分块上传的文件大小和SHA-256，通过后转为普通暂存文件并返回"""
+    digest = hashlib.sha256()
+    size = 0
+    with open(upload.partial_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+            size += len(chunk)
+    if size != upload.size:
+        raise UploadError('文件尚未上传完成', status=409, offset=size)
+    if digest.hexdigest() != (sha256 or '').lower():
+        # 内容已损坏，只能重新上传
+        discard(upload.token)
+        raise UploadError('文件校验失败，请重新上传', status=422)
+    os.replace(upload.partial_path, upload.path)
+    return upload
+
+def discard(token):
+    """删除暂存文件、未完成的分块上传及其元数据"""
+    if not token or not _TOKEN_RE.match(token):
+        return
+    data_path, meta_path = _paths(token)
+    for path in (data_path, data_path + PART_SUFFIX, meta_path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def sweep_expired(now=None, orphan_age=None, dry_run=False):
+    """删除过期的暂存文件，返回 (删除的条目数, 释放的字节数)
+
+    没有元数据的内容文件和写入中断的 .part 文件超过orphan_age秒后也会删除。
+    """
+    if now is None:
+        now = time.time()
+    if orphan_age is None:
+        orphan_age = getattr(settings, 'RESUME_STAGING_TTL', 24 * 3600)
+    directory = get_staging_dir()
+
+    expired = set()
+    live = set()
+    data_files = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            stat = entry.stat(follow_symlinks=False)
+            if entry.name.endswith(META_SUFFIX):
+                token = entry.name[:-len(META_SUFFIX)]
+                (expired if stat.st_mtime <= now else live).add(token)
+            else:
+                data_files[entry.name] = stat
+
+    removed = 0
+    freed = 0
+    for token in expired:
+        removed += 1
+        for name in (token, token + PART_SUFFIX):
+            stat = data_files.pop(name, None)
+            freed += stat.st_size if stat else 0
+        if not dry_run:
+            discard(token)
+    for name, stat in data_files.items():
+        token = name[:-len(PART_SUFFIX)] if name.endswith(PART_SUFFIX) else name
+        if token in live or stat.st_mtime > now - orphan_age:
+            continue
+        removed += 1
+        freed += stat.st_size
+        if not dry_run:
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                pass
+    return removed, freed
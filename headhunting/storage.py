@@ -0,0 +1,131 @@
+"""简历文件存储相关工具"""
+import hashlib
+import os
+import re
+import secrets
+from django.core.files import File
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+
+# 按内容哈希命名的文件名：<目录>/<哈希前两位>/<哈希><扩展名>
+_CONTENT_NAME_RE = re.compile(r'(?:^|/)([0-9a-f]{2})/(\1[0-9a-f]{62})(\.[A-Za-z0-9]+)?$')
+
+def hash_file(file, chunk_size=64 * 1024):
+    """流式计算文件内容的SHA-256，完成后将文件指针移回开头"""
+    digest = hashlib.sha256()
+    file.seek(0)
+    if hasattr(file, 'chunks'):
+        for chunk in file.chunks(chunk_size):
+            digest.update(chunk)
+    else:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+def content_hash_from_name(name):
+    """从按内容哈希命名的文件名中取出哈希，不是该格式时返回空字符串"""
+    match = _CONTENT_NAME_RE.search(name or '')
+    return match.group(2) if match else ''
+
+class ContentAddressedStorage(FileSystemStorage):
+    """按内容哈希命名文件的存储，内容相同的文件只保存一份
+
+    保存时忽略传入文件名中的文件名部分，只保留目录和扩展名；内容已存在时直接返回已有文件名。
+    不在删除记录时删除文件，不再被引用的文件由 gc_resume_files 命令清理。
+    """
+    def get_available_name(self, name, max_length=None):
+        # 文件名由内容决定，同名即同内容，不需要避让重名
+        return name
+
+    def content_name(self, name, content_hash):
+        directory = os.path.dirname(name)
+        ext = os.path.splitext(name)[1].lower()
+        return os.path.join(directory, content_hash[:2], content_hash + ext).replace('\\', '/')
+
+    def _ensure_directory(self, path):
+        directory = os.path.dirname(path)
+        if self.directory_permissions_mode is not None:
+            old_umask = os.umask(0o777 & ~self.directory_permissions_mode)
+            try:
+                os.makedirs(directory, self.directory_permissions_mode, exist_ok=True)
+            finally:
+                os.umask(old_umask)
+        else:
+            os.makedirs(directory, exist_ok=True)
+
+    def _touch(self, path):
+        """复用已有文件时更新修改时间，孤立文件清理按修改时间保留新近使用的文件"""
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _save(self, name, content):
+        if hasattr(content, 'temporary_file_path'):
+            # 磁盘上的文件：先计算哈希，再直接移动到最终位置
+            content_hash = hash_file(content)
+            name = self.content_name(name, content_hash)
+            full_path = self.path(name)
+            if os.path.exists(full_path):
+                self._touch(full_path)
+                return name
+            self._ensure_directory(full_path)
+            try:
+                file_move_safe(content.temporary_file_path(), full_path)
+            except FileExistsError:
+                return name  # 并发保存了相同内容
+        else:
+            # 其他内容：边写入临时文件边计算哈希，只读一遍
+            temp_path = self.path(os.path.join(os.path.dirname(name), f'.tmp-{secrets.token_hex(8)}'))
+            self._ensure_directory(temp_path)
+            digest = hashlib.sha256()
+            try:
+                with open(temp_path, 'wb') as f:
+                    for chunk in content.chunks():
+                        digest.update(chunk)
+                        f.write(chunk)
+                name = self.content_name(name, digest.hexdigest())
+                full_path = self.path(name)
+                self._ensure_directory(full_path)
+                try:
+                    os.link(temp_path, full_path)
+                except FileExistsError:
+                    self._touch(full_path)
+                    return name
+                except OSError:
+                    # 不支持硬链接的文件系统
+                    os.replace(temp_path, full_path)
+            finally:
+                if os.path.exists(temp_path):
+                    os.remove(temp_path)
+
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
+        return name
+
+_resume_storage = None
+
+def resume_file_storage():
+    """简历文件使用的存储（模型字段引用此函数，迁移文件中不会写入存储配置）"""
+    global _resume_storage
+    if _resume_storage is None:
+        _resume_storage = ContentAddressedStorage()
+    return _resume_storage
+
+class StagedFile(File):
+    """磁盘上的暂存文件
+
+    提供temporary_file_path()后，存储保存时会直接重命名文件（跨文件系统时分块流式复制），
+    不会把文件内容读入内存。
+    """
+    def temporary_file_path(self):
+        return self.file.name
+
+def promote_staged_file(field_file, staged_path, filename):
+    """将暂存文件保存到文件字段对应的存储位置，完成后暂存文件不再存在"""
+    with open(staged_path, 'rb') as f:
+        field_file.save(filename, StagedFile(f, name=filename), save=False)
+    # 内容已存在或非本地存储时暂存文件仍在，需要删除
+    if os.path.exists(staged_path):
+        os.remove(staged_path)
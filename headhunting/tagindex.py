@@ -0,0 +1,314 @@
+"""简历标签的进程内位图索引
+
+每个标签保存拥有该标签的简历ID集合：简历多的标签用Python整数作为位图（第n位表示ID为n的简历），
+简历少的标签用有序数组保存，查询时再转换为位图。标签表达式（如“Java AND 上海 NOT 外包”）
+用位运算求值，之后只需从数据库读取当前页的简历。
+
+索引在第一次查询时从数据库加载，之后由信号在事务提交后增量更新。批量导入等不发送信号的写入
+和其他进程中的修改不会同步到本进程，因此索引加载超过 RESUME_TAG_INDEX_MAX_AGE 秒后重新加载。
+"""
+import re
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from itertools import islice
+from django.conf import settings
+from django.db.models import Q
+from django.db.models.functions import Lower
+from .models import Resume, Tag
+
+class TagQueryError(ValueError):
+    """标签表达式无效"""
+
+# 标签表达式的词：括号、带引号的标签名、运算符或标签名
+_TOKEN_RE = re.compile(r'\s*(?:(\()|(\))|"([^"]*)"|([^\s()"]+))')
+_OPERATORS = ('AND', 'OR', 'NOT')
+
+def _tokenize(text):
+    tokens = []
+    text = text.strip()
+    pos = 0
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if match is None:
+            raise TagQueryError('标签表达式中的引号不匹配')
+        pos = match.end()
+        lparen, rparen, quoted, word = match.groups()
+        if lparen:
+            tokens.append(('(', None))
+        elif rparen:
+            tokens.append((')', None))
+        elif quoted is not None:
+            tokens.append(('tag', quoted.strip()))
+        elif word.upper() in _OPERATORS:
+            tokens.append((word.upper(), None))
+        else:
+            tokens.append(('tag', word))
+    return tokens
+
+class _Parser:
+    """递归下降解析：OR优先级最低，相邻的标签和 “A NOT B” 按AND处理"""
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self):
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def take(self):
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise TagQueryError('标签表达式中有多余的右括号')
+        return node
+
+    def parse_or(self):
+        node = self.parse_and()
+        while self.peek() == 'OR':
+            self.take()
+            node = ('or', node, self.parse_and())
+        return node
+
+    def parse_and(self):
+        node = self.parse_unary()
+        while self.peek() in ('AND', 'NOT', 'tag', '('):
+            kind = self.peek()
+            if kind == 'AND':
+                self.take()
+                node = ('and', node, self.parse_unary())
+            elif kind == 'NOT':
+                self.take()
+                node = ('and', node, ('not', self.parse_unary()))
+            else:
+                node = ('and', node, self.parse_unary())
+        return node
+
+    def parse_unary(self):
+        kind = self.peek()
+        if kind == 'NOT':
+            self.take()
+            return ('not', self.parse_unary())
+        if kind == '(':
+            self.take()
+            node = self.parse_or()
+            if self.peek() != ')':
+                raise TagQueryError('标签表达式缺少右括号')
+            self.take()
+            return node
+        if kind == 'tag':
+            name = self.take()[1]
+            if not name:
+                raise TagQueryError('标签名称不能为空')
+            return ('tag', name)
+        raise TagQueryError('标签表达式不完整' if kind is None else f'标签表达式在“{kind}”附近有误')
+
+def tag_names(node):
+    """表达式中的标签名"""
+    if node[0] == 'tag':
+        return {node[1]}
+    return set().union(*(tag_names(child) for child in node[1:]))
+
+def compile_tag_query(text):
+    """解析标签表达式，返回 (语法树, {标签名小写: 标签ID})；表达式无效或标签不存在时抛出 TagQueryError"""
+    tokens = _tokenize(text)
+    if not tokens:
+        raise TagQueryError('请输入标签表达式')
+    node = _Parser(tokens).parse()
+    names = {name.lower() for name in tag_names(node)}
+    tag_ids = dict(
+        Tag.objects.annotate(lower_name=Lower('name')).filter(lower_name__in=names)
+        .order_by('pk').values_list('lower_name', 'pk')
+    )
+    missing = sorted(names - tag_ids.keys())
+    if missing:
+        raise TagQueryError(f'标签不存在: {"、".join(missing)}')
+    return node, tag_ids
+
+def to_q(node, tag_ids):
+    """把标签表达式转换为查询条件，与其他搜索条件组合时使用"""
+    kind = node[0]
+    if kind == 'tag':
+        tagged = Resume.tags.through.objects.filter(tag_id=tag_ids[node[1].lower()]).values('resume_id')
+        return Q(pk__in=tagged)
+    if kind == 'not':
+        return ~to_q(node[1], tag_ids)
+    left, right = to_q(node[1], tag_ids), to_q(node[2], tag_ids)
+    return left & right if kind == 'and' else left | right
+
+def _ids_to_bits(ids):
+    if not ids:
+        return 0
+    buffer = bytearray((max(ids) >> 3) + 1)
+    for resume_id in ids:
+        buffer[resume_id >> 3] |= 1 << (resume_id & 7)
+    return int.from_bytes(buffer, 'little')
+
+def _as_bits(posting):
+    return posting if isinstance(posting, int) else _ids_to_bits(posting)
+
+def _contains(posting, resume_id):
+    if isinstance(posting, int):
+        return posting >> resume_id & 1
+    position = bisect_left(posting, resume_id)
+    return position < len(posting) and posting[position] == resume_id
+
+def iter_ids_desc(bits):
+    """按从大到小的顺序返回位图中的简历ID"""
+    data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+    for index in range(len(data) - 1, -1, -1):
+        byte = data[index]
+        if byte:
+            for bit in range(7, -1, -1):
+                if byte >> bit & 1:
+                    yield (index << 3) + bit
+
+def page_ids(bits, number, size):
+    """ID从大到小（即新建的简历在前）第number页的简历ID，页码从1开始"""
+    start = (number - 1) * size
+    return list(islice(iter_ids_desc(bits), start, start + size))
+
+def is_enabled():
+    return getattr(settings, 'RESUME_TAG_INDEX_ENABLED', True)
+
+# 修改简历前的创建人未知（如只读取了部分字段），需要检查所有创建人的集合
+UNKNOWN_OWNER = object()
+
+class TagIndex:
+    """线程安全的标签索引，集合较稀疏时保存为有序数组，较密集时保存为位图"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rebuild_lock = threading.RLock()
+        self._loaded_at = None
+        self._max_id = 0
+        self._all = 0
+        self._tags = {}
+        self._owners = {}
+
+    @staticmethod
+    def _compact(ids, max_id):
+        # 有序数组每个ID占8字节，位图每个ID占1位
+        return _ids_to_bits(ids) if len(ids) * 64 >= max_id else array('q', ids)
+
+    def rebuild(self):
+        """从数据库重新加载索引，返回简历数"""
+        with self._rebuild_lock:
+            all_ids = []
+            owners = defaultdict(list)
+            for resume_id, owner_id in Resume.objects.order_by('pk').values_list('pk', 'created_by_id').iterator(chunk_size=5000):
+                all_ids.append(resume_id)
+                if owner_id is not None:
+                    owners[owner_id].append(resume_id)
+            tags = defaultdict(list)
+            relations = Resume.tags.through.objects.order_by('tag_id', 'resume_id').values_list('tag_id', 'resume_id')
+            for tag_id, resume_id in relations.iterator(chunk_size=5000):
+                tags[tag_id].append(resume_id)
+
+            max_id = all_ids[-1] if all_ids else 0
+            all_bits = _ids_to_bits(all_ids)
+            tags = {tag_id: self._compact(ids, max_id) for tag_id, ids in tags.items()}
+            owners = {owner_id: self._compact(ids, max_id) for owner_id, ids in owners.items()}
+            with self._lock:
+                self._max_id = max_id
+                self._all = all_bits
+                self._tags = tags
+                self._owners = owners
+                self._loaded_at = time.monotonic()
+            return len(all_ids)
+
+    def _ensure_loaded(self):
+        max_age = getattr(settings, 'RESUME_TAG_INDEX_MAX_AGE', 300)
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > max_age:
+            with self._rebuild_lock:
+                # 等待其他线程加载完成后不再重复加载
+                if self._loaded_at == loaded_at:
+                    self.rebuild()
+
+    def query(self, node, tag_ids, owner_id=None):
+        """计算标签表达式，返回匹配的简历ID位图；owner_id不为空时只包含该用户创建的简历"""
+        self._ensure_loaded()
+        with self._lock:
+            universe = self._all if owner_id is None else _as_bits(self._owners.get(owner_id, 0))
+            return self._evaluate(node, tag_ids, universe) & universe
+
+    def _evaluate(self, node, tag_ids, universe):
+        kind = node[0]
+        if kind == 'tag':
+            return _as_bits(self._tags.get(tag_ids[node[1].lower()], 0))
+        if kind == 'not':
+            return universe & ~self._evaluate(node[1], tag_ids, universe)
+        left = self._evaluate(node[1], tag_ids, universe)
+        right = self._evaluate(node[2], tag_ids, universe)
+        return left & right if kind == 'and' else left | right
+
+    def _update(self, postings, key, resume_id, add):
+        posting = postings.get(key, array('q'))
+        if bool(_contains(posting, resume_id)) == add:
+            return
+        if isinstance(posting, int):
+            postings[key] = posting | (1 << resume_id) if add else posting & ~(1 << resume_id)
+        elif add:
+            posting.insert(bisect_left(posting, resume_id), resume_id)
+            if len(posting) * 64 >= self._max_id:
+                postings[key] = _ids_to_bits(posting)
+            else:
+                postings[key] = posting
+        else:
+            posting.pop(bisect_left(posting, resume_id))
+
+    def add_tags(self, resume_ids, tag_ids):
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            for tag_id in tag_ids:
+                for resume_id in resume_ids:
+                    self._update(self._tags, tag_id, resume_id, True)
+
+    def remove_tags(self, resume_ids, tag_ids):
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            for tag_id in tag_ids:
+                for resume_id in resume_ids:
+                    self._update(self._tags, tag_id, resume_id, False)
+
+    def add_resume(self, resume_id, owner_id, previous_owner_id=UNKNOWN_OWNER):
+        """新建或修改简历后更新所有简历和创建人的集合，只修改原创建人和新创建人的集合"""
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._max_id = max(self._max_id, resume_id)
+            self._all |= 1 << resume_id
+            if previous_owner_id is UNKNOWN_OWNER:
+                previous = [key for key in self._owners if key != owner_id]
+            elif previous_owner_id is not None and previous_owner_id != owner_id:
+                previous = [previous_owner_id]
+            else:
+                previous = []
+            for key in previous:
+                self._update(self._owners, key, resume_id, False)
+            if owner_id is not None:
+                self._update(self._owners, owner_id, resume_id, True)
+
+    def remove_resume(self, resume_id):
+        with self._lock:
+            if self._loaded_at is None:
+                return
+            self._all &= ~(1 << resume_id)
+            for postings in (self._owners, self._tags):
+                for key in list(postings):
+                    self._update(postings, key, resume_id, False)
+
+    def remove_tag(self, tag_id):
+        with self._lock:
+            self._tags.pop(tag_id, None)
+
+tag_index = TagIndex()
@@ -1,3 +1,616 @@
-from django.test import TestCase
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from accounts.models import User
+from . import search
+from .models import ParseJob, Resume, Tag
+from .tagindex import TagQueryError, _Parser, _tokenize, compile_tag_query, iter_ids_desc, tag_index, to_q
+from .uploadhandlers import SNIFF_BYTES, detect_file_type, sniff_file_type, upload_error, upload_file_type
+from .utils import ResumeParseError, skills_by_keyword
 
-# Create your tests here.
+
+def make_resume(**fields):
+    values = {'name': '张三', 'gender': 'male', 'phone': '13800138000', 'email': 'zhangsan@example.com', 'education': 'bachelor'}
+    values.update(fields)
+    return Resume.objects.create(**values)
+
+
+class GcResumeFilesTests(TestCase):
+    """孤立简历文件清理"""
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def write_blob(self, name, age_hours=48):
+        path = os.path.join(self.media_root, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(b'content')
+        old = time.time() - age_hours * 3600
+        os.utime(path, (old, old))
+        return path
+
+    def test_keeps_same_hash_blobs_with_different_extensions(self):
+        content_hash = 'aa' + '0' * 62
+        pdf = self.write_blob(f'resume_files/aa/{content_hash}.pdf')
+        doc = self.write_blob(f'resume_files/aa/{content_hash}.doc')
+        orphan = self.write_blob(f'resume_files/bb/{"bb" + "1" * 62}.pdf')
+        make_resume(resume_file=f'resume_files/aa/{content_hash}.pdf')
+        make_resume(resume_file=f'resume_files/aa/{content_hash}.doc', email='lisi@example.com')
+
+        call_command('gc_resume_files', stdout=StringIO())
+
+        self.assertTrue(os.path.exists(pdf))
+        self.assertTrue(os.path.exists(doc))
+        self.assertFalse(os.path.exists(orphan))
+
+    def test_deleting_resume_leaves_file_for_gc(self):
+        content_hash = 'dd' + '3' * 62
+        path = self.write_blob(f'resume_files/dd/{content_hash}.pdf', age_hours=0)
+        resume = make_resume(resume_file=f'resume_files/dd/{content_hash}.pdf')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resume.delete()
+
+        self.assertTrue(os.path.exists(path))
+
+    def test_deletes_unreferenced_extension_variant(self):
+        content_hash = 'cc' + '2' * 62
+        kept = self.write_blob(f'resume_files/cc/{content_hash}.pdf')
+        orphan = self.write_blob(f'resume_files/cc/{content_hash}.docx')
+        make_resume(resume_file=f'resume_files/cc/{content_hash}.pdf')
+
+        call_command('gc_resume_files', stdout=StringIO())
+
+        self.assertTrue(os.path.exists(kept))
+        self.assertFalse(os.path.exists(orphan))
+
+
+    def test_keeps_previews_of_referenced_content(self):
+        content_hash = 'ab' + '5' * 62
+        orphan_hash = 'ac' + '6' * 62
+        preview = self.write_blob(f'resume_previews/v2/ab/{content_hash}.html')
+        orphan = self.write_blob(f'resume_previews/v2/ac/{orphan_hash}.html')
+        make_resume(resume_file=f'resume_files/ab/{content_hash}.docx')
+
+        call_command('gc_resume_files', '--directory', 'resume_previews', stdout=StringIO())
+
+        self.assertTrue(os.path.exists(preview))
+        self.assertFalse(os.path.exists(orphan))
+
+class DocxPreviewTests(TestCase):
+    """Word简历预览"""
+
+    def test_includes_hyperlink_text(self):
+        from docx import Document
+        from docx.opc.constants import RELATIONSHIP_TYPE
+        from docx.oxml.ns import qn
+        from docx.oxml.shared import OxmlElement
+        from .previews import render_docx_html
+
+        document = Document()
+        paragraph = document.add_paragraph('邮箱: ')
+        hyperlink = OxmlElement('w:hyperlink')
+        hyperlink.set(qn('r:id'), document.part.relate_to('mailto:a@example.com', RELATIONSHIP_TYPE.HYPERLINK, is_external=True))
+        run = OxmlElement('w:r')
+        text = OxmlElement('w:t')
+        text.text = 'a@example.com'
+        run.append(text)
+        hyperlink.append(run)
+        paragraph._p.append(hyperlink)
+        paragraph.add_run(' 电话').bold = True
+        buffer = BytesIO()
+        document.save(buffer)
+        buffer.seek(0)
+
+        html = render_docx_html(buffer)
+
+        self.assertIn('<p>邮箱: a@example.com<strong> 电话</strong></p>', html)
+        self.assertNotIn('mailto:', html)
+
+
+def make_zip(entries):
+    buffer = BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, content in entries:
+            archive.writestr(name, content)
+    buffer.seek(0)
+    return buffer
+
+
+class UploadFileTypeTests(TestCase):
+    """按文件内容识别上传的简历类型"""
+    CONTENT_TYPES = '<Types><Override PartName="/{part}" ContentType="{content_type}"/></Types>'
+
+    def test_accepts_word_document(self):
+        file = make_zip([('[Content_Types].xml', '<Types/>'), ('word/document.xml', '<w:document/>')])
+        self.assertEqual(detect_file_type(file), '.docx')
+
+    def test_accepts_main_part_declared_in_content_types(self):
+        content_types = self.CONTENT_TYPES.format(
+            part='word/main.xml',
+            content_type='application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml',
+        )
+        file = make_zip([('[Content_Types].xml', content_types), ('word/main.xml', '<w:document/>')])
+        self.assertEqual(detect_file_type(file), '.docx')
+
+    def test_rejects_other_ooxml_and_zip_files(self):
+        content_types = self.CONTENT_TYPES.format(
+            part='xl/workbook.xml',
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml',
+        )
+        xlsx = make_zip([('[Content_Types].xml', content_types), ('xl/workbook.xml', '<workbook/>')])
+        self.assertEqual(sniff_file_type(xlsx.read(SNIFF_BYTES)), '.docx')
+        self.assertIsNone(detect_file_type(xlsx))
+        self.assertIsNone(detect_file_type(make_zip([('docProps/app.xml', '<Properties/>')])))
+
+    def test_form_upload_of_spreadsheet_is_rejected(self):
+        request = RequestFactory().post('/', {'resume_file': SimpleUploadedFile('resume.docx', make_zip([
+            ('[Content_Types].xml', '<Types/>'), ('xl/workbook.xml', '<workbook/>'),
+        ]).read())})
+        request.resume_upload_types = {'resume_file': '.docx'}
+        request.resume_upload_errors = {}
+        self.assertEqual(upload_error(request), '不支持的文件类型，请上传PDF或Word文件')
+        self.assertIsNone(upload_file_type(request))
+
+
+@override_settings(RESUME_PARSE_ASYNC=True)
+class DocumentTextJobTests(TestCase):
+    """未经解析上传的简历文件创建提取全文的任务"""
+    CONTENT_HASH = 'ee' + '4' * 62
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        override = override_settings(MEDIA_ROOT=self.media_root)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.file_name = f'resume_files/ee/{self.CONTENT_HASH}.pdf'
+
+    def create_resume(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return make_resume(resume_file=self.file_name)
+
+    def test_creates_one_job_per_file(self):
+        resume = self.create_resume()
+        self.assertEqual(ParseJob.objects.filter(file_hash=self.CONTENT_HASH).count(), 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resume.name = '李四'
+            resume.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            Resume.objects.get(pk=resume.pk).save()
+        self.assertEqual(ParseJob.objects.count(), 1)
+
+    def test_skips_file_with_upload_job(self):
+        ParseJob.objects.create(file_path='/staging/upload', file_name='a.pdf', file_hash=self.CONTENT_HASH)
+        self.create_resume()
+        self.assertEqual(ParseJob.objects.count(), 1)
+
+    def test_does_not_requeue_failed_file(self):
+        ParseJob.objects.create(
+            file_path='/staging/upload', file_name='a.pdf', file_hash=self.CONTENT_HASH,
+            status=ParseJob.STATUS_FAILED, error_code='crashed',
+        )
+        self.create_resume()
+        self.assertEqual(ParseJob.objects.count(), 1)
+
+
+
+class ResumeSearchTests(TestCase):
+    """简历全文索引搜索"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('hr@example.com', 'hr', 'password', user_type=User.NORMAL_USER)
+
+    def test_filters_full_match_set_beyond_rank_limit(self):
+        for i in range(3):
+            make_resume(name=f'候选人{i}', current_company='阿里巴巴', created_by=self.user, email=f'c{i}@example.com')
+        make_resume(name='王五', current_company='腾讯', email='wangwu@example.com')
+
+        resumes, truncated = search.filter_resumes(Resume.objects.all(), '阿里', limit=2)
+
+        self.assertTrue(truncated)
+        self.assertEqual(resumes.count(), 3)
+        resumes, truncated = search.filter_resumes(Resume.objects.all(), '阿里', limit=3)
+        self.assertFalse(truncated)
+
+    @override_settings(RESUME_SEARCH_MAX_RESULTS=1)
+    def test_list_shows_truncation_notice(self):
+        for i in range(2):
+            make_resume(name=f'候选人{i}', current_company='阿里巴巴', created_by=self.user, email=f'c{i}@example.com')
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse('resume_list'), {'q': '阿里'})
+
+        self.assertEqual(len(response.context['resumes']), 2)
+        self.assertContains(response, '只有相关度最高的 1 份按相关度排序')
+
+
+    def indexed_rows(self, resume_id):
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT name, current_company FROM {search.FTS_TABLE} WHERE rowid = %s', [resume_id])
+            return cursor.fetchall()
+
+    def test_save_updates_index(self):
+        resume = make_resume(name='张三丰', current_company='阿里巴巴')
+        self.assertEqual(self.indexed_rows(resume.pk), [('张三 三丰', '阿里 里巴 巴巴')])
+        self.assertEqual(search.search_resume_ids('阿里巴巴'), [resume.pk])
+
+        resume.current_company = '腾讯科技'
+        resume.save()
+
+        self.assertEqual(len(self.indexed_rows(resume.pk)), 1)
+        self.assertEqual(search.search_resume_ids('阿里巴巴'), [])
+        self.assertEqual(search.search_resume_ids('腾讯'), [resume.pk])
+
+    def test_delete_removes_index_row(self):
+        resume = make_resume(current_company='阿里巴巴')
+        resume_id = resume.pk
+
+        resume.delete()
+
+        self.assertEqual(self.indexed_rows(resume_id), [])
+        self.assertEqual(search.search_resume_ids('阿里巴巴'), [])
+
+    def test_index_is_rolled_back_with_resume(self):
+        try:
+            with transaction.atomic():
+                make_resume(current_company='阿里巴巴')
+                raise RuntimeError
+        except RuntimeError:
+            pass
+
+        self.assertEqual(search.search_resume_ids('阿里巴巴'), [])
+
+    def test_search_is_limited_to_owner_and_ranked_by_field_weight(self):
+        other = User.objects.create_user('other@example.com', 'other', 'password', user_type=User.NORMAL_USER)
+        by_skill = make_resume(name='李四', skills='Python', created_by=self.user, email='lisi@example.com')
+        by_name = make_resume(name='Python', created_by=self.user, email='python@example.com')
+        make_resume(name='王五', skills='Python', created_by=other, email='wangwu@example.com')
+
+        self.assertEqual(search.search_resume_ids('python', owner_id=self.user.pk), [by_name.pk, by_skill.pk])
+        self.assertEqual(len(search.search_resume_ids('pyth')), 3)
+
+class TagIndexOwnerTests(TestCase):
+    """标签索引中创建人集合的增量更新"""
+
+    def setUp(self):
+        self.owners = [
+            User.objects.create_user(f'hr{i}@example.com', f'hr{i}', 'password', user_type=User.NORMAL_USER)
+            for i in range(3)
+        ]
+        self.tag = Tag.objects.create(name='Java')
+        self.resume = make_resume(created_by=self.owners[0])
+        make_resume(created_by=self.owners[2], email='lisi@example.com')
+        self.resume.tags.add(self.tag)
+        tag_index.rebuild()
+        self.addCleanup(setattr, tag_index, '_loaded_at', None)
+
+    def owner_ids(self, owner):
+        bits = tag_index.query(('tag', 'java'), {'java': self.tag.pk}, owner_id=owner.pk)
+        return list(iter_ids_desc(bits))
+
+    def test_owner_change_moves_resume(self):
+        resume = Resume.objects.get(pk=self.resume.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            resume.created_by = self.owners[1]
+            resume.save()
+
+        self.assertEqual(self.owner_ids(self.owners[0]), [])
+        self.assertEqual(self.owner_ids(self.owners[1]), [self.resume.pk])
+
+    def test_save_only_touches_old_and_new_owner(self):
+        resume = Resume.objects.get(pk=self.resume.pk)
+        with mock.patch.object(tag_index, '_update', wraps=tag_index._update) as update:
+            with self.captureOnCommitCallbacks(execute=True):
+                resume.name = '李四'
+                resume.save()
+            self.assertEqual({call.args[1] for call in update.call_args_list}, {self.owners[0].pk})
+            update.reset_mock()
+            with self.captureOnCommitCallbacks(execute=True):
+                resume.created_by = self.owners[1]
+                resume.save()
+            self.assertEqual({call.args[1] for call in update.call_args_list}, {self.owners[0].pk, self.owners[1].pk})
+
+    def test_unknown_previous_owner_checks_all_owners(self):
+        resume = Resume.objects.only('pk', 'name').get(pk=self.resume.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            resume.created_by = self.owners[1]
+            resume.save(update_fields=['created_by'])
+
+        self.assertEqual(self.owner_ids(self.owners[0]), [])
+        self.assertEqual(self.owner_ids(self.owners[1]), [self.resume.pk])
+
+
+class ParseJobTests(TestCase):
+    """解析任务的领取、重试和失败"""
+
+    def create_job(self, **fields):
+        values = {'file_path': '/staging/upload', 'file_name': 'resume.pdf', 'max_attempts': 3}
+        values.update(fields)
+        return ParseJob.objects.create(**values)
+
+    def test_claim_next_claims_each_job_once(self):
+        job = self.create_job()
+
+        claimed = ParseJob.objects.claim_next('worker-1')
+
+        self.assertEqual(claimed.pk, job.pk)
+        self.assertEqual(claimed.status, ParseJob.STATUS_RUNNING)
+        self.assertEqual(claimed.locked_by, 'worker-1')
+        self.assertEqual(claimed.attempts, 1)
+        self.assertIsNone(ParseJob.objects.claim_next('worker-2'))
+
+    def test_claim_next_skips_delayed_jobs_and_reclaims_expired_leases(self):
+        self.create_job(available_at=timezone.now() + timedelta(minutes=5))
+        stale = self.create_job(
+            status=ParseJob.STATUS_RUNNING, attempts=1, locked_by='worker-1',
+            started_at=timezone.now() - timedelta(seconds=700),
+        )
+
+        claimed = ParseJob.objects.claim_next('worker-2', lease_seconds=600)
+
+        self.assertEqual(claimed.pk, stale.pk)
+        self.assertEqual(claimed.locked_by, 'worker-2')
+        self.assertEqual(claimed.attempts, 2)
+        self.assertIsNone(ParseJob.objects.claim_next('worker-3', lease_seconds=600))
+
+    def test_retryable_failure_is_delayed_until_attempts_run_out(self):
+        self.create_job()
+        job = ParseJob.objects.claim_next('worker-1')
+        error = ResumeParseError('解析超时', ResumeParseError.TIMEOUT)
+
+        job.mark_failed(str(error), retry_delay=30, error_code=error.code, retryable=error.retryable)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ParseJob.STATUS_PENDING)
+        self.assertGreater(job.available_at, timezone.now() + timedelta(seconds=20))
+        self.assertIsNone(ParseJob.objects.claim_next('worker-1'))
+
+        ParseJob.objects.filter(pk=job.pk).update(available_at=timezone.now(), attempts=job.max_attempts - 1)
+        job = ParseJob.objects.claim_next('worker-1')
+        job.mark_failed('解析超时', error_code=ResumeParseError.TIMEOUT)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ParseJob.STATUS_FAILED)
+        self.assertIsNotNone(job.finished_at)
+
+    def test_permanent_failure_is_not_retried(self):
+        self.create_job()
+        job = ParseJob.objects.claim_next('worker-1')
+        error = ResumeParseError('解析进程异常退出', ResumeParseError.CRASHED)
+
+        job.mark_failed(str(error), error_code=error.code, retryable=error.retryable)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, ParseJob.STATUS_FAILED)
+        self.assertEqual(job.error_code, ResumeParseError.CRASHED)
+        self.assertEqual(job.attempts, 1)
+        self.assertFalse(ResumeParseError('', ResumeParseError.MEMORY).retryable)
+        self.assertFalse(ResumeParseError('', ResumeParseError.TOO_LARGE).retryable)
+
+    def test_mark_succeeded_stores_result(self):
+        self.create_job()
+        job = ParseJob.objects.claim_next('worker-1')
+
+        job.mark_succeeded({'name': '张三'})
+
+        job.refresh_from_db()
+        self.assertTrue(job.is_finished)
+        self.assertEqual(job.result, {'name': '张三'})
+
+
+@override_settings(RESUME_PARSE_ASYNC=True)
+class ChunkedUploadTests(TestCase):
+    """分块上传简历文件"""
+    CONTENT = b'%PDF-1.4\n' + b'0' * 200
+
+    def setUp(self):
+        staging_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, staging_dir, ignore_errors=True)
+        override = override_settings(RESUME_STAGING_DIR=staging_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = User.objects.create_user('hr@example.com', 'hr', 'password', user_type=User.NORMAL_USER)
+        self.client.force_login(self.user)
+        response = self.client.post(reverse('resume_upload_start'), {'filename': 'resume.pdf', 'size': len(self.CONTENT)})
+        self.assertEqual(response.status_code, 201)
+        self.upload = response.json()
+
+    def put_chunk(self, offset, data):
+        return self.client.put(
+            f"{self.upload['upload_url']}?offset={offset}", data=data, content_type='application/octet-stream'
+        )
+
+    def finalize(self, sha256):
+        return self.client.post(self.upload['finalize_url'], {'sha256': sha256})
+
+    def test_offset_mismatch_returns_current_offset(self):
+        self.assertEqual(self.put_chunk(0, self.CONTENT[:100]).json()['offset'], 100)
+
+        response = self.put_chunk(0, self.CONTENT[:100])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 100)
+        response = self.put_chunk(150, self.CONTENT[150:])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 100)
+
+        self.assertEqual(self.put_chunk(100, self.CONTENT[100:]).json()['offset'], len(self.CONTENT))
+        self.assertEqual(self.client.get(self.upload['upload_url']).json()['offset'], len(self.CONTENT))
+
+    def test_finalize_requires_complete_upload(self):
+        self.put_chunk(0, self.CONTENT[:100])
+
+        response = self.finalize(hashlib.sha256(self.CONTENT).hexdigest())
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json()['offset'], 100)
+
+    def test_finalize_rejects_sha256_mismatch(self):
+        self.put_chunk(0, self.CONTENT)
+
+        response = self.finalize(hashlib.sha256(b'other').hexdigest())
+
+        self.assertEqual(response.status_code, 422)
+        # 内容已损坏的上传被丢弃，需要重新上传
+        self.assertEqual(self.client.get(self.upload['upload_url']).status_code, 404)
+        self.assertFalse(ParseJob.objects.exists())
+
+    def test_finalize_creates_parse_job(self):
+        self.put_chunk(0, self.CONTENT)
+
+        response = self.finalize(hashlib.sha256(self.CONTENT).hexdigest().upper())
+
+        self.assertEqual(response.status_code, 200)
+        job = ParseJob.objects.get(pk=response.json()['job_id'])
+        self.assertEqual(job.file_type, '.pdf')
+        self.assertEqual(job.file_hash, hashlib.sha256(self.CONTENT).hexdigest())
+        self.assertEqual(job.created_by, self.user)
+
+
+class ContactLookupTests(TestCase):
+    """按电话号码或邮箱精确查找简历"""
+
+    def test_normalize_phone(self):
+        self.assertEqual(search.normalize_phone('138-0013-8000'), '13800138000')
+        self.assertEqual(search.normalize_phone('+86 138 0013 8000'), '13800138000')
+        self.assertEqual(search.normalize_phone('0086 (138) 0013 8000'), '13800138000')
+        # 国家代码后不是11位手机号时保留全部数字
+        self.assertEqual(search.normalize_phone('86-10-12345678'), '861012345678')
+        self.assertEqual(search.normalize_phone(None), '')
+
+    def test_normalize_email(self):
+        self.assertEqual(search.normalize_email('  ZhangSan@Example.COM '), 'zhangsan@example.com')
+        self.assertEqual(search.normalize_email(None), '')
+
+    def test_exact_lookup(self):
+        self.assertEqual(search.exact_lookup(' ZhangSan@Example.com '), ('email_normalized', 'zhangsan@example.com'))
+        self.assertEqual(search.exact_lookup('+86 138-0013-8000'), ('phone_normalized', '13800138000'))
+        self.assertIsNone(search.exact_lookup('138'))
+        self.assertIsNone(search.exact_lookup('Java 工程师'))
+        self.assertIsNone(search.exact_lookup('zhangsan@'))
+
+    def test_save_stores_normalized_contacts(self):
+        resume = make_resume(phone='+86 138 0013 8000', email='ZhangSan@Example.com')
+
+        resume.refresh_from_db()
+        self.assertEqual(resume.phone_normalized, '13800138000')
+        self.assertEqual(resume.email_normalized, 'zhangsan@example.com')
+
+    def test_list_finds_resume_by_formatted_phone_or_email(self):
+        user = User.objects.create_user('hr@example.com', 'hr', 'password', user_type=User.NORMAL_USER)
+        resume = make_resume(phone='13800138000', email='zhangsan@example.com', created_by=user)
+        make_resume(phone='13900139000', email='lisi@example.com', created_by=user)
+        self.client.force_login(user)
+
+        for query in ('+86 138-0013-8000', 'ZhangSan@Example.com'):
+            response = self.client.get(reverse('resume_list'), {'q': query})
+            self.assertEqual([r.pk for r in response.context['resumes']], [resume.pk])
+        # 只输入部分号码时按一般搜索处理
+        response = self.client.get(reverse('resume_list'), {'q': '1380013'})
+        self.assertEqual([r.pk for r in response.context['resumes']], [resume.pk])
+
+
+class TagQueryTests(TestCase):
+    """标签表达式的解析和求值"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('hr@example.com', 'hr', 'password', user_type=User.NORMAL_USER)
+        tags = {name: Tag.objects.create(name=name) for name in ('Java', '上海', '外包', 'Spring Boot')}
+        self.resumes = {}
+        for i, names in enumerate([('Java', '上海'), ('Java', '上海', '外包'), ('Java', 'Spring Boot'), ('上海',), ()]):
+            resume = make_resume(email=f'c{i}@example.com', created_by=self.user if i % 2 == 0 else None)
+            resume.tags.set([tags[name] for name in names])
+            self.resumes[i] = resume.pk
+        tag_index.rebuild()
+        self.addCleanup(setattr, tag_index, '_loaded_at', None)
+
+    def evaluate(self, text, owner_id=None):
+        node, tag_ids = compile_tag_query(text)
+        indexed = sorted(iter_ids_desc(tag_index.query(node, tag_ids, owner_id)))
+        resumes = Resume.objects.filter(to_q(node, tag_ids))
+        if owner_id is not None:
+            resumes = resumes.filter(created_by_id=owner_id)
+        self.assertEqual(indexed, sorted(resumes.values_list('pk', flat=True)))
+        return {i for i, pk in self.resumes.items() if pk in indexed}
+
+    def test_parse_precedence(self):
+        self.assertEqual(
+            _Parser(_tokenize('Java AND 上海 NOT 外包')).parse(),
+            ('and', ('and', ('tag', 'Java'), ('tag', '上海')), ('not', ('tag', '外包'))),
+        )
+        self.assertEqual(
+            _Parser(_tokenize('java or 上海 "Spring Boot"')).parse(),
+            ('or', ('tag', 'java'), ('and', ('tag', '上海'), ('tag', 'Spring Boot'))),
+        )
+        self.assertEqual(
+            _Parser(_tokenize('(Java OR 上海) NOT 外包')).parse(),
+            ('and', ('or', ('tag', 'Java'), ('tag', '上海')), ('not', ('tag', '外包'))),
+        )
+
+    def test_parse_errors(self):
+        cases = {
+            '': '请输入标签表达式',
+            'Java AND': '标签表达式不完整',
+            '(Java OR 上海': '标签表达式缺少右括号',
+            'Java)': '标签表达式中有多余的右括号',
+            '"Spring Boot': '标签表达式中的引号不匹配',
+            'AND Java': '标签表达式在“AND”附近有误',
+            'Java ""': '标签名称不能为空',
+            'Java OR Go OR Rust': '标签不存在: go、rust',
+        }
+        for text, message in cases.items():
+            with self.subTest(text=text), self.assertRaisesMessage(TagQueryError, message):
+                compile_tag_query(text)
+
+    def test_evaluate(self):
+        self.assertEqual(self.evaluate('Java AND 上海 NOT 外包'), {0})
+        self.assertEqual(self.evaluate('JAVA and "spring boot"'), {2})
+        self.assertEqual(self.evaluate('(Java OR 上海) NOT 外包'), {0, 2, 3})
+        self.assertEqual(self.evaluate('NOT Java'), {3, 4})
+        self.assertEqual(self.evaluate('NOT NOT 外包'), {1})
+
+    def test_evaluate_for_owner(self):
+        self.assertEqual(self.evaluate('Java OR 上海', owner_id=self.user.pk), {0, 2})
+        self.assertEqual(self.evaluate('NOT Java', owner_id=self.user.pk), {4})
+
+    def test_index_follows_tag_changes(self):
+        resume = Resume.objects.get(pk=self.resumes[3])
+        with self.captureOnCommitCallbacks(execute=True):
+            resume.tags.add(Tag.objects.get(name='Java'))
+        self.assertEqual(self.evaluate('Java NOT 外包'), {0, 2, 3})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            resume.tags.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            Tag.objects.get(name='外包').delete()
+        self.assertEqual(self.evaluate('Java'), {0, 1, 2})
+        self.assertEqual(self.evaluate('上海'), {0, 1})
+
+
+class SkillKeywordTests(TestCase):
+    """没有技能段落时按关键词提取技能"""
+
+    def test_keeps_keywords_within_thirty_characters(self):
+        text = '熟练使用UIKit,Foundation等系统框架,熟悉UI界面的搭建和适配,熟悉App Store上线审核流程'
+
+        self.assertEqual(skills_by_keyword(text), ['熟练使用UIKit', '熟悉UI界面的搭建和适配', '熟悉App Store上线审核流程'])
+
+    def test_removes_exact_repeats(self):
+        self.assertEqual(skills_by_keyword('精通Java；精通Java\n熟悉MySQL;了解Go'), ['精通Java', '熟悉MySQL', '了解Go'])
@@ -0,0 +1,88 @@
+"""下拉选项的前缀搜索（typeahead）
+
+公司、项目、标签和候选人的下拉框只渲染已选中的选项，其余选项在输入时从 typeahead 接口按前缀加载。
+前缀条件写成 LOWER(名称) 的范围查询，可以使用模型上 Lower(名称) 的表达式索引
+（icontains/istartswith 生成的 LIKE 条件只能全表扫描）；查询结果按用户的可见范围短时间缓存。
+"""
+import hashlib
+import json
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.functions import Lower
+from .models import Company, Project, Resume, Tag
+
+# 比任何字符都大，前缀加上它作为范围查询的上界
+_PREFIX_UPPER_BOUND = '\U0010ffff'
+
+def visible_companies(user):
+    """可以关联到项目的公司：系统管理员可见全部，其他用户可见自己和系统管理员创建的公司"""
+    companies = Company.objects.all()
+    if not user.is_system_admin:
+        companies = companies.filter(Q(created_by=user) | Q(created_by__user_type='system_admin'))
+    return companies
+
+def visible_tags(user):
+    """可以使用的标签：系统管理员可见全部，其他用户可见自己创建的标签和公共标签"""
+    tags = Tag.objects.all()
+    if not user.is_system_admin:
+        tags = tags.filter(Q(created_by=user) | Q(created_by__isnull=True))
+    return tags
+
+def visible_resumes(user):
+    """可以查看的简历：管理员可见全部，普通用户只能看到自己创建的简历"""
+    resumes = Resume.objects.all()
+    if not user.is_system_admin and not user.is_admin:
+        resumes = resumes.filter(created_by=user)
+    return resumes
+
+def visible_projects(user):
+    """项目对所有用户可见"""
+    return Project.objects.select_related('company')
+
+def _user_scope(user):
+    return 'all' if user.is_system_admin else user.pk
+
+def _resume_scope(user):
+    return 'all' if user.is_system_admin or user.is_admin else user.pk
+
+def _resume_label(resume):
+    return f'{resume.name}（{resume.current_company}）' if resume.current_company else resume.name
+
+# 类型 -> (可见范围, 匹配的字段, 选项文字, 缓存的可见范围标识)
+SOURCES = {
+    'companies': (visible_companies, 'name', lambda company: company.name, _user_scope),
+    'projects': (
+        visible_projects, 'title', lambda project: f'{project.title}（{project.company.name}）', lambda user: 'all'
+    ),
+    'tags': (visible_tags, 'name', lambda tag: tag.name, _user_scope),
+    'candidates': (visible_resumes, 'name', _resume_label, _resume_scope),
+}
+
+def prefix_filter(queryset, field, prefix):
+    """按不区分大小写的前缀筛选，结果按该字段排序"""
+    queryset = queryset.alias(typeahead_key=Lower(field))
+    prefix = prefix.lower()
+    if prefix:
+        queryset = queryset.filter(typeahead_key__gte=prefix, typeahead_key__lt=prefix + _PREFIX_UPPER_BOUND)
+    return queryset.order_by('typeahead_key', 'pk')
+
+def lookup(kind, user, query='', limit=None, exclude=(), active_only=False):
+    """返回前缀匹配的选项 [{'id': ..., 'text': ...}]，kind 不存在时抛出 KeyError"""
+    visible, field, label, scope = SOURCES[kind]
+    if limit is None:
+        limit = getattr(settings, 'TYPEAHEAD_LIMIT', 10)
+    query = query.strip()[:100]
+    exclude = sorted(set(exclude))
+    params = json.dumps([query, exclude, active_only], ensure_ascii=False)
+    key = f'typeahead:{kind}:{scope(user)}:{limit}:{hashlib.sha1(params.encode()).hexdigest()}'
+    results = cache.get(key)
+    if results is None:
+        queryset = prefix_filter(visible(user), field, query)
+        if exclude:
+            queryset = queryset.exclude(pk__in=exclude)
+        if active_only and kind == 'projects':
+            queryset = queryset.filter(status__code='active')
+        results = [{'id': obj.pk, 'text': label(obj)} for obj in queryset[:limit]]
+        cache.set(key, results, getattr(settings, 'TYPEAHEAD_CACHE_TTL', 30))
+    return results
@@ -0,0 +1,144 @@
+"""简历上传处理器：接收数据时根据文件头识别文件类型并限制大小
+
+识别出的类型（'.pdf'、'.docx'、'.doc'）记录在 request.resume_upload_types 中，后续解析直接使用，
+不再根据扩展名判断。类型无法识别或超过该类型的大小上限时，放弃该文件剩余的数据（不再缓存或写入磁盘），
+原因记录在 request.resume_upload_errors 中。
+
+文件头只能看到ZIP的第一个条目，Excel、PowerPoint等OOXML文件的文件头与Word相同，
+因此识别为 '.docx' 的文件在接收完成后还要检查ZIP目录中是否有Word文档的主体部分。
+"""
+import struct
+import zipfile
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+
+DEFAULT_MAX_SIZES = {
+    '.pdf': 20 * 1024 * 1024,
+    '.docx': 10 * 1024 * 1024,
+    '.doc': 10 * 1024 * 1024,
+}
+
+# 识别类型需要的文件头长度（ZIP本地文件头30字节加第一个条目名）
+SNIFF_BYTES = 64
+_PDF_MAGIC = b'%PDF-'
+_ZIP_MAGIC = b'PK\x03\x04'
+_OLE_MAGIC = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+# OOXML文档中可能作为第一个ZIP条目的文件
+_OOXML_ENTRY_PREFIXES = (b'[Content_Types].xml', b'_rels/', b'docProps/', b'word/')
+_WORD_MAIN_PART = 'word/document.xml'
+_WORD_MAIN_CONTENT_TYPE = b'application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml'
+# [Content_Types].xml 最多读取的字节数
+_CONTENT_TYPES_MAX_BYTES = 1024 * 1024
+
+def sniff_file_type(head):
+    """根据文件头识别简历文件类型，无法识别时返回None
+
+    '.docx' 只表示文件是OOXML格式，需要再用 is_word_document 检查完整文件。
+    """
+    # PDF规范允许文件头前有少量其他字节
+    if _PDF_MAGIC in head[:32]:
+        return '.pdf'
+    if head.startswith(_ZIP_MAGIC) and len(head) >= 30:
+        name_length = struct.unpack('<H', head[26:28])[0]
+        name = head[30:30 + name_length]
+        if name.startswith(_OOXML_ENTRY_PREFIXES):
+            return '.docx'
+        return None
+    if head.startswith(_OLE_MAGIC):
+        return '.doc'
+    return None
+
+def is_word_document(file):
+    """ZIP目录中有 word/document.xml，或 [Content_Types].xml 声明了Word文档主体时返回True"""
+    try:
+        file.seek(0)
+        with zipfile.ZipFile(file) as archive:
+            names = set(archive.namelist())
+            if _WORD_MAIN_PART in names:
+                return True
+            if '[Content_Types].xml' not in names:
+                return False
+            with archive.open('[Content_Types].xml') as content_types:
+                return _WORD_MAIN_CONTENT_TYPE in content_types.read(_CONTENT_TYPES_MAX_BYTES)
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, OSError, EOFError):
+        return False
+    finally:
+        file.seek(0)
+
+def detect_file_type(file):
+    """识别完整文件的类型，无法识别或不是Word文档的OOXML文件返回None"""
+    file.seek(0)
+    file_type = sniff_file_type(file.read(SNIFF_BYTES))
+    if file_type == '.docx' and not is_word_document(file):
+        return None
+    file.seek(0)
+    return file_type
+
+def max_upload_size(file_type=None):
+    """该类型简历文件的大小上限，未指定类型时返回各类型中最大的上限"""
+    max_sizes = getattr(settings, 'RESUME_UPLOAD_MAX_SIZES', DEFAULT_MAX_SIZES)
+    if file_type is None:
+        return max(max_sizes.values())
+    return max_sizes.get(file_type, DEFAULT_MAX_SIZES[file_type])
+
+def upload_error(request, field_name='resume_file'):
+    """取出上传时记录的错误信息，识别为 '.docx' 的文件在此检查是否确实是Word文档"""
+    errors = getattr(request, 'resume_upload_errors', {})
+    if field_name not in errors and upload_file_type(request, field_name) == '.docx':
+        file = request.FILES.get(field_name)
+        if file is not None and not is_word_document(file):
+            errors[field_name] = '不支持的文件类型，请上传PDF或Word文件'
+            del request.resume_upload_types[field_name]
+    return errors.get(field_name)
+
+def upload_file_type(request, field_name='resume_file'):
+    """取出上传时识别的文件类型"""
+    return getattr(request, 'resume_upload_types', {}).get(field_name)
+
+class ResumeUploadHandler(FileUploadHandler):
+    """只检查 RESUME_UPLOAD_FIELDS 中的字段，数据原样交给后续处理器保存"""
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.active = field_name in getattr(settings, 'RESUME_UPLOAD_FIELDS', ['resume_file'])
+        self.head = b''
+        self.file_type = None
+        self.max_size = None
+        if self.active and self.request is not None:
+            if not hasattr(self.request, 'resume_upload_types'):
+                self.request.resume_upload_types = {}
+                self.request.resume_upload_errors = {}
+
+    def _reject(self, message):
+        self.request.resume_upload_errors[self.field_name] = message
+        raise SkipFile(message)
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.active or self.request is None:
+            return raw_data
+        if self.file_type is None:
+            self.head += raw_data[:SNIFF_BYTES - len(self.head)]
+            if len(self.head) < SNIFF_BYTES:
+                # 数据不足时先交给后续处理器，收齐文件头或文件结束时再判断
+                return raw_data
+            self._detect()
+        if start + len(raw_data) > self.max_size:
+            self._reject(f'文件大小超过上限{self.max_size // (1024 * 1024)}MB')
+        return raw_data
+
+    def _detect(self):
+        self.file_type = sniff_file_type(self.head)
+        if self.file_type is None:
+            self._reject('不支持的文件类型，请上传PDF或Word文件')
+        self.max_size = max_upload_size(self.file_type)
+        self.request.resume_upload_types[self.field_name] = self.file_type
+
+    def file_complete(self, file_size):
+        if self.active and self.request is not None and self.file_type is None:
+            # 小于文件头长度的文件，此时已无法放弃，只记录错误
+            self.file_type = sniff_file_type(self.head)
+            if self.file_type is None:
+                self.request.resume_upload_errors[self.field_name] = '不支持的文件类型，请上传PDF或Word文件'
+            else:
+                self.request.resume_upload_types[self.field_name] = self.file_type
+        return None
@@ -33,6 +33,11 @@ urlpatterns = [
     path('bookmarks/', views.resume_bookmark_list, name='resume_bookmark_list'),
     path('resumes/<int:pk>/download/', views.resume_download, name='resume_download'),
     path('resumes/<int:pk>/preview/', views.resume_preview, name='resume_preview'),
+    path('resumes/uploads/', views.resume_upload_start, name='resume_upload_start'),
+    path('resumes/uploads/<str:token>/', views.resume_upload_chunk, name='resume_upload_chunk'),
+    path('resumes/uploads/<str:token>/finalize/', views.resume_upload_finalize, name='resume_upload_finalize'),
+    path('parse-jobs/<int:pk>/', views.parse_job_status, name='parse_job_status'),
+    path('parser-metrics/', views.parser_metrics, name='parser_metrics'),
     
     # 简历投递
     path('resumes/<int:resume_id>/submit/<int:project_id>/', views.resume_submit, name='resume_submit'),
@@ -57,4 +62,7 @@ urlpatterns = [
     
     # 仪表板
     path('dashboard/', views.hr_dashboard, name='hr_dashboard'),
+    
+    # 下拉框选项前缀搜索
+    path('typeahead/<str:kind>/', views.typeahead, name='typeahead'),
 ] 
\ No newline at end of file
@@ -1,94 +1,534 @@
+import io
 import os
 import re
+import signal
 import logging
+import resource
+import threading
+import unicodedata
+import multiprocessing
 from datetime import datetime
 from dateutil import parser
 import spacy
 from docx import Document
 from PyPDF2 import PdfReader
 from django.conf import settings
+from django.core.files import File
+from django.db import IntegrityError, transaction
+from .metrics import registry as metrics, size_bucket
+from .storage import hash_file
 
 logger = logging.getLogger(__name__)
 
+# 解析器版本，修改提取逻辑导致解析结果变化时需要递增，旧版本的缓存结果会自动失效
+PARSER_VERSION = '4'
+
+# 提取逻辑只用到命名实体识别，其余组件默认不加载以降低常驻内存
+DEFAULT_SPACY_MODEL = 'zh_core_web_sm'
+DEFAULT_SPACY_EXCLUDE = ['tagger', 'parser', 'attribute_ruler', 'senter', 'lemmatizer']
+
+# 预处理使用的模式
+_NEWLINE_RE = re.compile(r'\r\n?')
+_PUNCTUATION_REPLACEMENTS = (('：', ':'), ('，', ','), ('、', ','))
+_BLANK_LINES_RE = re.compile(r'\n\s*\n')
+_INLINE_SPACES_RE = re.compile(r'[^\S\n]+')
+
+# 段落标题，分组名即段落名称
+SECTION_HEADINGS = {
+    'education': ('教育背景', '教育经历', '学习经历', '学历'),
+    'work': ('工作经历', '工作经验', '工作背景', '工作履历'),
+    'skills': ('技能特长', '专业技能', '技术技能', '个人技能', '核心技能'),
+}
+_SECTION_BY_HEADING = {heading: name for name, headings in SECTION_HEADINGS.items() for heading in headings}
+# 使用不带命名分组的平铺分支，正则引擎可以按首字符集合快速跳过无关位置
+_SECTION_HEADING_RE = re.compile('|'.join(_SECTION_BY_HEADING))
+_SECTION_BODY_START_RE = re.compile(r':?\s*')
+
+# 基本信息提取模式
+_NAME_PATTERNS = [re.compile(pattern) for pattern in (
+    r'姓名[：:]\s*([^\n]+)',
+    r'姓\s*名[：:]\s*([^\n]+)',
+    r'([^\n]{2,4})\s*的简历',
+    r'个人简历[：:]\s*([^\n]+)',
+    r'([^\n]{2,4})\s*的个人简历',
+)]
+_PARENTHESES_RE = re.compile(r'[（(].*?[)）]')
+_GENDER_PATTERNS = [re.compile(pattern) for pattern in (
+    r'性别[：:]\s*([男女])',
+    r'([男女])\s*性',
+    r'([男女])\s*生',
+)]
+# (模式, 是否为出生年份)
+_AGE_PATTERNS = [
+    (re.compile(r'年龄[：:]\s*(\d{1,2})'), False),
+    (re.compile(r'(\d{1,2})\s*岁'), False),
+    (re.compile(r'(\d{4})年出生'), True),
+]
+_PHONE_RE = re.compile(r'1[3-9]\d{9}')
+_EMAIL_RE = re.compile(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}')
+
+# 段落内容提取模式
+_ITEM_SPLIT_RE = re.compile(r'\n(?=\d{4}|\d{2}年)')
+_SKILL_SPLIT_RE = re.compile(r'[,，、；;]')
+_SPACES_RE = re.compile(r'\s+')
+_SCHOOL_RE = re.compile(r'(?:大学|学院|学校)[^，。\n]{0,30}')
+_COMPANY_RE = re.compile(r'(?:公司|企业|集团)[^，。\n]{0,30}')
+# 较长的关键词排在前面，避免“熟练使用”再被“熟练”重复匹配；
+# 关键词后的内容在中英文逗号、分号处结束，避免一条技能吞掉后面以关键词开头的另一条
+_SKILL_KEYWORD_RE = re.compile(r'(?:熟练使用|熟练操作|精通|熟悉|掌握|了解|熟练|擅长)[^，。,;；\n]{0,30}')
+
+def skills_by_keyword(text):
+    """没有技能段落时，取以“熟悉”“精通”等关键词开头的短句作为技能，去掉重复的条目"""
+    skills = []
+    for match in _SKILL_KEYWORD_RE.finditer(text):
+        skill = match.group(0).strip()
+        if len(skill) > 3 and skill not in skills:
+            skills.append(skill)
+    return skills
+
+def segment_resume(text):
+    """一次扫描全文，返回段落名称到 (起始, 结束) 位置的映射
+
+    header 为第一个段落标题之前的简历开头部分；其余段落取第一次出现的标题
+    （优先带冒号的标题）之后到下一个空行为止的内容。
+    """
+    first = {}
+    with_colon = {}
+    header_end = len(text)
+    for match in _SECTION_HEADING_RE.finditer(text):
+        name = _SECTION_BY_HEADING[match.group(0)]
+        header_end = min(header_end, match.start())
+        if name not in first:
+            first[name] = match
+        if name not in with_colon and text.startswith(':', match.end()):
+            with_colon[name] = match
+        if len(with_colon) == len(SECTION_HEADINGS):
+            break
+    
+    sections = {'header': (0, header_end)}
+    for name, match in first.items():
+        match = with_colon.get(name, match)
+        start = _SECTION_BODY_START_RE.match(text, match.end()).end()
+        end = text.find('\n\n', start)
+        sections[name] = (start, end if end != -1 else len(text))
+    return sections
+
+# PDF逐页读取时判断是否可以提前停止的信号：联系方式和所有段落标题
+_PDF_REQUIRED_SIGNALS = {'phone', 'email', *SECTION_HEADINGS}
+
+def _pdf_page_signals(page_text):
+    """返回单页文本中出现的信号"""
+    signals = {_SECTION_BY_HEADING[match.group(0)] for match in _SECTION_HEADING_RE.finditer(page_text)}
+    if _PHONE_RE.search(page_text):
+        signals.add('phone')
+    if _EMAIL_RE.search(page_text):
+        signals.add('email')
+    return signals
+
+def _pdf_page_has_text_layer(page):
+    """页面资源中没有字体（包括表单XObject中的字体）时不可能有文本，通常是扫描图片"""
+    resources = page.get('/Resources')
+    if resources is None:
+        return False
+    resources = resources.get_object()
+    if '/Font' in resources:
+        return True
+    xobjects = resources.get('/XObject')
+    if xobjects is None:
+        return False
+    for xobject in xobjects.get_object().values():
+        xobject = xobject.get_object()
+        if xobject.get('/Subtype') != '/Form':
+            continue
+        form_resources = xobject.get('/Resources')
+        if form_resources is not None and '/Font' in form_resources.get_object():
+            return True
+    return False
+
+class ResumeParseError(Exception):
+    """简历解析失败，code标识失败原因"""
+    TOO_LARGE = 'too_large'
+    TIMEOUT = 'timeout'
+    MEMORY = 'memory'
+    CRASHED = 'crashed'
+    FAILED = 'failed'
+    # 超出限制或导致解析进程崩溃的文件，重试也不会成功；超时可能由机器负载过高引起，允许重试
+    PERMANENT_CODES = (TOO_LARGE, MEMORY, CRASHED)
+
+    def __init__(self, message, code=FAILED):
+        super().__init__(message)
+        self.code = code
+
+    @property
+    def retryable(self):
+        return self.code not in self.PERMANENT_CODES
+
+def _address_space_size():
+    """当前进程已占用的虚拟地址空间（字节），无法获取时返回0"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def _set_rlimit(kind, soft, hard):
+    """设置资源限制，不超过当前的硬限制"""
+    current_hard = resource.getrlimit(kind)[1]
+    if current_hard != resource.RLIM_INFINITY:
+        soft = min(soft, current_hard)
+        hard = min(hard, current_hard)
+    resource.setrlimit(kind, (soft, hard))
+
+def _sandbox_main(parser, data, name, file_type, memory_limit_mb, cpu_limit, conn, extract_info=True):
+    """解析子进程入口：设置资源限制后解析文件，通过管道返回 (提取的信息, 全文) 和指标"""
+    try:
+        if memory_limit_mb:
+            # 在fork继承的地址空间（已加载的模型等）之外，允许解析额外占用的地址空间
+            limit = _address_space_size() + memory_limit_mb * 1024 * 1024
+            _set_rlimit(resource.RLIMIT_AS, limit, limit)
+        if cpu_limit:
+            # 父进程超时未能终止子进程时的兜底，超过软限制收到SIGXCPU
+            _set_rlimit(resource.RLIMIT_CPU, cpu_limit, cpu_limit + 5)
+        try:
+            text = parser.extract_text(File(io.BytesIO(data), name=name), file_type)
+            info = parser._extract_info(text) if extract_info else None
+            message = ('ok', (info, text))
+        except MemoryError:
+            message = ('error', (ResumeParseError.MEMORY, f"解析超过内存上限{memory_limit_mb}MB"))
+        except Exception as e:
+            message = ('error', (ResumeParseError.FAILED, str(e)))
+        conn.send(message + (metrics.export(),))
+    finally:
+        conn.close()
+
+# 统计提取命中率的字段
+_METRIC_FIELDS = ('name', 'gender', 'age', 'phone', 'email', 'education', 'work_experience', 'skills')
+
+def _section_text(text, sections, name):
+    """取出段落文本，段落不存在时返回None"""
+    span = sections.get(name)
+    return text[span[0]:span[1]] if span else None
+
 class ResumeParser:
-    def __init__(self):
+    def __init__(self, model_name=None, exclude=None, full_doc_nlp=None, max_text_length=None, ner_max_chars=None):
+        if model_name is None:
+            model_name = getattr(settings, 'RESUME_PARSER_SPACY_MODEL', DEFAULT_SPACY_MODEL)
+        if exclude is None:
+            exclude = getattr(settings, 'RESUME_PARSER_SPACY_EXCLUDE', DEFAULT_SPACY_EXCLUDE)
+        # 是否对全文执行完整的spaCy流水线（仅在下游功能需要全文实体时开启）
+        if full_doc_nlp is None:
+            full_doc_nlp = getattr(settings, 'RESUME_PARSER_FULL_DOC_NLP', False)
+        # 参与提取的文本最大长度，超出部分会被截断
+        if max_text_length is None:
+            max_text_length = getattr(settings, 'RESUME_PARSER_MAX_TEXT_LENGTH', 200000)
+        # 命名实体识别最多分析的字符数
+        if ner_max_chars is None:
+            ner_max_chars = getattr(settings, 'RESUME_PARSER_NER_MAX_CHARS', 1000)
+        self.full_doc_nlp = full_doc_nlp
+        self.max_text_length = max_text_length
+        self.ner_max_chars = ner_max_chars
         try:
             # 加载中文语言模型
-            self.nlp = spacy.load("zh_core_web_sm")
-            logger.info("成功加载中文语言模型")
+            self.nlp = spacy.load(model_name, exclude=list(exclude))
+            self.nlp.max_length = max(self.nlp.max_length, max_text_length + 1)
+            logger.info(f"成功加载中文语言模型: {model_name}, 组件: {self.nlp.pipe_names}")
         except Exception as e:
             logger.error(f"加载中文语言模型失败: {str(e)}")
             raise
         
-    def parse_file(self, file):
-        """解析简历文件"""
+        # 识别姓名时只运行ner及其依赖的tok2vec组件
+        self._has_ner = 'ner' in self.nlp.pipe_names
+        self._ner_disable = [
+            name for name, pipe in self.nlp.pipeline
+            if name != 'ner' and 'ner' not in getattr(pipe, 'listening_components', [])
+        ]
+        
+    def parse_file(self, file, use_cache=None, sandbox=None, file_type=None):
+        """解析简历文件，内容相同的文件直接返回缓存的解析结果
+
+        sandbox为True时在子进程中解析，超时、超出内存上限或崩溃时抛出ResumeParseError。
+        file_type为上传时根据文件头识别的类型（如'.pdf'），未提供时按扩展名判断。
+        """
+        if use_cache is None:
+            use_cache = getattr(settings, 'RESUME_PARSE_CACHE_ENABLED', True)
+        if sandbox is None:
+            sandbox = getattr(settings, 'RESUME_PARSER_SANDBOX', False)
         try:
-            file_ext = os.path.splitext(file.name)[1].lower()
-            logger.info(f"开始解析文件: {file.name}, 类型: {file_ext}")
-            
-            if file_ext == '.pdf':
-                return self._parse_pdf(file)
-            elif file_ext in ['.doc', '.docx']:
-                return self._parse_docx(file)
-            else:
-                raise ValueError(f"不支持的文件格式: {file_ext}")
+            with metrics.timer('parse'):
+                self._check_file_size(file)
+                content_hash = hash_file(file)
+                # 全文尚未保存时即使有缓存也重新提取
+                if use_cache and has_document_text(content_hash):
+                    cached = get_cached_result(content_hash)
+                    if cached is not None:
+                        metrics.inc('cache', result='hit')
+                        logger.info(f"命中解析结果缓存: {file.name}, 哈希: {content_hash}")
+                        return cached
+                if use_cache:
+                    metrics.inc('cache', result='miss')
+                
+                if sandbox:
+                    info, text = self._extract_in_sandbox(file, file_type)
+                else:
+                    text = self.extract_text(file, file_type)
+                    info = self._extract_info(text)
+                
+                store_document_text(content_hash, text)
+                if use_cache:
+                    store_cached_result(content_hash, info)
+                return info
         except Exception as e:
+            metrics.inc('errors', code=getattr(e, 'code', ResumeParseError.FAILED))
             logger.error(f"解析文件失败: {str(e)}")
             raise
     
+    def extract_document_text(self, file, file_type=None, sandbox=None):
+        """只提取简历文件的全文，不提取信息"""
+        if sandbox is None:
+            sandbox = getattr(settings, 'RESUME_PARSER_SANDBOX', False)
+        self._check_file_size(file)
+        if sandbox:
+            return self._extract_in_sandbox(file, file_type, extract_info=False)[1]
+        return self.extract_text(file, file_type)
+    
+    def _check_file_size(self, file):
+        """拒绝超过大小上限的文件"""
+        max_size = getattr(settings, 'RESUME_PARSER_MAX_FILE_SIZE', 20 * 1024 * 1024)
+        if max_size and file.size > max_size:
+            raise ResumeParseError(f"文件大小{file.size}字节超过上限{max_size}字节", ResumeParseError.TOO_LARGE)
+    
+    def _extract_in_sandbox(self, file, file_type=None, extract_info=True):
+        """在fork出的子进程中提取文本和信息，返回 (提取的信息, 全文)，子进程继承已加载的模型"""
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            logger.warning("当前平台不支持fork，在当前进程中解析")
+            text = self.extract_text(file, file_type)
+            return (self._extract_info(text) if extract_info else None), text
+        timeout = getattr(settings, 'RESUME_PARSER_TIMEOUT', 60)
+        memory_limit_mb = getattr(settings, 'RESUME_PARSER_MEMORY_LIMIT_MB', 1024)
+        
+        file.seek(0)
+        data = file.read()
+        context = multiprocessing.get_context('fork')
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(
+            target=_sandbox_main,
+            args=(self, data, file.name, file_type, memory_limit_mb, int(timeout) + 1 if timeout else None, sender, extract_info),
+        )
+        message = None
+        with metrics.timer('stage', stage='sandbox'):
+            process.start()
+            sender.close()
+            try:
+                if not receiver.poll(timeout):
+                    logger.error(f"解析超过{timeout}秒，已终止子进程: {file.name}")
+                    raise ResumeParseError(f"解析超过{timeout}秒", ResumeParseError.TIMEOUT)
+                try:
+                    message = receiver.recv()
+                except EOFError:
+                    pass  # 子进程未返回结果即退出
+            finally:
+                receiver.close()
+                if process.is_alive():
+                    process.kill()
+                process.join()
+        
+        if message is None:
+            if process.exitcode == -signal.SIGXCPU:
+                raise ResumeParseError(f"解析超过{timeout}秒", ResumeParseError.TIMEOUT)
+            logger.error(f"解析子进程异常退出，退出码: {process.exitcode}: {file.name}")
+            raise ResumeParseError(f"解析进程异常退出（退出码{process.exitcode}）", ResumeParseError.CRASHED)
+        status, payload, child_metrics = message
+        metrics.merge(child_metrics)
+        if status == 'error':
+            code, error = payload
+            raise ResumeParseError(error, code)
+        return payload
+    
+    def parse_texts(self, texts, batch_size=32):
+        """批量解析已提取的文本，通过nlp.pipe批量执行命名实体识别"""
+        texts = [self._truncate_text(text) for text in texts]
+        if self.full_doc_nlp:
+            docs = self.nlp.pipe(texts, batch_size=batch_size)
+            return [self._extract_info(text, doc=doc) for text, doc in zip(texts, docs)]
+        
+        # 先用正则提取，只对没有找到姓名的文档批量执行命名实体识别
+        infos = [self._extract_info(text, run_ner=False) for text in texts]
+        missing = [i for i, info in enumerate(infos) if not info['name']]
+        if missing and self._has_ner:
+            with metrics.timer('stage', stage='ner_batch'):
+                docs = self.nlp.pipe(
+                    (self._ner_text(texts[i]) for i in missing),
+                    disable=self._ner_disable, batch_size=batch_size
+                )
+                for i, doc in zip(missing, docs):
+                    infos[i]['name'] = self._name_from_doc(doc)
+        for info in infos:
+            self._record_fields(info)
+        return infos
+    
+    def extract_text(self, file, file_type=None):
+        """读取简历文件并返回预处理后的文本，file_type为已识别的文件类型"""
+        file_ext = file_type or os.path.splitext(file.name)[1].lower()
+        logger.info(f"开始解析文件: {file.name}, 类型: {file_ext}")
+        if metrics.enabled:
+            try:
+                size = size_bucket(file.size)
+            except (AttributeError, OSError, TypeError):
+                size = 'unknown'
+            metrics.inc('files', file_type=file_ext or 'none', size=size)
+        
+        if file_ext == '.pdf':
+            with metrics.timer('stage', stage='decode', file_type=file_ext):
+                text = self._parse_pdf(file)
+        elif file_ext in ['.doc', '.docx']:
+            with metrics.timer('stage', stage='decode', file_type=file_ext):
+                text = self._parse_docx(file)
+        else:
+            raise ValueError(f"不支持的文件格式: {file_ext}")
+        with metrics.timer('stage', stage='preprocess'):
+            return self._preprocess_text(text)
+    
     def _parse_pdf(self, file):
-        """解析PDF文件"""
+        """逐页读取PDF文件文本
+
+        关键信息和各段落都已出现后再多读一页即停止，页数和字符数超出预算时也会停止。
+        """
+        max_pages = getattr(settings, 'RESUME_PARSER_PDF_MAX_PAGES', 50)
+        max_chars = getattr(settings, 'RESUME_PARSER_PDF_MAX_CHARS', 200000)
+        early_stop = getattr(settings, 'RESUME_PARSER_PDF_EARLY_STOP', True)
         try:
             reader = PdfReader(file)
-            text = ""
-            for page in reader.pages:
-                text += page.extract_text()
+            parts = []
+            chars = 0
+            found = set()
+            last_page = None
+            for index, page_text in self._iter_pdf_pages(reader):
+                if index >= max_pages:
+                    logger.info(f"PDF页数超过上限{max_pages}，停止读取")
+                    break
+                parts.append(page_text)
+                chars += len(page_text)
+                if chars >= max_chars:
+                    logger.info(f"PDF文本超过{max_chars}字符，停止读取")
+                    break
+                if early_stop:
+                    # 找齐后多读一页，保留跨页的段落内容
+                    if last_page is not None:
+                        logger.info(f"关键信息已找齐，在第{index + 1}页停止读取")
+                        break
+                    found.update(_pdf_page_signals(page_text))
+                    if found >= _PDF_REQUIRED_SIGNALS:
+                        last_page = index
+            
+            if not parts and len(reader.pages):
+                logger.warning("PDF文件没有可提取的文本层，可能是扫描件")
             logger.info("PDF文件解析成功")
-            return self._extract_info(self._preprocess_text(text))
+            return ''.join(parts)
         except Exception as e:
             logger.error(f"PDF解析失败: {str(e)}")
             raise
     
+    def _iter_pdf_pages(self, reader):
+        """逐页产出 (页码, 文本)，跳过没有文本层的扫描页"""
+        for index, page in enumerate(reader.pages):
+            if not _pdf_page_has_text_layer(page):
+                logger.info(f"PDF第{index + 1}页没有文本层，已跳过")
+                continue
+            yield index, page.extract_text() or ''
+    
     def _parse_docx(self, file):
-        """解析Word文件"""
+        """读取Word文件文本"""
         try:
             doc = Document(file)
             text = "\n".join([paragraph.text for paragraph in doc.paragraphs])
             logger.info("Word文件解析成功")
-            return self._extract_info(self._preprocess_text(text))
+            return text
         except Exception as e:
             logger.error(f"Word解析失败: {str(e)}")
             raise
     
+    def _truncate_text(self, text):
+        """截断超长文本，避免异常文件拖慢提取和命名实体识别"""
+        if len(text) > self.max_text_length:
+            logger.warning(f"文本长度{len(text)}超过上限{self.max_text_length}，已截断")
+            return text[:self.max_text_length]
+        return text
+    
+    def _ner_text(self, text, sections=None):
+        """命名实体识别只分析简历开头（第一个段落标题之前）的部分"""
+        if sections is None:
+            sections = segment_resume(text)
+        header_end = sections['header'][1] or len(text)
+        return text[:min(header_end, self.ner_max_chars)]
+    
+    def _run_ner(self, text):
+        """只启用ner组件执行命名实体识别"""
+        if not self._has_ner:
+            return None
+        with metrics.timer('stage', stage='ner'):
+            return self.nlp(text, disable=self._ner_disable)
+    
+    def _name_from_doc(self, doc, limit=None):
+        """从命名实体中取第一个人名"""
+        for ent in doc.ents:
+            if limit is not None and ent.start_char >= limit:
+                break
+            if ent.label_ == 'PERSON' and 2 <= len(ent.text) <= 4:
+                logger.info(f"通过NER提取到姓名: {ent.text}")
+                return ent.text
+        return ""
+    
     def _preprocess_text(self, text):
         """预处理文本"""
         # 统一换行符
-        text = text.replace('\r\n', '\n').replace('\r', '\n')
-        # 统一中文标点
-        text = text.replace('：', ':').replace('，', ',').replace('、', ',')
+        if '\r' in text:
+            text = _NEWLINE_RE.sub('\n', text)
+        # 统一中文标点（对中文文本str.replace远快于str.translate）
+        for source, target in _PUNCTUATION_REPLACEMENTS:
+            if source in text:
+                text = text.replace(source, target)
         # 移除多余空白
-        text = re.sub(r'\n\s*\n', '\n\n', text)
+        text = _BLANK_LINES_RE.sub('\n\n', text)
         # 移除特殊字符
-        text = re.sub(r'[^\S\n]+', ' ', text)
+        text = _INLINE_SPACES_RE.sub(' ', text)
         return text.strip()
     
-    def _extract_info(self, text):
-        """从文本中提取信息"""
+    def _extract_info(self, text, run_ner=True, doc=None):
+        """从文本中提取信息
+
+        run_ner为False时不执行命名实体识别（由调用方批量执行）；doc为已对全文执行过spaCy流水线的结果。
+        """
         try:
-            # 使用spaCy进行命名实体识别
-            doc = self.nlp(text)
+            text = self._truncate_text(text)
+            # 需要全文实体时对全文只执行一次完整流水线
+            if self.full_doc_nlp and doc is None:
+                with metrics.timer('stage', stage='full_doc_nlp'):
+                    doc = self.nlp(text)
+            
+            # 一次扫描划分出各个段落，各提取方法只处理自己的段落
+            with metrics.timer('stage', stage='segment'):
+                sections = segment_resume(text)
+            header = text[slice(*sections['header'])]
+            # 基本信息优先在简历开头查找，找不到再查找全文
+            scopes = (header, text) if len(header) < len(text) else (text,)
             
             # 提取基本信息
-            info = {
-                'name': self._extract_name(text),
-                'gender': self._extract_gender(text),
-                'age': self._extract_age(text),
-                'phone': self._extract_phone(text),
-                'email': self._extract_email(text),
-                'education': self._extract_education(text),
-                'work_experience': self._extract_work_experience(text),
-                'skills': self._extract_skills(text),
-            }
+            with metrics.timer('stage', stage='extract'):
+                info = {
+                    'name': self._timed('name', self._extract_name, text, sections, scopes, doc, run_ner),
+                    'gender': self._timed('gender', self._extract_gender, scopes),
+                    'age': self._timed('age', self._extract_age, scopes),
+                    'phone': self._timed('phone', self._extract_phone, scopes),
+                    'email': self._timed('email', self._extract_email, scopes),
+                    'education': self._timed('education', self._extract_education, text, _section_text(text, sections, 'education')),
+                    'work_experience': self._timed('work_experience', self._extract_work_experience, text, _section_text(text, sections, 'work')),
+                    'skills': self._timed('skills', self._extract_skills, text, _section_text(text, sections, 'skills')),
+                }
+            if doc is not None:
+                info['entities'] = [[ent.text, ent.label_] for ent in doc.ents]
+            # 姓名留给调用方批量识别时，由调用方在识别后统计
+            if run_ner or doc is not None:
+                self._record_fields(info)
             
             logger.info("信息提取成功")
             return info
@@ -96,34 +536,41 @@ class ResumeParser:
             logger.error(f"信息提取失败: {str(e)}")
             raise
     
-    def _extract_name(self, text):
+    def _timed(self, field, extractor, *args):
+        """执行单个字段的提取方法并记录耗时"""
+        with metrics.timer('extractor', field=field):
+            return extractor(*args)
+    
+    def _record_fields(self, info):
+        """统计各字段是否提取成功"""
+        if not metrics.enabled:
+            return
+        for field in _METRIC_FIELDS:
+            metrics.inc('field', field=field, result='hit' if info.get(field) else 'miss')
+    
+    def _extract_name(self, text, sections, scopes, doc=None, run_ner=True):
         """提取姓名"""
         try:
-            # 扩展姓名匹配模式
-            name_patterns = [
-                r'姓名[：:]\s*([^\n]+)',
-                r'姓\s*名[：:]\s*([^\n]+)',
-                r'([^\n]{2,4})\s*的简历',
-                r'个人简历[：:]\s*([^\n]+)',
-                r'([^\n]{2,4})\s*的个人简历',
-            ]
-            
-            for pattern in name_patterns:
-                match = re.search(pattern, text)
-                if match:
-                    name = match.group(1).strip()
-                    # 清理可能的额外信息
-                    name = re.sub(r'[（(].*?[)）]', '', name).strip()
-                    if 2 <= len(name) <= 4:  # 中文姓名通常2-4个字
-                        logger.info(f"提取到姓名: {name}")
-                        return name
+            for scope in scopes:
+                for pattern in _NAME_PATTERNS:
+                    match = pattern.search(scope)
+                    if match:
+                        name = match.group(1).strip()
+                        # 清理可能的额外信息
+                        name = _PARENTHESES_RE.sub('', name).strip()
+                        if 2 <= len(name) <= 4:  # 中文姓名通常2-4个字
+                            logger.info(f"提取到姓名: {name}")
+                            return name
             
-            # 使用spaCy的命名实体识别作为备选
-            doc = self.nlp(text[:1000])  # 只分析前1000个字符
-            for ent in doc.ents:
-                if ent.label_ == 'PERSON' and 2 <= len(ent.text) <= 4:
-                    logger.info(f"通过NER提取到姓名: {ent.text}")
-                    return ent.text
+            # 使用spaCy的命名实体识别作为备选，只分析简历开头部分
+            if not run_ner and doc is None:
+                return ""  # 由调用方批量执行命名实体识别
+            ner_text = self._ner_text(text, sections)
+            if doc is None:
+                doc = self._run_ner(ner_text)
+            name = self._name_from_doc(doc, limit=len(ner_text)) if doc is not None else ""
+            if name:
+                return name
             
             logger.warning("未找到姓名信息")
             return ""
@@ -131,21 +578,16 @@ class ResumeParser:
             logger.error(f"姓名提取失败: {str(e)}")
             return ""
     
-    def _extract_gender(self, text):
+    def _extract_gender(self, scopes):
         """提取性别"""
         try:
-            gender_patterns = [
-                r'性别[：:]\s*([男女])',
-                r'([男女])\s*性',
-                r'([男女])\s*生',
-            ]
-            
-            for pattern in gender_patterns:
-                match = re.search(pattern, text)
-                if match:
-                    gender = match.group(1)
-                    logger.info(f"提取到性别: {gender}")
-                    return gender
+            for scope in scopes:
+                for pattern in _GENDER_PATTERNS:
+                    match = pattern.search(scope)
+                    if match:
+                        gender = match.group(1)
+                        logger.info(f"提取到性别: {gender}")
+                        return gender
             
             logger.warning("未找到性别信息")
             return ""
@@ -153,27 +595,21 @@ class ResumeParser:
             logger.error(f"性别提取失败: {str(e)}")
             return ""
     
-    def _extract_age(self, text):
+    def _extract_age(self, scopes):
         """提取年龄"""
         try:
-            age_patterns = [
-                r'年龄[：:]\s*(\d{1,2})',
-                r'(\d{1,2})\s*岁',
-                r'(\d{4})年出生',
-            ]
-            
-            for pattern in age_patterns:
-                match = re.search(pattern, text)
-                if match:
-                    if '年出生' in pattern:
-                        birth_year = int(match.group(1))
-                        age = datetime.now().year - birth_year
-                    else:
-                        age = int(match.group(1))
-                    
-                    if 18 <= age <= 65:  # 合理的年龄范围
-                        logger.info(f"提取到年龄: {age}")
-                        return str(age)
+            for scope in scopes:
+                for pattern, is_birth_year in _AGE_PATTERNS:
+                    match = pattern.search(scope)
+                    if match:
+                        if is_birth_year:
+                            age = datetime.now().year - int(match.group(1))
+                        else:
+                            age = int(match.group(1))
+                        
+                        if 18 <= age <= 65:  # 合理的年龄范围
+                            logger.info(f"提取到年龄: {age}")
+                            return str(age)
             
             logger.warning("未找到年龄信息")
             return ""
@@ -181,23 +617,13 @@ class ResumeParser:
             logger.error(f"年龄提取失败: {str(e)}")
             return ""
     
-    def _extract_phone(self, text):
+    def _extract_phone(self, scopes):
         """提取电话号码"""
         try:
-            # 扩展电话号码匹配模式
-            phone_patterns = [
-                r'1[3-9]\d{9}',  # 标准手机号
-                r'电话[：:]\s*1[3-9]\d{9}',
-                r'手机[：:]\s*1[3-9]\d{9}',
-                r'联系方式[：:]\s*1[3-9]\d{9}',
-                r'联系电话[：:]\s*1[3-9]\d{9}',
-                r'手机号码[：:]\s*1[3-9]\d{9}',
-            ]
-            
-            for pattern in phone_patterns:
-                match = re.search(pattern, text)
+            for scope in scopes:
+                match = _PHONE_RE.search(scope)
                 if match:
-                    phone = re.search(r'1[3-9]\d{9}', match.group(0)).group(0)
+                    phone = match.group(0)
                     logger.info(f"提取到电话: {phone}")
                     return phone
             
@@ -207,22 +633,13 @@ class ResumeParser:
             logger.error(f"电话提取失败: {str(e)}")
             return ""
     
-    def _extract_email(self, text):
+    def _extract_email(self, scopes):
         """提取邮箱"""
         try:
-            # 扩展邮箱匹配模式
-            email_patterns = [
-                r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',  # 标准邮箱
-                r'邮箱[：:]\s*[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
-                r'Email[：:]\s*[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
-                r'电子邮箱[：:]\s*[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
-                r'邮箱地址[：:]\s*[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}',
-            ]
-            
-            for pattern in email_patterns:
-                match = re.search(pattern, text)
+            for scope in scopes:
+                match = _EMAIL_RE.search(scope)
                 if match:
-                    email = re.search(r'[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}', match.group(0)).group(0)
+                    email = match.group(0)
                     logger.info(f"提取到邮箱: {email}")
                     return email
             
@@ -232,37 +649,24 @@ class ResumeParser:
             logger.error(f"邮箱提取失败: {str(e)}")
             return ""
     
-    def _extract_education(self, text):
-        """提取教育经历"""
+    def _extract_education(self, text, section=None):
+        """提取教育经历，section为教育经历段落"""
         try:
             education = []
-            # 扩展教育经历匹配模式
-            edu_patterns = [
-                r'(?:教育背景|教育经历|学习经历|学历)[：:]\s*(.*?)(?=\n\n|\Z)',
-                r'(?:教育背景|教育经历|学习经历|学历)\s*(.*?)(?=\n\n|\Z)',
-            ]
-            
-            for pattern in edu_patterns:
-                match = re.search(pattern, text, re.DOTALL)
-                if match:
-                    edu_text = match.group(1)
-                    # 改进分割逻辑
-                    edu_items = re.split(r'\n(?=\d{4}|\d{2}年)', edu_text)
-                    for item in edu_items:
-                        if item.strip():
-                            # 清理和标准化教育经历
-                            item = re.sub(r'\s+', ' ', item.strip())
-                            if len(item) > 5:  # 过滤掉太短的条目
-                                education.append(item)
-                    if education:
-                        logger.info(f"提取到{len(education)}条教育经历")
-                        return education
+            if section:
+                # 按以年份开头的行分割条目
+                for item in _ITEM_SPLIT_RE.split(section):
+                    # 清理和标准化教育经历
+                    item = _SPACES_RE.sub(' ', item.strip())
+                    if len(item) > 5:  # 过滤掉太短的条目
+                        education.append(item)
+                if education:
+                    logger.info(f"提取到{len(education)}条教育经历")
+                    return education
             
             # 如果没有找到明确的教育经历标记，尝试查找包含学校名称的段落
-            school_pattern = r'(?:大学|学院|学校)[^，。\n]{0,30}'
-            school_matches = re.finditer(school_pattern, text)
-            for match in school_matches:
-                context = text[max(0, match.start()-50):min(len(text), match.end()+50)]
+            for match in _SCHOOL_RE.finditer(text):
+                context = text[max(0, match.start()-50):match.end()+50]
                 if len(context) > 10:
                     education.append(context.strip())
             
@@ -276,37 +680,24 @@ class ResumeParser:
             logger.error(f"教育经历提取失败: {str(e)}")
             return []
     
-    def _extract_work_experience(self, text):
-        """提取工作经历"""
+    def _extract_work_experience(self, text, section=None):
+        """提取工作经历，section为工作经历段落"""
         try:
             experience = []
-            # 扩展工作经历匹配模式
-            exp_patterns = [
-                r'(?:工作经历|工作经验|工作背景|工作履历)[：:]\s*(.*?)(?=\n\n|\Z)',
-                r'(?:工作经历|工作经验|工作背景|工作履历)\s*(.*?)(?=\n\n|\Z)',
-            ]
-            
-            for pattern in exp_patterns:
-                match = re.search(pattern, text, re.DOTALL)
-                if match:
-                    exp_text = match.group(1)
-                    # 改进分割逻辑
-                    exp_items = re.split(r'\n(?=\d{4}|\d{2}年)', exp_text)
-                    for item in exp_items:
-                        if item.strip():
-                            # 清理和标准化工作经历
-                            item = re.sub(r'\s+', ' ', item.strip())
-                            if len(item) > 10:  # 过滤掉太短的条目
-                                experience.append(item)
-                    if experience:
-                        logger.info(f"提取到{len(experience)}条工作经历")
-                        return experience
+            if section:
+                # 按以年份开头的行分割条目
+                for item in _ITEM_SPLIT_RE.split(section):
+                    # 清理和标准化工作经历
+                    item = _SPACES_RE.sub(' ', item.strip())
+                    if len(item) > 10:  # 过滤掉太短的条目
+                        experience.append(item)
+                if experience:
+                    logger.info(f"提取到{len(experience)}条工作经历")
+                    return experience
             
             # 如果没有找到明确的工作经历标记，尝试查找包含公司名称的段落
-            company_pattern = r'(?:公司|企业|集团)[^，。\n]{0,30}'
-            company_matches = re.finditer(company_pattern, text)
-            for match in company_matches:
-                context = text[max(0, match.start()-100):min(len(text), match.end()+100)]
+            for match in _COMPANY_RE.finditer(text):
+                context = text[max(0, match.start()-100):match.end()+100]
                 if len(context) > 20:
                     experience.append(context.strip())
             
@@ -320,40 +711,22 @@ class ResumeParser:
             logger.error(f"工作经历提取失败: {str(e)}")
             return []
     
-    def _extract_skills(self, text):
-        """提取技能"""
+    def _extract_skills(self, text, section=None):
+        """提取技能，section为技能段落"""
         try:
             skills = []
-            # 扩展技能匹配模式
-            skill_patterns = [
-                r'(?:技能特长|专业技能|技术技能|个人技能|核心技能)[：:]\s*(.*?)(?=\n\n|\Z)',
-                r'(?:技能特长|专业技能|技术技能|个人技能|核心技能)\s*(.*?)(?=\n\n|\Z)',
-            ]
-            
-            for pattern in skill_patterns:
-                match = re.search(pattern, text, re.DOTALL)
-                if match:
-                    skill_text = match.group(1)
-                    # 改进分割逻辑
-                    skill_items = re.split(r'[,，、；;]', skill_text)
-                    for item in skill_items:
-                        if item.strip():
-                            # 清理和标准化技能
-                            item = re.sub(r'\s+', ' ', item.strip())
-                            if len(item) > 2:  # 过滤掉太短的条目
-                                skills.append(item)
-                    if skills:
-                        logger.info(f"提取到{len(skills)}个技能")
-                        return skills
+            if section:
+                for item in _SKILL_SPLIT_RE.split(section):
+                    # 清理和标准化技能
+                    item = _SPACES_RE.sub(' ', item.strip())
+                    if len(item) > 2:  # 过滤掉太短的条目
+                        skills.append(item)
+                if skills:
+                    logger.info(f"提取到{len(skills)}个技能")
+                    return skills
             
             # 如果没有找到明确的技能标记，尝试查找包含常见技能关键词的段落
-            skill_keywords = ['精通', '熟悉', '掌握', '了解', '熟练', '擅长', '熟练使用', '熟练操作']
-            for keyword in skill_keywords:
-                keyword_matches = re.finditer(keyword + r'[^，。\n]{0,30}', text)
-                for match in keyword_matches:
-                    skill = match.group(0).strip()
-                    if len(skill) > 3:
-                        skills.append(skill)
+            skills = skills_by_keyword(text)
             
             if skills:
                 logger.info(f"通过关键词提取到{len(skills)}个技能")
@@ -363,4 +736,112 @@ class ResumeParser:
             return []
         except Exception as e:
             logger.error(f"技能提取失败: {str(e)}")
-            return [] 
\ No newline at end of file
+            return []
+
+# 每个进程首次写入缓存时清理一次旧版本解析器产生的缓存
+_stale_cache_purged = False
+
+def get_cached_result(content_hash):
+    """按内容哈希查询当前解析器版本的缓存结果"""
+    from .models import ParseResultCache
+    entry = ParseResultCache.objects.filter(
+        content_hash=content_hash, parser_version=PARSER_VERSION
+    ).only('result').first()
+    return entry.result if entry else None
+
+def has_document_text(content_hash):
+    """是否已保存该文件的全文"""
+    from .models import ResumeDocumentText
+    return ResumeDocumentText.objects.filter(content_hash=content_hash).exists()
+
+def normalize_document_text(text):
+    """统一全角字母数字和空白，保存的全文和搜索词都经过同样处理"""
+    text = unicodedata.normalize('NFKC', text)
+    return _INLINE_SPACES_RE.sub(' ', text).strip()
+
+def store_document_text(content_hash, text):
+    """保存文件全文，已保存过时不重复写入"""
+    from .models import ResumeDocumentText
+    text = normalize_document_text(text)
+    try:
+        with transaction.atomic():
+            ResumeDocumentText.objects.get_or_create(
+                content_hash=content_hash, defaults={'text': text, 'char_count': len(text)}
+            )
+    except IntegrityError:
+        # 其他进程已经写入了相同文件的全文
+        pass
+
+def store_cached_result(content_hash, result):
+    """保存解析结果到缓存"""
+    global _stale_cache_purged
+    from .models import ParseResultCache
+    if not _stale_cache_purged:
+        ParseResultCache.objects.exclude(parser_version=PARSER_VERSION).delete()
+        _stale_cache_purged = True
+    try:
+        with transaction.atomic():
+            ParseResultCache.objects.create(content_hash=content_hash, parser_version=PARSER_VERSION, result=result)
+    except IntegrityError:
+        # 其他进程已经写入了相同内容的解析结果
+        pass
+
+GENDER_MAP = {'男': 'male', '女': 'female'}
+
+# 按学历从高到低匹配
+EDUCATION_LEVEL_KEYWORDS = [
+    ('phd', ('博士',)),
+    ('master', ('硕士', '研究生', 'MBA')),
+    ('bachelor', ('本科', '学士')),
+    ('college', ('大专', '专科')),
+    ('high_school', ('高中', '中专')),
+]
+
+def parsed_to_resume_fields(parsed_data):
+    """将解析结果转换为Resume模型字段取值"""
+    education_text = '\n'.join(parsed_data.get('education', []))
+    education = ''
+    for level, keywords in EDUCATION_LEVEL_KEYWORDS:
+        if any(keyword in education_text for keyword in keywords):
+            education = level
+            break
+
+    return {
+        'name': parsed_data.get('name', ''),
+        'gender': GENDER_MAP.get(parsed_data.get('gender', ''), ''),
+        'phone': parsed_data.get('phone', ''),
+        'email': parsed_data.get('email', ''),
+        'education': education,
+        'work_experience': '\n'.join(parsed_data.get('work_experience', [])),
+        'skills': '\n'.join(parsed_data.get('skills', [])),
+    }
+
+def record_parse_snapshot(resume):
+    """记录简历文件在当前解析器版本下的解析结果，重新提取时据此判断哪些字段经过人工修改
+
+    没有缓存的解析结果时清空记录，重新提取时只会填写空白字段。
+    """
+    cached = get_cached_result(resume.file_hash) if resume.file_hash else None
+    if cached is None:
+        resume.parsed_fields = {}
+        resume.parser_version = ''
+    else:
+        resume.parsed_fields = parsed_to_resume_fields(cached)
+        resume.parser_version = PARSER_VERSION
+
+# 进程内共享的解析器实例，spaCy模型加载耗时数秒且占用数百MB内存，每个工作进程只加载一次
+_shared_parser = None
+_shared_parser_lock = threading.Lock()
+
+def get_resume_parser():
+    """获取进程内共享的简历解析器，首次调用时加载（线程安全）"""
+    global _shared_parser
+    if _shared_parser is None:
+        with _shared_parser_lock:
+            if _shared_parser is None:
+                _shared_parser = ResumeParser()
+    return _shared_parser
+
+def is_parser_warm():
+    """共享解析器是否已经加载完成"""
+    return _shared_parser is not None
@@ -5,7 +5,7 @@ from django.http import HttpResponseForbidden, JsonResponse, FileResponse, HttpR
 from django.db.models import Q, Count, Sum
 from .models import (
     Company, Project, Resume, ResumeProject, 
-    Tag, PaymentRecord, ProjectStatus, ResumeStatus, ResumeBookmark
+    Tag, PaymentRecord, ProjectStatus, ResumeStatus, ResumeBookmark, ParseJob
 )
 from .forms import (
     CompanyForm, ProjectForm, ResumeForm, ResumeSubmissionForm, 
@@ -14,12 +14,24 @@ from .forms import (
 )
 from accounts.decorators import admin_required, system_admin_required
 from django.urls import reverse
-from .utils import ResumeParser
+from django.conf import settings
+from .utils import get_resume_parser, parsed_to_resume_fields, is_parser_warm, record_parse_snapshot
+from .storage import hash_file, promote_staged_file
+from .staging import (
+    stage_upload, get_staged, discard, start_upload, get_upload, append_chunk, read_head, finish_upload, UploadError
+)
+from .serving import serve_resume_file
+from .previews import generate_preview, preview_name
+from .documents import search_terms, filter_by_document_text, annotate_snippets, highlight
+from . import search
+from .facets import parse_selection, apply_filters, facet_counts
+from .tagindex import TagQueryError, compile_tag_query, to_q, tag_index, page_ids, is_enabled as tag_index_enabled
+from .typeahead import lookup as typeahead_lookup, visible_companies, visible_tags, SOURCES as TYPEAHEAD_SOURCES
+from .uploadhandlers import upload_error, upload_file_type, sniff_file_type, detect_file_type, max_upload_size, SNIFF_BYTES
+from .metrics import registry as parser_metrics_registry
 import os
-import tempfile
+from django.core.files import File
 from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
-import time
 import mimetypes
 
 # Create your views here.
@@ -135,10 +147,7 @@ def project_create(request):
     else:
         form = ProjectForm()
         # 限制公司选择
-        if not request.user.is_system_admin:
-            form.fields['company'].queryset = Company.objects.filter(
-                Q(created_by=request.user) | Q(created_by__user_type='system_admin')
-            )
+        form.fields['company'].queryset = visible_companies(request.user)
     
     return render(request, 'headhunting/project_form.html', {'form': form, 'title': '创建项目'})
 
@@ -175,10 +184,7 @@ def project_update(request, pk):
     else:
         form = ProjectForm(instance=project)
         # 限制公司选择
-        if not request.user.is_system_admin:
-            form.fields['company'].queryset = Company.objects.filter(
-                Q(created_by=request.user) | Q(created_by__user_type='system_admin')
-            )
+        form.fields['company'].queryset = visible_companies(request.user)
     
     return render(request, 'headhunting/project_form.html', {'form': form, 'title': f'编辑项目: {project.title}'})
 
@@ -203,13 +209,42 @@ def project_delete(request, pk):
 def resume_list(request):
     """简历列表视图"""
     resumes = Resume.objects.all()
-    if not request.user.is_system_admin and not request.user.is_admin:
+    include_creator = request.user.is_system_admin or request.user.is_admin
+    if not include_creator:
         # 普通用户只能看到自己创建的简历
         resumes = resumes.filter(created_by=request.user)
+    selection = parse_selection(request.GET, include_creator)
+    
+    # 标签表达式筛选，如“Java AND 上海 NOT 外包”
+    tag_query = request.GET.get('tags', '').strip()
+    tag_expression = None
+    if tag_query:
+        try:
+            tag_expression = compile_tag_query(tag_query)
+        except TagQueryError as e:
+            messages.error(request, str(e))
+    if tag_expression and not request.GET.get('q') and not any(selection.values()) and tag_index_enabled():
+        # 只按标签筛选时用标签索引计算结果，只读取当前页的简历
+        owner_id = None if include_creator else request.user.id
+        return _resume_tag_index_list(request, tag_query, tag_expression, owner_id)
     
     # 搜索功能
     query = request.GET.get('q')
-    if query:
+    search_documents = request.GET.get('scope') == 'documents'
+    terms = search_terms(query) if search_documents else []
+    search_truncated = False
+    exact = search.exact_lookup(query) if query and not search_documents else None
+    if exact and resumes.filter(**{exact[0]: exact[1]}).exists():
+        # 电话号码或邮箱按规范化的列等值查询，没有结果时按一般搜索处理（如号码只输入了一部分）
+        resumes = resumes.filter(**{exact[0]: exact[1]})
+    elif terms:
+        # 在简历原文中搜索，只查询已保存的全文
+        resumes = filter_by_document_text(resumes, terms)
+    elif query and not search_documents and search.is_enabled():
+        # 全文索引搜索，结果按相关度排序
+        owner_id = None if request.user.is_system_admin or request.user.is_admin else request.user.id
+        resumes, search_truncated = search.filter_resumes(resumes, query, owner_id)
+    elif query and not search_documents:
         resumes = resumes.filter(
             Q(name__icontains=query) | 
             Q(phone__icontains=query) | 
@@ -218,37 +253,89 @@ def resume_list(request):
             Q(current_position__icontains=query)
         )
     
+    if tag_expression:
+        resumes = resumes.filter(to_q(*tag_expression))
+    
+    # 分面筛选，各选项的数量在搜索结果上统计
+    facets = facet_counts(resumes, selection, include_creator)
+    resumes = apply_filters(resumes, selection).prefetch_related('tags')
+    
+    if terms:
+        resumes = list(annotate_snippets(resumes, terms))
+        for resume in resumes:
+            resume.snippet = highlight(resume.document_snippet, terms)
+    
     # 获取活跃的项目供投递使用
     projects = Project.objects.filter(status__code='active')
     
     return render(request, 'headhunting/resume_list.html', {
         'resumes': resumes,
-        'projects': projects
+        'projects': projects,
+        'search_documents': search_documents,
+        'facets': facets,
+        'has_facet_filter': any(selection.values()),
+        'tag_query': tag_query,
+        'search_truncated': search_truncated,
+        'search_rank_limit': getattr(settings, 'RESUME_SEARCH_MAX_RESULTS', 500),
+    })
+
+def _resume_tag_index_list(request, tag_query, tag_expression, owner_id):
+    """按标签表达式筛选的简历列表，按新建时间倒序分页"""
+    bits = tag_index.query(*tag_expression, owner_id=owner_id)
+    total = bits.bit_count()
+    page_size = getattr(settings, 'RESUME_TAG_QUERY_PAGE_SIZE', 50)
+    num_pages = max(1, -(-total // page_size))
+    try:
+        number = min(max(int(request.GET.get('page', 1)), 1), num_pages)
+    except ValueError:
+        number = 1
+    ids = page_ids(bits, number, page_size)
+    rows = Resume.objects.filter(pk__in=ids).prefetch_related('tags').in_bulk()
+    
+    return render(request, 'headhunting/resume_list.html', {
+        'resumes': [rows[pk] for pk in ids if pk in rows],
+        'projects': Project.objects.filter(status__code='active'),
+        'search_documents': False,
+        'facets': [],
+        'has_facet_filter': False,
+        'tag_query': tag_query,
+        'tag_page': {
+            'number': number,
+            'num_pages': num_pages,
+            'total': total,
+            'previous': number - 1 if number > 1 else None,
+            'next': number + 1 if number < num_pages else None,
+        },
     })
 
 @login_required
 def resume_create(request):
     """创建简历视图"""
-    if request.method == 'POST':
+    if request.method == 'POST' and 'parse_file' in request.POST:
+        form = ResumeForm()
+        error = upload_error(request)
+        if error:
+            # 上传时文件类型或大小检查未通过，文件已被丢弃
+            if request.headers.get('x-requested-with') == 'XMLHttpRequest':
+                return JsonResponse({'status': ParseJob.STATUS_FAILED, 'error': error})
+            messages.error(request, f'文件上传失败：{error}')
+        elif request.FILES.get('resume_file'):
+            return _handle_resume_parse(request)
+    elif request.method == 'POST':
         form = ResumeForm(request.POST, request.FILES)
+        if upload_error(request):
+            form.add_error('resume_file', upload_error(request))
         if form.is_valid():
             resume = form.save(commit=False)
             resume.created_by = request.user
             
             # 检查是否有暂存的文件
-            temp_file_path = request.session.get('temp_resume_file')
-            if temp_file_path and os.path.exists(temp_file_path):
-                with open(temp_file_path, 'rb') as f:
-                    resume.resume_file.save(
-                        request.session.get('temp_resume_filename', 'resume.pdf'),
-                        ContentFile(f.read()),
-                        save=False
-                    )
-                # 删除临时文件
-                os.remove(temp_file_path)
-                # 清除session中的临时文件信息
-                del request.session['temp_resume_file']
-                del request.session['temp_resume_filename']
+            staged = get_staged(request.session.pop('staged_resume_token', None), request.user)
+            if staged:
+                # 暂存文件直接移入简历文件目录，不经过内存复制
+                promote_staged_file(resume.resume_file, staged.path, staged.filename)
+                discard(staged.token)
+            record_parse_snapshot(resume)
             
             resume.save()
             form.save_m2m()  # 保存多对多关系
@@ -257,54 +344,194 @@ def resume_create(request):
     else:
         form = ResumeForm()
     
-    # 处理文件解析
-    if request.method == 'POST' and 'parse_file' in request.POST and request.FILES.get('resume_file'):
-        try:
-            parser = ResumeParser()
-            file = request.FILES['resume_file']
-            
-            # 保存文件到临时目录
-            temp_dir = tempfile.gettempdir()
-            temp_file_path = os.path.join(temp_dir, f'resume_{request.user.id}_{int(time.time())}')
-            with open(temp_file_path, 'wb+') as destination:
-                for chunk in file.chunks():
-                    destination.write(chunk)
-            
-            # 将临时文件路径保存到session
-            request.session['temp_resume_file'] = temp_file_path
-            request.session['temp_resume_filename'] = file.name
-            
-            # 解析文件
-            parsed_data = parser.parse_file(file)
-            
-            # 创建新的表单实例，预填充解析的数据
-            form = ResumeForm(initial={
-                'name': parsed_data.get('name', ''),
-                'gender': parsed_data.get('gender', ''),
-                'age': parsed_data.get('age', ''),
-                'phone': parsed_data.get('phone', ''),
-                'email': parsed_data.get('email', ''),
-                'education': '\n'.join(parsed_data.get('education', [])),
-                'work_experience': '\n'.join(parsed_data.get('work_experience', [])),
-                'skills': '\n'.join(parsed_data.get('skills', [])),
-            })
-            
-            messages.success(request, '文件解析成功！请检查并完善信息。')
-        except Exception as e:
-            messages.error(request, f'文件解析失败：{str(e)}')
-            # 如果解析失败，删除临时文件
-            if 'temp_resume_file' in request.session:
-                temp_file_path = request.session['temp_resume_file']
-                if os.path.exists(temp_file_path):
-                    os.remove(temp_file_path)
-                del request.session['temp_resume_file']
-                del request.session['temp_resume_filename']
-    
     return render(request, 'headhunting/resume_form.html', {
         'form': form,
         'title': '创建简历'
     })
 
+def _handle_resume_parse(request):
+    """暂存上传的简历文件并解析"""
+    is_ajax = request.headers.get('x-requested-with') == 'XMLHttpRequest'
+    # 保存文件到共享暂存区，后续请求由任意节点处理都能取到文件
+    staged = stage_upload(request.FILES['resume_file'], request.user)
+    return _start_resume_parse(request, staged, upload_file_type(request), is_ajax)
+
+def _start_resume_parse(request, staged, file_type, is_ajax):
+    """解析暂存的简历文件，异步模式下只创建解析任务并立即返回"""
+    # session中只保存令牌，保存简历时取出暂存文件；同一表单重新上传时删除之前暂存的文件
+    discard(request.session.get('staged_resume_token'))
+    request.session['staged_resume_token'] = staged.token
+    
+    if getattr(settings, 'RESUME_PARSE_ASYNC', True):
+        # 记录文件哈希，保存简历时不再为同一文件重复创建提取全文的任务
+        with open(staged.path, 'rb') as f:
+            file_hash = hash_file(f)
+        job = ParseJob.objects.create(
+            file_path=staged.path,
+            file_name=staged.filename,
+            file_type=file_type or '',
+            file_hash=file_hash,
+            max_attempts=getattr(settings, 'RESUME_PARSE_JOB_MAX_ATTEMPTS', 3),
+            created_by=request.user,
+        )
+        status_url = reverse('parse_job_status', args=[job.id])
+        if is_ajax:
+            return JsonResponse({'status': job.status, 'job_id': job.id, 'status_url': status_url})
+        messages.info(request, f'文件已提交解析（任务编号 {job.id}），解析完成后将自动填充表单。')
+        return render(request, 'headhunting/resume_form.html', {
+            'form': ResumeForm(),
+            'title': '创建简历',
+            'parse_job_status_url': status_url,
+        })
+    
+    try:
+        # 解析文件
+        with open(staged.path, 'rb') as f:
+            parsed_data = get_resume_parser().parse_file(File(f, name=staged.filename), file_type=file_type)
+    except Exception as e:
+        # 如果解析失败，删除暂存文件
+        discard(staged.token)
+        del request.session['staged_resume_token']
+        if is_ajax:
+            return JsonResponse({'status': ParseJob.STATUS_FAILED, 'error': str(e)})
+        messages.error(request, f'文件解析失败：{str(e)}')
+        return render(request, 'headhunting/resume_form.html', {'form': ResumeForm(), 'title': '创建简历'})
+    
+    initial = parsed_to_resume_fields(parsed_data)
+    if is_ajax:
+        return JsonResponse({'status': ParseJob.STATUS_SUCCEEDED, 'initial': initial})
+    # 创建新的表单实例，预填充解析的数据
+    messages.success(request, '文件解析成功！请检查并完善信息。')
+    return render(request, 'headhunting/resume_form.html', {
+        'form': ResumeForm(initial=initial),
+        'title': '创建简历'
+    })
+
+def _upload_error_response(error):
+    data = {'error': str(error)}
+    if error.offset is not None:
+        data['offset'] = error.offset
+    return JsonResponse(data, status=error.status)
+
+@login_required
+def resume_upload_start(request):
+    """开始分块上传简历文件，之后按返回的地址逐块PUT文件内容"""
+    if request.method != 'POST':
+        return JsonResponse({'error': '请使用POST请求'}, status=405)
+    filename = os.path.basename(request.POST.get('filename', '').replace('\\', '/'))
+    if os.path.splitext(filename)[1].lower() not in ('.pdf', '.doc', '.docx'):
+        return JsonResponse({'error': '不支持的文件类型，请上传PDF或Word文件'}, status=415)
+    try:
+        size = int(request.POST.get('size', ''))
+    except ValueError:
+        return JsonResponse({'error': '缺少文件大小'}, status=400)
+    max_size = max_upload_size()
+    if size <= 0 or size > max_size:
+        return JsonResponse({'error': f'文件大小超过上限{max_size // (1024 * 1024)}MB'}, status=413)
+    
+    upload = start_upload(request.user, filename, size)
+    return JsonResponse({
+        'token': upload.token,
+        'offset': 0,
+        'chunk_size': getattr(settings, 'RESUME_UPLOAD_CHUNK_SIZE', 4 * 1024 * 1024),
+        'upload_url': reverse('resume_upload_chunk', args=[upload.token]),
+        'finalize_url': reverse('resume_upload_finalize', args=[upload.token]),
+    }, status=201)
+
+@login_required
+def resume_upload_chunk(request, token):
+    """分块上传：GET查询已上传长度，PUT从offset处追加一个分块，DELETE取消上传"""
+    upload = get_upload(token, request.user)
+    if upload is None:
+        return JsonResponse({'error': '上传不存在或已过期'}, status=404)
+    if request.method == 'GET':
+        return JsonResponse({'offset': upload.offset, 'size': upload.size})
+    if request.method == 'DELETE':
+        discard(upload.token)
+        return JsonResponse({'status': 'deleted'})
+    if request.method != 'PUT':
+        return JsonResponse({'error': '不支持的请求方法'}, status=405)
+    
+    chunk_size = getattr(settings, 'RESUME_UPLOAD_CHUNK_SIZE', 4 * 1024 * 1024)
+    try:
+        offset = int(request.GET.get('offset', ''))
+        content_length = int(request.META.get('CONTENT_LENGTH') or 0)
+    except ValueError:
+        return JsonResponse({'error': '缺少分块偏移'}, status=400)
+    if content_length > chunk_size:
+        # 未读取请求体前拒绝，每个请求的处理时间以分块大小为上限
+        return JsonResponse({'error': f'分块大小超过上限{chunk_size}字节', 'offset': upload.offset}, status=413)
+    try:
+        new_offset = append_chunk(upload, offset, request, chunk_size)
+    except UploadError as e:
+        return _upload_error_response(e)
+    
+    # 收齐文件头后立即识别类型，不支持的文件不再继续上传
+    if offset < SNIFF_BYTES <= new_offset:
+        file_type = sniff_file_type(read_head(upload, SNIFF_BYTES))
+        if file_type is None:
+            discard(upload.token)
+            return JsonResponse({'error': '不支持的文件类型，请上传PDF或Word文件'}, status=415)
+        if upload.size > max_upload_size(file_type):
+            discard(upload.token)
+            return JsonResponse({'error': f'文件大小超过上限{max_upload_size(file_type) // (1024 * 1024)}MB'}, status=413)
+    return JsonResponse({'offset': new_offset, 'size': upload.size})
+
+@login_required
+def resume_upload_finalize(request, token):
+    """校验分块上传的完整文件，通过后与表单上传的文件一样暂存并解析"""
+    if request.method != 'POST':
+        return JsonResponse({'error': '请使用POST请求'}, status=405)
+    upload = get_upload(token, request.user)
+    if upload is None:
+        return JsonResponse({'error': '上传不存在或已过期'}, status=404)
+    try:
+        staged = finish_upload(upload, request.POST.get('sha256'))
+    except UploadError as e:
+        return _upload_error_response(e)
+    
+    with open(staged.path, 'rb') as f:
+        file_type = detect_file_type(f)
+    if file_type is None or staged.size > max_upload_size(file_type):
+        discard(staged.token)
+        return JsonResponse({'status': ParseJob.STATUS_FAILED, 'error': '不支持的文件类型或文件过大'}, status=415)
+    return _start_resume_parse(request, staged, file_type, is_ajax=True)
+
+@login_required
+def parse_job_status(request, pk):
+    """查询简历解析任务状态，供表单轮询"""
+    job = get_object_or_404(ParseJob, pk=pk)
+    
+    # 检查权限
+    if not request.user.is_system_admin and not request.user.is_admin and job.created_by != request.user:
+        return HttpResponseForbidden('您没有权限查看此解析任务')
+    
+    data = {
+        'job_id': job.id,
+        'status': job.status,
+        'attempts': job.attempts,
+        'finished': job.is_finished,
+    }
+    if job.status == ParseJob.STATUS_SUCCEEDED:
+        data['initial'] = parsed_to_resume_fields(job.result or {})
+    elif job.error:
+        data['error'] = job.error
+        data['error_code'] = job.error_code
+    return JsonResponse(data)
+
+@system_admin_required
+def parser_metrics(request):
+    """简历解析指标，默认输出Prometheus文本格式，?format=json 输出JSON"""
+    gauges = {'warm': int(is_parser_warm())}
+    if request.GET.get('format') == 'json':
+        data = parser_metrics_registry.snapshot()
+        data.update(gauges)
+        return JsonResponse(data)
+    return HttpResponse(
+        parser_metrics_registry.to_prometheus(gauges=gauges),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
+
 @login_required
 def resume_detail(request, pk):
     """简历详情视图"""
@@ -321,11 +548,8 @@ def resume_detail(request, pk):
     submitted_project_ids = resume.project_submissions.values_list('project_id', flat=True)
     available_projects = Project.objects.exclude(id__in=submitted_project_ids).filter(status__code='active')
     
-    # 获取可用标签（已有的标签）
-    current_tag_ids = resume.tags.values_list('id', flat=True)
-    available_tags = Tag.objects.exclude(id__in=current_tag_ids)
-    if not request.user.is_system_admin:
-        available_tags = available_tags.filter(Q(created_by=request.user) | Q(created_by__isnull=True))
+    # 可用标签在添加标签时按输入加载，排除已有的标签
+    current_tag_ids = list(resume.tags.values_list('id', flat=True))
     
     # 检查当前用户是否已收藏该简历
     is_bookmarked = ResumeBookmark.objects.filter(resume=resume, user=request.user).exists()
@@ -334,7 +558,7 @@ def resume_detail(request, pk):
         'resume': resume,
         'submissions': submissions,
         'projects': available_projects,
-        'available_tags': available_tags,
+        'current_tag_ids': current_tag_ids,
         'is_bookmarked': is_bookmarked
     })
 
@@ -349,8 +573,14 @@ def resume_update(request, pk):
     
     if request.method == 'POST':
         form = ResumeForm(request.POST, request.FILES, instance=resume)
+        if upload_error(request):
+            form.add_error('resume_file', upload_error(request))
         if form.is_valid():
             form.save()
+            if 'resume_file' in form.changed_data:
+                # 更换了简历文件，之前的解析结果不再适用
+                record_parse_snapshot(resume)
+                resume.save(update_fields=['parsed_fields', 'parser_version'])
             messages.success(request, '简历更新成功')
             return redirect('resume_detail', pk=resume.pk)
     else:
@@ -480,11 +710,8 @@ def submission_update_status(request, pk):
 @login_required
 def tag_list(request):
     """标签列表视图"""
-    tags = Tag.objects.all()
-    
     # 非系统管理员只能看到自己创建的标签和公共标签
-    if not request.user.is_system_admin:
-        tags = tags.filter(Q(created_by=request.user) | Q(created_by__isnull=True))
+    tags = visible_tags(request.user)
     
     # 搜索功能
     query = request.GET.get('q')
@@ -839,6 +1066,23 @@ def resume_bookmark_list(request):
         'projects': projects
     })
 
+@login_required
+def typeahead(request, kind):
+    """下拉框选项前缀搜索，返回 {"results": [{"id": ..., "text": ...}]}"""
+    if kind not in TYPEAHEAD_SOURCES:
+        return JsonResponse({'error': '不支持的类型'}, status=404)
+    default_limit = getattr(settings, 'TYPEAHEAD_LIMIT', 10)
+    try:
+        limit = min(max(int(request.GET.get('limit', default_limit)), 1), 50)
+    except ValueError:
+        limit = default_limit
+    exclude = [int(pk) for pk in request.GET.get('exclude', '').split(',') if pk.isdigit()]
+    results = typeahead_lookup(
+        kind, request.user, request.GET.get('q', ''), limit,
+        exclude=exclude, active_only=request.GET.get('active') == '1'
+    )
+    return JsonResponse({'results': results})
+
 # 仪表板视图
 @login_required
 def hr_dashboard(request):
@@ -965,21 +1209,8 @@ def resume_download(request, pk):
         return HttpResponseForbidden('您没有权限下载此简历')
     
     if resume.resume_file:
-        file_path = resume.resume_file.path
-        if os.path.exists(file_path):
-            # 获取文件类型
-            content_type, _ = mimetypes.guess_type(file_path)
-            if not content_type:
-                content_type = 'application/octet-stream'
-            
-            # 打开文件
-            file = open(file_path, 'rb')
-            response = FileResponse(file, content_type=content_type)
-            
-            # 设置文件名
-            filename = os.path.basename(file_path)
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            
+        response = serve_resume_file(request, resume)
+        if response is not None:
             return response
     
     messages.error(request, '文件不存在')
@@ -995,24 +1226,29 @@ def resume_preview(request, pk):
         return HttpResponseForbidden('您没有权限预览此简历')
     
     if resume.resume_file:
-        file_path = resume.resume_file.path
-        if os.path.exists(file_path):
-            # 获取文件类型
-            content_type, _ = mimetypes.guess_type(file_path)
-            if not content_type:
-                content_type = 'application/octet-stream'
-            
-            # 对于PDF文件，直接返回
-            if content_type == 'application/pdf':
-                file = open(file_path, 'rb')
-                response = FileResponse(file, content_type=content_type)
-                response['Content-Disposition'] = 'inline'
+        # 获取文件类型
+        content_type, _ = mimetypes.guess_type(resume.download_name)
+        
+        # 对于PDF文件，直接返回
+        if content_type == 'application/pdf':
+            response = serve_resume_file(request, resume, as_attachment=False)
+            if response is not None:
                 return response
-            
-            # 对于Word文件，返回提示信息
-            elif content_type in ['application/msword', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document']:
-                messages.warning(request, 'Word文件暂不支持在线预览，请下载后查看')
+        
+        # 对于Word文件，返回上传时生成的HTML预览
+        elif content_type in ['application/msword', 'application/vnd.openxmlformats-officedocument.wordprocessingml.document']:
+            name = preview_name(resume)
+            # 预览在上传时生成，缺失时（如旧版本预览）补生成一次
+            if name is None or not default_storage.exists(name):
+                name = generate_preview(resume)
+            if name is None:
+                messages.warning(request, '该Word文件暂不支持在线预览，请下载后查看')
                 return redirect('resume_detail', pk=pk)
+            response = FileResponse(default_storage.open(name, 'rb'), content_type='text/html; charset=utf-8')
+            # 预览页面不需要脚本和外部资源
+            response['Content-Security-Policy'] = "default-src 'none'; style-src 'unsafe-inline'"
+            response['X-Content-Type-Options'] = 'nosniff'
+            return response
     
     messages.error(request, '文件不存在')
     return redirect('resume_detail', pk=pk)
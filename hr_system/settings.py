@@ -135,6 +135,94 @@ AUTH_USER_MODEL = 'accounts.User'
 CRISPY_ALLOWED_TEMPLATE_PACKS = "bootstrap5"
 CRISPY_TEMPLATE_PACK = "bootstrap5"
 
+# 简历解析配置
+# spaCy模型名称或路径
+RESUME_PARSER_SPACY_MODEL = 'zh_core_web_sm'
+# 不加载的spaCy组件，提取逻辑只依赖命名实体识别
+RESUME_PARSER_SPACY_EXCLUDE = ['tagger', 'parser', 'attribute_ruler', 'senter', 'lemmatizer']
+# 是否在进程启动时预加载解析器（配合gunicorn --preload可在工作进程间共享内存）
+RESUME_PARSER_PRELOAD = False
+# 参与提取的文本最大长度（字符），超长文本会被截断
+RESUME_PARSER_MAX_TEXT_LENGTH = 200000
+# 命名实体识别只分析简历开头的最大字符数
+RESUME_PARSER_NER_MAX_CHARS = 1000
+# 是否对全文执行完整spaCy流水线并在结果中返回entities，仅在下游功能需要时开启（需同时调整RESUME_PARSER_SPACY_EXCLUDE）
+RESUME_PARSER_FULL_DOC_NLP = False
+# PDF逐页读取的页数和字符数预算
+RESUME_PARSER_PDF_MAX_PAGES = 50
+RESUME_PARSER_PDF_MAX_CHARS = 200000
+# 联系方式和各段落都已找到后是否提前停止读取后续页面
+RESUME_PARSER_PDF_EARLY_STOP = True
+# 是否记录解析各阶段耗时和字段命中率等指标（进程内统计，可通过 /headhunting/parser-metrics/ 查看）
+RESUME_PARSER_METRICS_ENABLED = True
+# 是否在子进程中解析简历文件，超时、超出内存上限或崩溃时终止子进程并返回解析失败。
+# 该配置用于Web进程中的同步解析，默认关闭：在多线程的Web进程中fork时，子进程可能继承其他线程持有的锁而死锁
+RESUME_PARSER_SANDBOX = False
+# 解析任务处理进程是否在子进程中解析；启用时 --concurrency 个并发以fork出的单线程进程运行，不在多线程进程中fork
+RESUME_PARSE_WORKER_SANDBOX = True
+# 单个文件的解析超时（秒）
+RESUME_PARSER_TIMEOUT = 60
+# 解析子进程除继承的模型外可额外占用的地址空间（MB）
+RESUME_PARSER_MEMORY_LIMIT_MB = 1024
+# 允许解析的最大文件大小（字节）
+RESUME_PARSER_MAX_FILE_SIZE = 20 * 1024 * 1024
+# 是否按文件内容哈希缓存解析结果，重复上传相同文件时跳过解析
+RESUME_PARSE_CACHE_ENABLED = True
+
+# 简历文件下载和预览的发送方式：django（由Django发送，支持Range和条件请求）、
+# nginx（X-Accel-Redirect，需要配置指向MEDIA_ROOT的internal location）、sendfile（X-Sendfile）
+RESUME_FILE_SERVE_MODE = 'django'
+# nginx模式下internal location的URL前缀
+RESUME_FILE_ACCEL_PREFIX = '/protected/'
+
+# 上传时按文件头识别简历文件类型，类型不支持或超过大小上限的文件在接收过程中即被丢弃
+FILE_UPLOAD_HANDLERS = [
+    'headhunting.uploadhandlers.ResumeUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+# 需要检查的上传字段
+RESUME_UPLOAD_FIELDS = ['resume_file']
+# 各类型简历文件的大小上限（字节）
+RESUME_UPLOAD_MAX_SIZES = {
+    '.pdf': 20 * 1024 * 1024,
+    '.docx': 10 * 1024 * 1024,
+    '.doc': 10 * 1024 * 1024,
+}
+
+# 上传文件暂存目录，多节点部署时应配置为共享目录
+RESUME_STAGING_DIR = BASE_DIR / 'resume_staging'
+# 暂存文件的保留时间（秒），过期文件由 sweep_staging 命令清理
+RESUME_STAGING_TTL = 24 * 3600
+# 简历搜索使用SQLite FTS5全文索引（其他数据库自动退回到模糊匹配），按相关度排序的结果数（其余结果按创建时间排在后面）
+RESUME_SEARCH_FTS_ENABLED = True
+RESUME_SEARCH_MAX_RESULTS = 500
+# 下拉框前缀搜索每次返回的选项数和结果缓存时间（秒）
+TYPEAHEAD_LIMIT = 10
+TYPEAHEAD_CACHE_TTL = 30
+# 按标签表达式筛选简历时使用进程内的标签位图索引，索引加载超过该时间（秒）后从数据库重新加载，
+# 以包含批量导入和其他进程中的修改；每页显示的简历数
+RESUME_TAG_INDEX_ENABLED = True
+RESUME_TAG_INDEX_MAX_AGE = 300
+RESUME_TAG_QUERY_PAGE_SIZE = 50
+
+# 分块上传时单个分块的大小上限（字节），限制每个上传请求占用工作进程的时间
+RESUME_UPLOAD_CHUNK_SIZE = 4 * 1024 * 1024
+
+# 简历解析任务队列配置
+# 上传后是否交给解析任务处理进程（python manage.py run_parse_worker）异步解析
+RESUME_PARSE_ASYNC = True
+# 单个任务最大尝试次数
+RESUME_PARSE_JOB_MAX_ATTEMPTS = 3
+# 失败重试的基础延迟（秒），按尝试次数递增
+RESUME_PARSE_JOB_RETRY_DELAY = 30
+# 任务租约时长（秒），超时未完成的运行中任务会被重新领取
+RESUME_PARSE_JOB_LEASE = 600
+# 每个处理进程的并发任务数
+RESUME_PARSE_WORKER_CONCURRENCY = 2
+# 没有任务时的轮询间隔（秒）
+RESUME_PARSE_WORKER_POLL_INTERVAL = 1.0
+
 # 日志配置
 LOGGING = {
     'version': 1,